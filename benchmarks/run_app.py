@@ -0,0 +1,194 @@
+"""Headless end-to-end benchmark of the app's widget interactions.
+
+Drives app.py with Streamlit's AppTest: after a cold first load, every
+chapter is opened in turn (with ?chapters=<url path>, in a fresh session)
+and each of its price inputs and sliders is moved to its minimum, its
+maximum and back to its default. Each rerun records its wall time, the
+figures and charts it created, the bytes it sent (element messages plus
+the chart payload the app reports) and the peak RSS of the process so
+far. Results are written as JSON; pass `--baseline` with an earlier
+results file to fail on regressions.
+
+    python benchmarks/run_app.py --output benchmarks/baseline.json
+    python benchmarks/run_app.py --baseline benchmarks/baseline.json
+
+AppTest reruns the whole script for every interaction, so bytes count
+the full page rather than only the fragment a browser would receive.
+Only AppTest's public API is used, so the script keeps working across
+Streamlit upgrades.
+"""
+import argparse
+import json
+import os
+import platform
+import resource
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import streamlit as st  # noqa: E402
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from icecream_market.pages.common import load_figure_pool, load_render_cache  # noqa: E402
+from icecream_market.pages.navigation import CHAPTERS  # noqa: E402
+
+# A metric regresses when it exceeds baseline * ratio + slack. Wall time is
+# noisy, so it gets the loosest bound.
+THRESHOLDS = {
+    "rerun_seconds": {"ratio": 1.5, "slack": 0.05},
+    "figures_created": {"ratio": 1.0, "slack": 0},
+    "charts_rendered": {"ratio": 1.0, "slack": 0},
+    "bytes": {"ratio": 1.05, "slack": 1024},
+    "peak_rss_bytes": {"ratio": 1.25, "slack": 0},
+}
+# Counted from the payload the app records for each chart instead.
+CHART_ELEMENTS = ("image", "vega_lite_chart", "arrow_vega_lite_chart")
+
+
+def _element_bytes(node):
+    total = 0
+    for child in getattr(node, "children", {}).values():
+        if child.type in CHART_ELEMENTS:
+            continue
+        proto = getattr(child, "proto", None)
+        if proto is not None and not getattr(child, "children", None):
+            total += proto.ByteSize()
+        total += _element_bytes(child)
+    return total
+
+
+def _peak_rss_bytes():
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _chart_bytes(at):
+    # The app keeps the bytes of every chart on the page in session state
+    # (see pages.common.chart_payload).
+    return sum(at.session_state["chart_bytes"].values()) if "chart_bytes" in at.session_state else 0
+
+
+def measured_run(at):
+    """Rerun the app once and return its metrics."""
+    pool, cache = load_figure_pool(), load_render_cache()
+    created, misses = pool.created, cache.stats()["misses"]
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(f"app raised: {at.exception[0].message}")
+    return {
+        "rerun_seconds": elapsed,
+        "figures_created": pool.created - created,
+        "charts_rendered": cache.stats()["misses"] - misses,
+        "bytes": _element_bytes(at.main) + _element_bytes(at.sidebar) + _chart_bytes(at),
+        "peak_rss_bytes": _peak_rss_bytes(),
+    }
+
+
+def widgets(at):
+    for kind in ("number_input", "slider"):
+        for i, widget in enumerate(getattr(at, kind)):
+            yield kind, i, widget
+
+
+def chapters():
+    """`(title, URL path)` of every chapter, in reading order."""
+    return [(title, url_path) for topic in CHAPTERS.values() for _, title, url_path, _ in topic]
+
+
+def run_pass(script, timeout):
+    """One cold load, then every chapter in turn with every widget interaction on it."""
+    steps = []
+    at = AppTest.from_file(script, default_timeout=timeout)
+    steps.append({"step": "initial load", **measured_run(at)})
+    for title, url_path in chapters():
+        # AppTest.switch_page only knows file-based pages and the chapters
+        # are functions, so each one is opened by its URL path instead.
+        at = AppTest.from_file(script, default_timeout=timeout)
+        at.query_params["chapters"] = url_path
+        steps.append({"step": f"{title}: open", **measured_run(at)})
+        for kind, i, widget in list(widgets(at)):
+            default = widget.value
+            for value in (widget.min, widget.max, default):
+                getattr(at, kind)[i].set_value(value)
+                name = f"{title}: {kind}[{i}] {widget.label.strip()} = {value:g}"
+                steps.append({"step": name, **measured_run(at)})
+    return steps
+
+
+def benchmark(script, repeat=3, timeout=60):
+    """Run the interaction sequence `repeat` times from cold caches.
+
+    Wall time is the median over the passes; the counters come from the
+    first pass, which is the only one that starts with empty caches.
+    """
+    passes = []
+    for _ in range(repeat):
+        st.cache_resource.clear()
+        passes.append(run_pass(script, timeout))
+    results = []
+    for steps in zip(*passes):
+        result = dict(steps[0])
+        result["rerun_seconds"] = statistics.median(step["rerun_seconds"] for step in steps)
+        results.append(result)
+    return results
+
+
+def regressions(results, baseline, thresholds=THRESHOLDS):
+    """Human-readable list of metrics that got worse than the baseline allows."""
+    before = {step["step"]: step for step in baseline["steps"]}
+    found = []
+    for step in results:
+        old = before.get(step["step"])
+        if old is None:
+            continue
+        for metric, bound in thresholds.items():
+            limit = old[metric] * bound["ratio"] + bound["slack"]
+            if step[metric] > limit:
+                found.append(f'{step["step"]}: {metric} {step[metric]:g} > {limit:g} (baseline {old[metric]:g})')
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--app", default=os.path.join(ROOT, "app.py"), help="Streamlit script to drive")
+    parser.add_argument("--output", default=os.path.join(ROOT, "benchmarks", "results.json"), help="where to write the results")
+    parser.add_argument("--baseline", help="earlier results file to compare against")
+    parser.add_argument("--repeat", type=int, default=3, help="passes over every interaction")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    args = parser.parse_args(argv)
+
+    results = benchmark(args.app, args.repeat, args.timeout)
+    report = {
+        "app": os.path.relpath(args.app, ROOT),
+        "python": platform.python_version(),
+        "streamlit": st.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "thresholds": THRESHOLDS,
+        "steps": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+
+    for step in results:
+        print(f'{step["rerun_seconds"] * 1000:8.1f} ms {step["figures_created"]:3d} fig {step["charts_rendered"]:3d} charts '
+              f'{step["bytes"] / 1024:8.1f} KiB  {step["step"]}')
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f))
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
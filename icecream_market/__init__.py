@@ -0,0 +1,6 @@
+"""Ice cream market lesson: supply, demand and equilibrium.
+
+`icecream_market.model` is the pure market model, `icecream_market.rendering`
+draws and caches charts and `icecream_market.pages` holds the Streamlit
+chapters.
+"""
@@ -0,0 +1,118 @@
+"""Demand and supply curves built up from individual buyers and sellers.
+
+Every simulated buyer wants one scoop if the price is at or below their
+reservation price, and every seller offers one scoop at or above theirs.
+Reservation prices are drawn from any of NumPy's random distributions, so
+the aggregate curves come from sorting the draws: demand at a price is the
+number of buyers whose reservation price is at least that high, supply the
+number of sellers whose price is at most that high.
+
+Large populations are drawn in fixed-size chunks, each with its own seed,
+and the chunks are spread over a process pool. The same seed gives the same
+market whatever the number of workers. Like the model, this module only
+needs NumPy.
+"""
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from icecream_market.ingest import _tidy
+
+DISTRIBUTIONS = ("uniform", "normal", "lognormal", "triangular")
+CHUNK_SIZE = 1_000_000
+# Below this many agents in total, a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 4_000_000
+
+
+class Population:
+    """`count` agents whose reservation prices follow one of NumPy's distributions.
+
+    `params` are passed to the matching `numpy.random.Generator` method,
+    e.g. `Population(1000, "normal", loc=4, scale=2)`.
+    """
+
+    def __init__(self, count, distribution="uniform", **params):
+        if distribution not in DISTRIBUTIONS:
+            raise ValueError(f"distribution must be one of {', '.join(DISTRIBUTIONS)}, not {distribution!r}")
+        self.count = int(count)
+        self.distribution = distribution
+        self.params = params
+
+    def draw(self, rng, size):
+        return getattr(rng, self.distribution)(size=size, **self.params)
+
+    def __repr__(self):
+        params = "".join(f", {k}={v!r}" for k, v in self.params.items())
+        return f"Population({self.count!r}, {self.distribution!r}{params})"
+
+
+def _count_chunk(population, seed, size, prices, buyers):
+    # Sorting the chunk turns every price's count into one binary search;
+    # counts from separate chunks simply add up.
+    draws = np.sort(population.draw(np.random.default_rng(seed), size))
+    if buyers:
+        return size - np.searchsorted(draws, prices, side="left")
+    return np.searchsorted(draws, prices, side="right")
+
+
+def _tasks(population, seed_sequence, prices, buyers):
+    sizes = [CHUNK_SIZE] * (population.count // CHUNK_SIZE)
+    if population.count % CHUNK_SIZE:
+        sizes.append(population.count % CHUNK_SIZE)
+    seeds = seed_sequence.spawn(len(sizes))
+    return [(population, s, size, prices, buyers) for s, size in zip(seeds, sizes)]
+
+
+def price_grid(buyers, sellers, bin_width=1, seed=0, sample=10_000):
+    """Prices from zero up to where nearly every buyer has dropped out, `bin_width` apart."""
+    rng = np.random.default_rng(seed)
+    high = np.quantile(buyers.draw(rng, sample), 0.999)
+    high = max(high, np.quantile(sellers.draw(rng, sample), 0.001))
+    # Rounded so bins like 0.1 * 3 come out as 0.3.
+    return np.round(np.arange(0, np.ceil(high / bin_width) + 1) * bin_width, 10)
+
+
+def generate_market(buyers, sellers, bin_width=1, prices=None, seed=0, workers=None):
+    """Draw both populations and tabulate their demand and supply schedules.
+
+    `buyers` and `sellers` are `Population`s. The schedule is evaluated at
+    `prices` (default: every `bin_width` dollars from zero, see
+    `price_grid`) and trimmed to the prices where both sides trade. Returns
+    the same columns as `icecream_market.model.data`.
+    """
+    if prices is None:
+        prices = price_grid(buyers, sellers, bin_width, seed)
+    prices = np.asarray(prices, dtype=float)
+    buyer_seed, seller_seed = np.random.SeedSequence(seed).spawn(2)
+    tasks = _tasks(buyers, buyer_seed, prices, True) + _tasks(sellers, seller_seed, prices, False)
+    if workers is None:
+        workers = 1
+        if buyers.count + sellers.count >= PARALLEL_THRESHOLD:
+            workers = os.cpu_count() or 1
+
+    if workers <= 1 or len(tasks) == 1:
+        counts = [_count_chunk(*task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            counts = list(pool.map(_count_chunk, *zip(*tasks)))
+    demand = np.sum([c for c, task in zip(counts, tasks) if task[4]], axis=0)
+    supply = np.sum([c for c, task in zip(counts, tasks) if not task[4]], axis=0)
+
+    keep = (demand > 0) & (supply > 0)
+    if keep.sum() < 2:
+        raise ValueError("The buyers' and sellers' reservation prices overlap at fewer than two prices")
+    return {
+        "Price (in $)": _tidy(prices[keep]),
+        "Quantity Demanded (in scoops)": _tidy(demand[keep]),
+        "Quantity Supplied (in scoops)": _tidy(supply[keep])
+    }
+
+
+def lesson_populations(count):
+    """Buyers and sellers whose reservation prices are spread evenly from $0 to $8.
+
+    On average, 80 of each reproduce the lesson's market exactly; larger
+    populations give the same curves scaled up.
+    """
+    return Population(count, "uniform", low=0, high=8), Population(count, "uniform", low=0, high=8)
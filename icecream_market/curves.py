@@ -0,0 +1,101 @@
+"""Demand and supply curve models.
+
+Curves map price to quantity and accept NumPy arrays of any shape, so a
+schedule with millions of price points is sampled in one call. Closed-form
+curves can be turned into `Tabulated` schedules at any resolution.
+"""
+import numpy as np
+
+
+def interp(x, xp, fp):
+    # Piecewise-linear interpolation of fp(xp) at x that, unlike np.interp,
+    # keeps extrapolating along the end segments outside the schedule.
+    # xp must be sorted ascending; x may have any shape.
+    i = np.clip(np.searchsorted(xp, x, side="right"), 1, len(xp) - 1)
+    x0, x1 = xp[i - 1], xp[i]
+    y0, y1 = fp[i - 1], fp[i]
+    return y0 + (x - x0) * (y1 - y0) / (x1 - x0)
+
+
+def integral(a, b, xp, fp):
+    # Area under the piecewise-linear fp(xp) from a to b, extended along the
+    # end segments like `interp`. The trapezoid rule is exact on each linear
+    # piece, so cumulative areas at the knots plus one partial trapezoid
+    # answer any bounds; a and b may be arrays.
+    cumulative = np.concatenate([[0.0], np.cumsum(np.diff(xp) * (fp[1:] + fp[:-1]) / 2)])
+
+    def area_to(x):
+        i = np.clip(np.searchsorted(xp, x, side="right"), 1, len(xp) - 1)
+        return cumulative[i - 1] + (x - xp[i - 1]) * (fp[i - 1] + interp(x, xp, fp)) / 2
+
+    return area_to(np.asarray(b, dtype=float)) - area_to(np.asarray(a, dtype=float))
+
+
+class Linear:
+    """Straight-line curve `q = intercept + slope * p`.
+
+    Demand has a negative slope and supply a positive one.
+    """
+
+    def __init__(self, intercept, slope):
+        self.intercept = intercept
+        self.slope = slope
+
+    @classmethod
+    def fit(cls, prices, quantities):
+        """Least-squares line through a schedule; exact when it is already straight."""
+        slope, intercept = np.polyfit(np.asarray(prices, dtype=float), np.asarray(quantities, dtype=float), 1)
+        return cls(float(intercept), float(slope))
+
+    def quantity(self, price):
+        return self.intercept + self.slope * np.asarray(price)
+
+    def __repr__(self):
+        return f"Linear(intercept={self.intercept!r}, slope={self.slope!r})"
+
+
+class ConstantElasticity:
+    """Curve `q = scale * p ** elasticity` with the same elasticity at every price.
+
+    Demand has a negative elasticity and supply a positive one.
+    """
+
+    def __init__(self, scale, elasticity):
+        self.scale = scale
+        self.elasticity = elasticity
+
+    def quantity(self, price):
+        with np.errstate(divide="ignore"):
+            return self.scale * np.asarray(price, dtype=float) ** self.elasticity
+
+    def __repr__(self):
+        return f"ConstantElasticity(scale={self.scale!r}, elasticity={self.elasticity!r})"
+
+
+class Tabulated:
+    """Schedule of quantities at sorted price points, linear in between.
+
+    Lookups are a binary search, so the schedule can hold millions of points.
+    """
+
+    def __init__(self, prices, quantities):
+        prices = np.asarray(prices, dtype=float)
+        quantities = np.asarray(quantities, dtype=float)
+        order = np.argsort(prices, kind="stable")
+        self.prices = prices[order]
+        self.quantities = quantities[order]
+
+    @classmethod
+    def sample(cls, curve, low, high, points):
+        """Tabulate any curve at `points` evenly spaced prices."""
+        prices = np.linspace(low, high, points)
+        return cls(prices, curve.quantity(prices))
+
+    def quantity(self, price):
+        return interp(np.asarray(price, dtype=float), self.prices, self.quantities)
+
+    def __len__(self):
+        return len(self.prices)
+
+    def __repr__(self):
+        return f"Tabulated({len(self)} points, ${self.prices[0]:g}-${self.prices[-1]:g})"
@@ -0,0 +1,77 @@
+"""How a market's price adjusts round by round when it starts out of equilibrium.
+
+Two classic stories are simulated:
+
+- "tatonnement": each round the price moves in proportion to the excess
+  demand at the current price, falling in a surplus and rising in a shortage.
+- "cobweb": sellers decide how much to bring to market from last round's
+  price, and the price then settles wherever buyers take exactly that much.
+
+Every starting price is simulated at once: each round is a single NumPy step
+over all of them.
+"""
+import numpy as np
+
+from icecream_market.curves import interp
+
+RULES = ("tatonnement", "cobweb")
+
+
+def _slope(prices, quantities):
+    # Average change in quantity per dollar across the whole schedule.
+    return (quantities[-1] - quantities[0]) / (prices[-1] - prices[0])
+
+
+def default_speed(prices, demand, supply):
+    """Tâtonnement step in $ per scoop of excess demand that halves the gap each round."""
+    prices = np.asarray(prices, dtype=float)
+    order = np.argsort(prices)
+    prices = prices[order]
+    return 0.5 / (_slope(prices, np.asarray(supply, dtype=float)[order]) - _slope(prices, np.asarray(demand, dtype=float)[order]))
+
+
+def simulate_adjustment(prices, demand, supply, start_prices, rounds=20, rule="tatonnement", speed=None,
+                        demand_shift=0, supply_shift=0):
+    """Price paths from every starting price under one adjustment rule.
+
+    `start_prices` is a number or an array. `speed` is the tâtonnement step
+    in $ per scoop of excess demand (default: `default_speed`); the cobweb
+    has no such parameter. Returns a dict of arrays shaped
+    `(rounds + 1, *start_prices.shape)`: the `price` each round, the
+    `quantity_demanded` and `quantity_supplied` at it and the `traded`
+    quantity, the smaller of the two.
+    """
+    if rule not in RULES:
+        raise ValueError(f"rule must be one of {', '.join(RULES)}, not {rule!r}")
+    prices = np.asarray(prices, dtype=float)
+    order = np.argsort(prices)
+    prices = prices[order]
+    demand = np.asarray(demand, dtype=float)[order]
+    supply = np.asarray(supply, dtype=float)[order]
+    if speed is None:
+        speed = default_speed(prices, demand, supply)
+    # Demand sorted by quantity, to read off the price buyers pay for a quantity.
+    by_quantity = np.argsort(demand, kind="stable")
+
+    price = np.empty((rounds + 1,) + np.shape(start_prices))
+    price[0] = start_prices
+    for t in range(rounds):
+        if rule == "tatonnement":
+            excess_demand = interp(price[t], prices, demand) + demand_shift - interp(price[t], prices, supply) - supply_shift
+            # Prices cannot go negative however large the surplus.
+            price[t + 1] = np.maximum(price[t] + speed * excess_demand, 0)
+        else:
+            brought = interp(price[t], prices, supply) + supply_shift
+            price[t + 1] = np.maximum(interp(brought - demand_shift, demand[by_quantity], prices[by_quantity]), 0)
+
+    quantity_demanded = interp(price, prices, demand) + demand_shift
+    quantity_supplied = interp(price, prices, supply) + supply_shift
+    if rule == "cobweb":
+        # What sellers bring was fixed by the previous round's price.
+        quantity_supplied[1:] = interp(price[:-1], prices, supply) + supply_shift
+    return {
+        "price": price,
+        "quantity_demanded": quantity_demanded,
+        "quantity_supplied": quantity_supplied,
+        "traded": np.minimum(quantity_demanded, quantity_supplied),
+    }
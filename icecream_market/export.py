@@ -0,0 +1,382 @@
+"""Build command: pre-render every state of the app into a static site.
+
+Each chapter's widgets only take a bounded set of values, and chapters do
+not depend on each other's widgets, so the site needs one page fragment per
+chapter state rather than one per combination across the whole page. The
+app is driven headlessly with Streamlit's AppTest, once per state, and each
+chapter's text, charts and controls are written out as HTML:
+
+    site/index.html                  every chapter in its default state
+    site/sections/<n>/<state>.html   chapter n with its widgets at <state>
+    site/media/<hash>.svg            chart images, stored once per content
+
+Charts are rendered as SVG, which the app sends inline, so everything is
+read off the elements AppTest exposes and widgets are set with its public
+`set_value`. A few lines of JavaScript swap in the matching fragment when a
+control changes, so any plain file server can host the site. Vega-Lite
+charts are kept as specs and drawn in the browser with vega-embed. Buttons
+(the adjustment animation, drawing a new crowd) are left out, and chapters
+that read another chapter's inputs show them at their defaults.
+
+States are rendered in parallel across a process pool:
+
+    python -m icecream_market.export --output site
+
+Converting the chapters' Markdown uses the `markdown` package from requirements.txt.
+"""
+import argparse
+import base64
+import hashlib
+import html
+import itertools
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# A chapter with more states than this is probably a free-form input.
+MAX_STATES = 5000
+MEDIA_EXTENSIONS = {"image/png": "png", "image/svg+xml": "svg", "image/jpeg": "jpg"}
+CONTROL_KINDS = ("number_input", "slider", "select_slider", "radio")
+# Written into every exported site, so a later export knows the directory is
+# its own to replace.
+MARKER = ".icecream-export"
+
+PAGE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{title}</title>
+<style>
+  body {{ font-family: "Source Sans Pro", sans-serif; max-width: 46rem; margin: 2rem auto; padding: 0 1rem; line-height: 1.6; color: #31333F; }}
+  img {{ max-width: 100%; }}
+  .row {{ display: flex; gap: 1rem; }}
+  .control {{ margin: 1rem 0; }}
+  .control label {{ display: block; font-size: 0.9rem; }}
+  fieldset.control {{ border: none; padding: 0; }}
+</style>
+<script src="https://cdn.jsdelivr.net/npm/vega@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-lite@5"></script>
+<script src="https://cdn.jsdelivr.net/npm/vega-embed@6"></script>
+</head>
+<body>
+{body}
+<script>
+function drawCharts(root) {{
+  root.querySelectorAll(".vega[data-spec]").forEach((el) => vegaEmbed(el, JSON.parse(el.dataset.spec), {{actions: false}}));
+}}
+function stateKey(section) {{
+  return [...section.querySelectorAll("[data-control]")].map((control) =>
+    control.tagName === "FIELDSET" ? control.querySelector("input:checked").value : control.value
+  ).join("-");
+}}
+document.addEventListener("input", (event) => {{
+  const labels = event.target.dataset.labels;
+  if (labels) event.target.nextElementSibling.textContent = JSON.parse(labels)[event.target.value];
+}});
+document.addEventListener("change", async (event) => {{
+  const section = event.target.closest("section[data-section]");
+  if (!section) return;
+  const response = await fetch(`sections/${{section.dataset.section}}/${{stateKey(section)}}.html`);
+  if (!response.ok) return;
+  section.innerHTML = await response.text();
+  drawCharts(section);
+}});
+if (window.vegaEmbed) drawCharts(document);
+</script>
+</body>
+</html>
+"""
+
+
+@contextmanager
+def _inline_charts():
+    # SVG charts arrive inside the page as data URLs, so every image can be
+    # read off the rendered elements without reaching into Streamlit's
+    # media storage.
+    previous = os.environ.get("ICECREAM_IMAGE_FORMAT")
+    os.environ["ICECREAM_IMAGE_FORMAT"] = "svg"
+    try:
+        yield
+    finally:
+        if previous is None:
+            del os.environ["ICECREAM_IMAGE_FORMAT"]
+        else:
+            os.environ["ICECREAM_IMAGE_FORMAT"] = previous
+
+
+@contextmanager
+def _keep_main():
+    # AppTest installs the app script as __main__ and leaves it there. Spawned
+    # workers re-import __main__ on start-up, so without this they would run
+    # the app itself (outside any session) and die before rendering anything.
+    main = sys.modules["__main__"]
+    try:
+        yield
+    finally:
+        sys.modules["__main__"] = main
+
+
+def _markdown(text):
+    try:
+        import markdown
+    except ImportError as e:
+        raise ImportError("Exporting the site requires markdown (pip install markdown)") from e
+    # Streamlit needs "\$" to keep dollar signs out of LaTeX; plain HTML does not.
+    return markdown.markdown(text.replace("\\$", "$"), extensions=["tables"])
+
+
+def _widget_values(widget):
+    """Every value a widget can take, as `(value, label)` pairs."""
+    if widget.type in ("number_input", "slider"):
+        values = np.arange(widget.min, widget.max + widget.step / 2, widget.step)
+        cast = type(widget.value)
+        return [(cast(v), f"{v:g}") for v in values.tolist()]
+    # Radios and select sliders are set by label, so their options must be
+    # the labels themselves (no format_func).
+    return [(label, label) for label in widget.options]
+
+
+def _is_row(node):
+    # st.columns lay their children out horizontally; fragments stack them.
+    return node.type == "flex_container" and node.proto.flex_container.direction == node.proto.flex_container.HORIZONTAL
+
+
+def _is_fragment(node):
+    return node.type == "flex_container" and not _is_row(node)
+
+
+def _sections(at):
+    """The page split into chapters, each a list of top-level nodes in page order.
+
+    Every fragment is its own block; chapters outside a fragment start at
+    their subheader.
+    """
+    sections = []
+    for node in at.main.children.values():
+        if _is_fragment(node) or node.type == "subheader" or not sections or _is_fragment(sections[-1][0]):
+            sections.append([node])
+        else:
+            sections[-1].append(node)
+    return sections
+
+
+def _walk(node):
+    yield node
+    for child in getattr(node, "children", {}).values():
+        yield from _walk(child)
+
+
+def _controls(at):
+    """Per chapter, the widgets that define its states as `(kind, index, values)`."""
+    counters = {kind: itertools.count() for kind in CONTROL_KINDS}
+    controls = []
+    for nodes in _sections(at):
+        found = []
+        for node in (n for top in nodes for n in _walk(top)):
+            if node.type in counters:
+                found.append((node.type, next(counters[node.type]), _widget_values(node)))
+        controls.append(found)
+    return controls
+
+
+def _control_html(node, section, index, values):
+    label = html.escape(node.label.strip())
+    labels = [label for _, label in values]
+    if node.type in ("radio", "select_slider"):
+        selected = str(node.format_func(node.value))
+        current = labels.index(selected) if selected in labels else 0
+    else:
+        current = next((i for i, (v, _) in enumerate(values) if v == node.value), 0)
+    name = f"s{section}-w{index}"
+    if node.type == "radio":
+        options = "".join(
+            f'<label><input type="radio" name="{name}" value="{i}"{" checked" if i == current else ""}> {html.escape(text)}</label>'
+            for i, text in enumerate(labels)
+        )
+        return f'<fieldset class="control" data-control><legend>{label}</legend>{options}</fieldset>'
+    if node.type == "number_input":
+        options = "".join(
+            f'<option value="{i}"{" selected" if i == current else ""}>{html.escape(text)}</option>'
+            for i, text in enumerate(labels)
+        )
+        return f'<div class="control"><label for="{name}">{label}</label><select id="{name}" data-control>{options}</select></div>'
+    return (
+        f'<div class="control"><label for="{name}">{label}</label>'
+        f'<input type="range" id="{name}" min="0" max="{len(labels) - 1}" value="{current}" data-control '
+        f"data-labels='{html.escape(json.dumps(labels))}'><output>{html.escape(labels[current])}</output></div>"
+    )
+
+
+def _node_html(node, section, media, widget_index):
+    kind = node.type
+    if kind == "title":
+        return f"<h1>{html.escape(node.value)}</h1>"
+    if kind == "subheader":
+        return f"<h3>{html.escape(node.value)}</h3>"
+    if kind == "markdown":
+        return _markdown(node.value) if node.value else ""
+    if kind == "image":
+        tags = []
+        for image in node.proto.imgs:
+            if not image.url.startswith("data:"):
+                raise RuntimeError(f"Only inline (SVG) images can be exported, not {image.url}")
+            header, encoded = image.url.split(",", 1)
+            data, mimetype = base64.b64decode(encoded), header[len("data:"):].split(";")[0]
+            name = f"{hashlib.sha256(data).hexdigest()[:20]}.{MEDIA_EXTENSIONS.get(mimetype, 'bin')}"
+            media[name] = data
+            tags.append(f'<img src="media/{name}" alt="">')
+        return "".join(tags)
+    if kind in ("vega_lite_chart", "arrow_vega_lite_chart"):
+        return f"<div class=\"vega\" data-spec='{html.escape(node.proto.spec)}'></div>"
+    if kind in CONTROL_KINDS:
+        index = next(widget_index)
+        return _control_html(node, section, index, _widget_values(node))
+    children = "".join(_node_html(child, section, media, widget_index) for child in getattr(node, "children", {}).values())
+    if kind == "column":
+        return f'<div style="flex: {node.proto.weight}">{children}</div>'
+    if _is_row(node):
+        return f'<div class="row">{children}</div>'
+    return children
+
+
+def section_html(at, section, media):
+    """HTML for chapter number `section` of the page AppTest last ran."""
+    nodes = _sections(at)[section]
+    widget_index = itertools.count()
+    return "".join(_node_html(node, section, media, widget_index) for node in nodes)
+
+
+def _whole_lesson(at):
+    # The app gives every chapter a page of its own; the site shows them all
+    # on one, like the app's ?chapters=all.
+    at.query_params["chapters"] = "all"
+    return at
+
+
+def _state_keys(controls, max_states=MAX_STATES):
+    total = int(np.prod([len(values) for _, _, values in controls]))
+    if total > max_states:
+        raise ValueError(f"{total} states is more than the {max_states} allowed for one chapter")
+    return itertools.product(*(range(len(values)) for _, _, values in controls))
+
+
+def render_states(script, tasks, timeout=60):
+    """Render `(section, controls, indices)` tasks; returns [(section, key, html)] and the media they use."""
+    from streamlit.testing.v1 import AppTest
+
+    rendered, media = [], {}
+    with _inline_charts(), _keep_main():
+        at = _whole_lesson(AppTest.from_file(script, default_timeout=timeout)).run()
+        for section, controls, indices in tasks:
+            for (kind, index, values), i in zip(controls, indices):
+                getattr(at, kind)[index].set_value(values[i][0])
+            at.run()
+            if at.exception:
+                raise RuntimeError(f"app raised: {at.exception[0].message}")
+            key = "-".join(str(i) for i in indices)
+            rendered.append((section, key, section_html(at, section, media)))
+    return rendered, media
+
+
+def _write_media(output, media):
+    os.makedirs(os.path.join(output, "media"), exist_ok=True)
+    for name, data in media.items():
+        path = os.path.join(output, "media", name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+
+
+def _replace_output(output, force=False):
+    # Only ever delete an earlier export (or anything, with force): a typo
+    # like --output . must not wipe the user's files.
+    if os.path.exists(output):
+        if not os.path.isdir(output):
+            raise ValueError(f"{output} exists and is not a directory")
+        if os.listdir(output) and not force and not os.path.exists(os.path.join(output, MARKER)):
+            raise ValueError(f"{output} is not empty and does not hold an earlier export; pass --force to replace it")
+        shutil.rmtree(output)
+    os.makedirs(output)
+    with open(os.path.join(output, MARKER), "w", encoding="utf-8") as f:
+        f.write("Written by python -m icecream_market.export, which replaces this directory on the next run.\n")
+
+
+def export(output, script=None, workers=None, timeout=60, force=False):
+    """Write the static site for `script` (default: the app) to `output`. Returns the number of states.
+
+    An existing `output` is only replaced if it is empty, holds an earlier
+    export or `force` is set.
+    """
+    from streamlit.testing.v1 import AppTest
+
+    script = script or os.path.join(ROOT, "app.py")
+    _replace_output(output, force)
+    with _inline_charts(), _keep_main():
+        at = _whole_lesson(AppTest.from_file(script, default_timeout=timeout)).run()
+        if at.exception:
+            raise RuntimeError(f"app raised: {at.exception[0].message}")
+        media = {}
+        sections = [section_html(at, i, media) for i in range(len(_sections(at)))]
+        controls = _controls(at)
+        title = at.title[0].value if at.title else "Ice Cream Market"
+
+    body = "\n".join(
+        f'<section data-section="{i}">{content}</section>' if controls[i] else f"<section>{content}</section>"
+        for i, content in enumerate(sections)
+    )
+    with open(os.path.join(output, "index.html"), "w", encoding="utf-8") as f:
+        f.write(PAGE.format(title=html.escape(title), body=body))
+    _write_media(output, media)
+
+    tasks = [(i, found, indices) for i, found in enumerate(controls) if found for indices in _state_keys(found)]
+    workers = min(workers or os.cpu_count() or 1, len(tasks)) or 1
+    # Every worker starts the app once, then takes an interleaved share of the states.
+    batches = [tasks[w::workers] for w in range(workers)]
+    if workers == 1:
+        results = [render_states(script, batches[0], timeout)]
+    else:
+        # Fresh interpreters: forking a process that has already run the app
+        # would copy Streamlit's threads in an unknown state.
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            results = list(pool.map(render_states, [script] * workers, batches, [timeout] * workers))
+    for rendered, media in results:
+        for section, key, content in rendered:
+            os.makedirs(os.path.join(output, "sections", str(section)), exist_ok=True)
+            with open(os.path.join(output, "sections", str(section), f"{key}.html"), "w", encoding="utf-8") as f:
+                f.write(content)
+        _write_media(output, media)
+    return len(tasks)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pre-render every state of the app into a static site.")
+    parser.add_argument("--output", default="site", help="directory to write the site to; an earlier export there is replaced")
+    parser.add_argument("--force", action="store_true", help="replace the output directory even if it holds other files")
+    parser.add_argument("--app", help="Streamlit script to export (default: the app)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds allowed per rerun")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        states = export(args.output, args.app, args.workers, args.timeout, args.force)
+    except ValueError as e:
+        parser.error(str(e))
+    print(f"Exported {states:,} chapter states to {args.output} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    # Run the importable copy of this module: AppTest takes over __main__
+    # while it runs the app, so workers could not find render_states there.
+    from icecream_market.export import main
+
+    main()
@@ -0,0 +1,110 @@
+"""Build demand and supply schedules from large sales logs.
+
+A log has one row per order with a price, a quantity and a side: buyers'
+bids ("buy", "bid", "demand") and sellers' offers ("sell", "ask", "offer",
+"supply"). Files are read chunk by chunk and only per-price-bin totals are
+kept, so a log with tens of millions of rows never has to fit in memory.
+"""
+import numpy as np
+
+DEMAND_SIDES = ("buy", "bid", "demand")
+SUPPLY_SIDES = ("sell", "ask", "offer", "supply")
+# Most price bins a schedule may have. A single stray price like 1e12 would
+# otherwise need billions of bins; pass `high` to cut such logs down.
+MAX_BINS = 1_000_000
+
+
+def iter_chunks(path, columns, chunksize=1_000_000):
+    """Yield DataFrames holding `columns` of a CSV or Parquet file, one chunk at a time."""
+    if str(path).lower().endswith((".parquet", ".pq")):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise ImportError("Reading Parquet sales logs requires pyarrow (pip install pyarrow)") from e
+        for batch in pq.ParquetFile(path).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        import pandas as pd
+
+        yield from pd.read_csv(path, usecols=columns, chunksize=chunksize)
+
+
+def _add_bincount(total, bins, weights):
+    counts = np.bincount(bins, weights=weights)
+    if len(counts) > len(total):
+        total = np.pad(total, (0, len(counts) - len(total)))
+    total[:len(counts)] += counts
+    return total
+
+
+def _tidy(values):
+    # Keep whole numbers as ints so tables and labels read "40 scoops", not "40.0".
+    if np.all(np.mod(values, 1) == 0):
+        return values.astype(np.int64).tolist()
+    return values.tolist()
+
+
+def aggregate_schedule(path, bin_width=1, low=None, high=None, price_column="price",
+                       quantity_column="quantity", side_column="side", chunksize=1_000_000):
+    """Stream a sales log into a price-binned demand and supply schedule.
+
+    Prices are grouped into bins of `bin_width` starting at zero and each bin
+    is labelled with its lower edge. A bid is willing to buy at its own price
+    and below, so demand at a price is the total quantity bid at or above it;
+    supply is the total quantity offered at or below it. `low` and `high`
+    trim the returned schedule; rows with missing, negative or out-of-range
+    prices are dropped before binning, and a log that would need more than
+    `MAX_BINS` bins is refused. The result has the same columns as
+    `icecream_market.model.data`.
+    """
+    demand = np.zeros(0)
+    supply = np.zeros(0)
+    for chunk in iter_chunks(path, [price_column, quantity_column, side_column], chunksize):
+        price = chunk[price_column].to_numpy(dtype=float)
+        quantity = chunk[quantity_column].to_numpy(dtype=float)
+        side = chunk[side_column].astype(str).str.strip().str.lower().to_numpy()
+        valid = np.isfinite(price) & np.isfinite(quantity) & (price >= 0)
+        price, quantity, side = price[valid], quantity[valid], side[valid]
+        bins = (price // bin_width).astype(np.int64)
+        is_bid = np.isin(side, DEMAND_SIDES)
+        is_offer = np.isin(side, SUPPLY_SIDES)
+        # A bid above `high` still buys at `high` and an offer below `low`
+        # still sells at `low`, so they count there; the other rows outside
+        # the range never reach the schedule and are dropped before binning.
+        if high is not None:
+            top = int(high // bin_width)
+            bins = np.where(is_bid, np.minimum(bins, top), bins)
+            is_offer &= bins <= top
+        if low is not None:
+            bottom = int(-(-low // bin_width))
+            bins = np.where(is_offer, np.maximum(bins, bottom), bins)
+            is_bid &= bins >= bottom
+        used = is_bid | is_offer
+        if used.any() and bins[used].max() >= MAX_BINS:
+            raise ValueError(
+                f"{path} has prices up to {price[used].max():g}, more than {MAX_BINS:,} bins of {bin_width:g}; "
+                "pass a lower high= or a wider bin_width"
+            )
+        demand = _add_bincount(demand, bins[is_bid], quantity[is_bid])
+        supply = _add_bincount(supply, bins[is_offer], quantity[is_offer])
+
+    size = max(len(demand), len(supply))
+    if size == 0:
+        raise ValueError(f"No valid bids or offers found in {path}")
+    demand = np.pad(demand, (0, size - len(demand)))[::-1].cumsum()[::-1]
+    supply = np.pad(supply, (0, size - len(supply))).cumsum()
+    prices = np.arange(size) * bin_width
+
+    # Only keep the stretch of prices where both sides of the market trade.
+    keep = (demand > 0) & (supply > 0)
+    if low is not None:
+        keep &= prices >= low
+    if high is not None:
+        keep &= prices <= high
+    if keep.sum() < 2:
+        raise ValueError(f"{path} has fewer than two price bins with both bids and offers")
+    return {
+        "Price (in $)": _tidy(prices[keep]),
+        "Quantity Demanded (in scoops)": _tidy(demand[keep]),
+        "Quantity Supplied (in scoops)": _tidy(supply[keep])
+    }
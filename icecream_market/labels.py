@@ -0,0 +1,91 @@
+"""Point labels for curves, culled so they stay readable on long schedules.
+
+A chart can only show a couple of dozen labels along a curve before they
+overlap, so `label_points` keeps at most one label per cell of a coarse
+grid over the curve and never draws more than `MAX_LABELS`. Draw time then
+stays flat however many points the schedule has. Labels that still land
+too close together, on either side of a cell edge, are pushed apart
+vertically without changing their order.
+"""
+import numpy as np
+
+MAX_LABELS = 25
+
+
+def _cells(values, bins):
+    low, high = values.min(), values.max()
+    if not high > low:
+        return np.zeros(len(values), dtype=np.int64)
+    return np.minimum(((values - low) / (high - low) * bins).astype(np.int64), bins - 1)
+
+
+def spread_out(x, y, max_labels=MAX_LABELS):
+    """Indices of at most `max_labels` points, spread along the curve.
+
+    Short curves keep every point. Longer ones keep the first point in each
+    cell of a grid with `max_labels` rows; labels are wide, so the grid has
+    a quarter as many columns.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    finite = np.flatnonzero(np.isfinite(x) & np.isfinite(y))
+    if len(finite) <= max_labels:
+        return finite
+    columns = max(max_labels // 4, 1)
+    cells = _cells(y[finite], max_labels) * columns + _cells(x[finite], columns)
+    _, first = np.unique(cells, return_index=True)
+    keep = finite[np.sort(first)]
+    if len(keep) > max_labels:
+        keep = keep[np.linspace(0, len(keep) - 1, max_labels).round().astype(np.int64)]
+    return keep
+
+
+def push_apart(positions, gap):
+    """`positions` moved as little as possible so that no two are closer than `gap`.
+
+    Labels keep their order: the lowest position stays the lowest. Runs of
+    labels that are too close are spread evenly around their mean.
+    """
+    positions = np.asarray(positions, dtype=float)
+    order = np.argsort(positions, kind="stable")
+    # Each run is [first position, labels, sum of where each label wants its
+    # run to start]; the best start for a run is the mean of that sum.
+    runs = []
+    for position in positions[order].tolist():
+        count, total = 1, position
+        while runs and runs[-1][0] + runs[-1][1] * gap > total / count:
+            _, before, before_total = runs.pop()
+            total = before_total + total - before * gap * count
+            count += before
+        runs.append([total / count, count, total])
+    result = np.empty_like(positions)
+    result[order] = np.concatenate([start + gap * np.arange(count) for start, count, _ in runs]) if runs else []
+    return result
+
+
+def label_points(ax, x, y, template="{}", values=None, offset=(2, 0), fontsize=9, max_labels=MAX_LABELS, min_gap=None):
+    """Label the points of one curve with `template.format(value)`.
+
+    Each label sits `offset` (in data units) from its point, and labels are
+    at least `min_gap` apart vertically (default: the curve's height over
+    `max_labels`). `values` default to the x coordinates. Returns the
+    number of labels drawn.
+    """
+    x = np.asarray(x)
+    y = np.asarray(y)
+    values = x if values is None else np.asarray(values)
+    keep = spread_out(x, y, max_labels)
+    label_x = x[keep] + offset[0]
+    label_y = y[keep] + offset[1]
+    if min_gap is None and len(keep) > 1:
+        min_gap = (y[keep].max() - y[keep].min()) / max_labels
+    if min_gap:
+        label_y = push_apart(label_y, min_gap)
+    texts = [template.format(value) for value in values[keep].tolist()]
+    # Backends that can draw many labels as one mark get them in one call.
+    if hasattr(ax, "text_layer"):
+        ax.text_layer(label_x, label_y, texts, fontsize=fontsize, va="center")
+    else:
+        for tx, ty, text in zip(label_x.tolist(), label_y.tolist(), texts):
+            ax.text(tx, ty, text, fontsize=fontsize, va="center")
+    return len(texts)
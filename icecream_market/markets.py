@@ -0,0 +1,246 @@
+"""Many markets at once: a registry of product schedules solved in batches.
+
+Every product's demand and supply schedule is one row of 2-D arrays
+(products x price points), so equilibria, shifts, taxes and welfare for all
+of them are solved with the same NumPy operations as for a single market,
+without a Python loop over products. Schedules with fewer points than the
+longest are padded by extending their end segments, which is how the model
+already treats prices beyond a schedule, so padding never changes an answer.
+
+A catalog is a CSV or Parquet table with one row per product and price:
+
+    product,price,demand,supply
+    ice cream,1,70,10
+    frozen yogurt,1,55,5
+
+Reading a catalog needs pandas (and pyarrow for Parquet); building and
+solving a registry from arrays does not.
+"""
+import numpy as np
+
+from icecream_market.ingest import _tidy, iter_chunks
+from icecream_market.model import _linear_root, _read_only, _trading
+
+
+def _segments(x, xp):
+    # Index of the segment of row m of `xp` that row m of `x` falls in, the
+    # same index `curves.interp` uses. Offsetting each row's prices past the
+    # previous row's lets one searchsorted over the flattened rows serve them all.
+    m, n = xp.shape
+    flat = x.reshape(m, -1)
+    low, high = xp[:, :1], xp[:, -1:]
+    offset = np.arange(m)[:, None] * (float(np.max(high - low)) + 1) - low
+    i = np.searchsorted((xp + offset).ravel(), (np.clip(flat, low, high) + offset).ravel(), side="right")
+    return np.clip(i.reshape(flat.shape) - np.arange(m)[:, None] * n, 1, n - 1)
+
+
+def _interp_rows(x, xp, fp):
+    # `curves.interp` for every market at once: row m of `x` (any shape after
+    # the first axis) is interpolated on row m of `xp` and `fp`.
+    flat = x.reshape(len(xp), -1)
+    i = _segments(flat, xp)
+    x0, x1 = np.take_along_axis(xp, i - 1, axis=1), np.take_along_axis(xp, i, axis=1)
+    y0, y1 = np.take_along_axis(fp, i - 1, axis=1), np.take_along_axis(fp, i, axis=1)
+    return (y0 + (flat - x0) * (y1 - y0) / (x1 - x0)).reshape(x.shape)
+
+
+def _integral_rows(a, b, xp, fp):
+    # `curves.integral` for every market at once.
+    cumulative = np.concatenate([np.zeros((len(xp), 1)), np.cumsum(np.diff(xp, axis=1) * (fp[:, 1:] + fp[:, :-1]) / 2, axis=1)], axis=1)
+
+    def area_to(x):
+        flat = x.reshape(len(xp), -1)
+        i = _segments(flat, xp) - 1
+        area = (np.take_along_axis(cumulative, i, axis=1)
+                + (flat - np.take_along_axis(xp, i, axis=1)) * (np.take_along_axis(fp, i, axis=1) + _interp_rows(flat, xp, fp)) / 2)
+        return area.reshape(x.shape)
+
+    return area_to(b) - area_to(a)
+
+
+def _inverse_rows(quantity, prices, quantities):
+    # Price at which each market's monotone schedule reaches `quantity`.
+    order = np.argsort(quantities, axis=1, kind="stable")
+    return _interp_rows(quantity, np.take_along_axis(quantities, order, axis=1), np.take_along_axis(prices, order, axis=1))
+
+
+def _per_market(markets, *values):
+    # Shifts and taxes broadcast from the left: the first axis is the markets,
+    # any further axes are scenarios.
+    arrays = [np.asarray(v, dtype=float) for v in values]
+    ndim = max(1, *(a.ndim for a in arrays))
+    arrays = [a.reshape(a.shape + (1,) * (ndim - a.ndim)) for a in arrays]
+    shape = np.broadcast_shapes((markets,) + (1,) * (ndim - 1), *(a.shape for a in arrays))
+    return [np.broadcast_to(a, shape) for a in arrays]
+
+
+def solve_markets(prices, demand, supply, demand_shift=0, supply_shift=0, tax_on_sellers=0, tax_on_buyers=0):
+    """`model.solve_equilibrium` for many markets in one pass.
+
+    `prices`, `demand` and `supply` are 2-D, one market per row with prices
+    ascending. Shifts and taxes are numbers, one value per market or arrays
+    whose first axis is the markets; they are broadcast from the left, so
+    a `(1, n)` array applies the same n scenarios to every market. Returns
+    `(quantity, price)` shaped `(markets, ...)`, NaN where nothing trades.
+    """
+    ds, ss, ts, tb = _per_market(len(prices), demand_shift, supply_shift, tax_on_sellers, tax_on_buyers)
+    shape = ds.shape
+    ds, ss, ts, tb = (a.reshape(len(prices), -1, 1) for a in (ds, ss, ts, tb))
+    wedge = ts + tb
+    grid = prices[:, None, :]
+
+    def excess(p):
+        return _interp_rows(p + wedge, prices, demand) + ds - _interp_rows(p, prices, supply) - ss
+
+    # The same kink search as the single-market solver, along the last axis.
+    knots = np.sort(np.concatenate([np.broadcast_to(grid, wedge.shape[:2] + grid.shape[2:]), grid - wedge], axis=2), axis=2)
+    g = excess(knots)
+    crossing = (g[..., :-1] >= 0) & (g[..., 1:] <= 0) & (g[..., :-1] != g[..., 1:])
+    found = crossing.any(axis=2)
+    i = crossing.argmax(axis=2)[..., None]
+
+    def at(a, j):
+        return np.take_along_axis(a, j, axis=2)[..., 0]
+
+    seller_price = _linear_root(at(knots, i), at(g, i), at(knots, i + 1), at(g, i + 1))
+    lo, hi = knots[..., :1], knots[..., -1:]
+    above = _linear_root(hi, excess(hi), hi + 1, excess(hi + 1))[..., 0]
+    below = _linear_root(lo - 1, excess(lo - 1), lo, excess(lo))[..., 0]
+    seller_price = np.where(found, seller_price, np.where(g[..., -1] > 0, above, below))
+
+    quantity = _interp_rows(seller_price, prices, supply) + ss[..., 0]
+    quantity, price = _trading(quantity, seller_price + ts[..., 0], seller_price)
+    return quantity.reshape(shape), price.reshape(shape)
+
+
+def market_welfare(prices, demand, supply, quantity, buyer_price, seller_price, demand_shift=0, supply_shift=0):
+    """`model.welfare` for many markets in one pass; arguments broadcast like `solve_markets`."""
+    quantity, buyer_price, seller_price, ds, ss = _per_market(len(prices), quantity, buyer_price, seller_price, demand_shift, supply_shift)
+    demand_price = _inverse_rows(quantity - ds, prices, demand)
+    choke_price = _inverse_rows(-ds, prices, demand)
+    supply_price = _inverse_rows(quantity - ss, prices, supply)
+    reserve_price = _inverse_rows(-ss, prices, supply)
+    consumer = (_integral_rows(demand_price, choke_price, prices, demand) + ds * (choke_price - demand_price)
+                + (demand_price - buyer_price) * quantity)
+    producer = (_integral_rows(reserve_price, supply_price, prices, supply) + ss * (supply_price - reserve_price)
+                + (seller_price - supply_price) * quantity)
+    revenue = (buyer_price - seller_price) * quantity
+    return {
+        "consumer_surplus": consumer,
+        "producer_surplus": producer,
+        "tax_revenue": revenue,
+        "total_welfare": consumer + producer + revenue,
+    }
+
+
+class MarketRegistry:
+    """Demand and supply schedules of many products, stored together in 2-D arrays.
+
+    Row m of `prices`, `demand` and `supply` is the market named
+    `names[m]`; its first `lengths[m]` points are the schedule as given and
+    the rest extend its end segments. Build one with `from_markets` or
+    `from_columns`, or read a catalog file with `read_catalog`.
+    """
+
+    def __init__(self, names, prices, demand, supply, lengths):
+        self.names = tuple(names)
+        self.prices = _read_only(prices)
+        self.demand = _read_only(demand)
+        self.supply = _read_only(supply)
+        self.lengths = _read_only(lengths)
+        self.index = {name: i for i, name in enumerate(self.names)}
+
+    @classmethod
+    def _from_rows(cls, names, codes, price, demand, supply):
+        price, demand, supply = (np.asarray(a, dtype=float) for a in (price, demand, supply))
+        order = np.lexsort((price, codes))
+        codes, price, demand, supply = codes[order], price[order], demand[order], supply[order]
+        counts = np.bincount(codes, minlength=len(names))
+        if counts.min() < 2:
+            raise ValueError(f"Market {names[counts.argmin()]!r} needs at least two prices, not {counts.min()}")
+        if np.any((codes[1:] == codes[:-1]) & (price[1:] == price[:-1])):
+            raise ValueError(f"Market {names[codes[1:][price[1:] == price[:-1]][0]]!r} lists a price twice")
+
+        rows = np.arange(len(names))
+        column = np.arange(len(codes)) - np.concatenate([[0], np.cumsum(counts)[:-1]])[codes]
+        # Steps past each schedule's last point; positive in the padding.
+        beyond = np.arange(counts.max())[None, :] - (counts[:, None] - 1)
+        arrays = []
+        for values in (price, demand, supply):
+            table = np.zeros((len(names), counts.max()))
+            table[codes, column] = values
+            last, before = table[rows, counts - 1], table[rows, counts - 2]
+            arrays.append(np.where(beyond > 0, last[:, None] + beyond * (last - before)[:, None], table))
+        return cls(names, *arrays, counts)
+
+    @classmethod
+    def from_markets(cls, markets):
+        """Registry of `{name: market}` where each market has the columns of `model.data`."""
+        names = list(markets)
+        columns = [[np.asarray(markets[name][column], dtype=float) for name in names]
+                   for column in ("Price (in $)", "Quantity Demanded (in scoops)", "Quantity Supplied (in scoops)")]
+        codes = np.repeat(np.arange(len(names)), [len(p) for p in columns[0]])
+        return cls._from_rows(names, codes, *(np.concatenate(c) for c in columns))
+
+    @classmethod
+    def from_columns(cls, product, price, demand, supply):
+        """Registry from long columns with one entry per product and price; products are sorted by name."""
+        names, codes = np.unique(np.asarray(product, dtype=str), return_inverse=True)
+        return cls._from_rows(names.tolist(), codes, price, demand, supply)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, name):
+        return name in self.index
+
+    def market(self, name):
+        """One product's schedule as given, with the columns of `model.data`."""
+        i = self.index[name]
+        n = self.lengths[i]
+        return {
+            "Price (in $)": _tidy(self.prices[i, :n]),
+            "Quantity Demanded (in scoops)": _tidy(self.demand[i, :n]),
+            "Quantity Supplied (in scoops)": _tidy(self.supply[i, :n]),
+        }
+
+    def solve(self, demand_shift=0, supply_shift=0, tax_on_sellers=0, tax_on_buyers=0):
+        """Equilibrium, tax burden and welfare of every market in one batch.
+
+        Shifts and taxes broadcast like `solve_markets`. Returns a dict of
+        arrays shaped `(markets, ...)` with the same names as
+        `model.lookup_equilibrium`: `quantity`, market `price`,
+        `buyer_price`, `seller_price`, each side's `buyer_burden` and
+        `seller_burden` against the untaxed market with the same shifts,
+        `consumer_surplus`, `producer_surplus`, `tax_revenue`,
+        `total_welfare` and `deadweight_loss`.
+        """
+        ds, ss, ts, tb = _per_market(len(self), demand_shift, supply_shift, tax_on_sellers, tax_on_buyers)
+        quantity, price = solve_markets(self.prices, self.demand, self.supply, ds, ss, ts, tb)
+        untaxed_quantity, untaxed_price = solve_markets(self.prices, self.demand, self.supply, ds, ss)
+        buyer_price = price + tb
+        seller_price = price - ts
+        taxed = market_welfare(self.prices, self.demand, self.supply, quantity, buyer_price, seller_price, ds, ss)
+        untaxed = market_welfare(self.prices, self.demand, self.supply, untaxed_quantity, untaxed_price, untaxed_price, ds, ss)
+        return {
+            "quantity": quantity,
+            "price": price,
+            "buyer_price": buyer_price,
+            "seller_price": seller_price,
+            "buyer_burden": buyer_price - untaxed_price,
+            "seller_burden": untaxed_price - seller_price,
+            **taxed,
+            "deadweight_loss": untaxed["total_welfare"] - taxed["total_welfare"],
+        }
+
+
+def read_catalog(path, product_column="product", price_column="price", demand_column="demand",
+                 supply_column="supply", chunksize=1_000_000):
+    """Read a CSV or Parquet catalog of product schedules into a `MarketRegistry`."""
+    columns = [product_column, price_column, demand_column, supply_column]
+    chunks = list(iter_chunks(path, columns, chunksize))
+    if not chunks:
+        raise ValueError(f"{path} has no rows")
+    return MarketRegistry.from_columns(
+        *(np.concatenate([chunk[column].to_numpy() for chunk in chunks]) for column in columns)
+    )
@@ -0,0 +1,535 @@
+"""Market model for the ice cream lesson.
+
+The lesson's market, the equilibrium solvers and the precomputed slider tables. This
+module only needs NumPy, so batch jobs and other tools can import it without
+pulling in Streamlit or matplotlib.
+"""
+import numpy as np
+
+from icecream_market.curves import ConstantElasticity, Linear, integral, interp
+
+# Every position the shift and tax sliders can take
+SHIFT_STEPS = range(-40, 41, 10)
+TAX_STEPS = range(0, 6)
+
+
+def _linear_root(x0, g0, x1, g1):
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return x0 - g0 * (x1 - x0) / (g1 - g0)
+
+
+def _trading(quantity, price, seller_price):
+    # Curves continued past the schedule can cross below zero scoops or at a
+    # price sellers would pay to sell at. No scoops change hands there, so
+    # there is no equilibrium: both come back as NaN.
+    trades = (quantity >= -1e-9) & (seller_price >= -1e-9)
+    return np.where(trades, np.maximum(quantity, 0), np.nan), np.where(trades, price, np.nan)
+
+
+def solve_equilibrium(prices, demand, supply, demand_shift=0, supply_shift=0,
+                      tax_on_sellers=0, tax_on_buyers=0):
+    """Find where the (shifted, taxed) demand and supply schedules cross.
+
+    `prices`, `demand` and `supply` describe the base market schedule as 1-D
+    arrays. Shifts move a curve sideways by a number of scoops; a tax on
+    sellers moves the supply curve up and a tax on buyers moves the demand
+    curve down. Shifts and taxes may be scalars or arrays, which are
+    broadcast against each other so a whole batch of scenarios is solved in
+    one call.
+
+    Returns `(quantity, price)` where price is the market price. Scenarios
+    where nothing trades come back as NaN: parallel curves, or curves that
+    only cross below zero scoops or below a zero price for sellers.
+    """
+    prices = np.asarray(prices, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    supply = np.asarray(supply, dtype=float)
+    order = np.argsort(prices)
+    prices, demand, supply = prices[order], demand[order], supply[order]
+
+    demand_shift, supply_shift, tax_on_sellers, tax_on_buyers = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (demand_shift, supply_shift, tax_on_sellers, tax_on_buyers))
+    )
+    shape = demand_shift.shape
+    ds = demand_shift.reshape(-1, 1)
+    ss = supply_shift.reshape(-1, 1)
+    ts = tax_on_sellers.reshape(-1, 1)
+    wedge = ts + tax_on_buyers.reshape(-1, 1)
+
+    # Excess demand as a function of the price sellers receive. Buyers pay
+    # that price plus the whole tax wedge, whichever side it is levied on.
+    def excess(p):
+        return interp(p + wedge, prices, demand) + ds - interp(p, prices, supply) - ss
+
+    # Excess demand is linear between the kinks of both curves, so testing
+    # it at every kink is enough to locate the crossing segment exactly.
+    knots = np.sort(np.concatenate([np.broadcast_to(prices, (len(ds), len(prices))), prices - wedge], axis=1), axis=1)
+    g = excess(knots)
+    crossing = (g[:, :-1] >= 0) & (g[:, 1:] <= 0) & (g[:, :-1] != g[:, 1:])
+    found = crossing.any(axis=1)
+    i = crossing.argmax(axis=1)
+    rows = np.arange(len(i))
+    seller_price = _linear_root(knots[rows, i], g[rows, i], knots[rows, i + 1], g[rows, i + 1])
+
+    # Outside the schedule both curves continue along their end segments.
+    lo, hi = knots[:, :1], knots[:, -1:]
+    above = _linear_root(hi, excess(hi), hi + 1, excess(hi + 1))[:, 0]
+    below = _linear_root(lo - 1, excess(lo - 1), lo, excess(lo))[:, 0]
+    seller_price = np.where(found, seller_price, np.where(g[:, -1] > 0, above, below))
+
+    quantity = interp(seller_price[:, None], prices, supply)[:, 0] + ss[:, 0]
+    quantity, price = _trading(quantity, seller_price + ts[:, 0], seller_price)
+
+    quantity, price = quantity.reshape(shape), price.reshape(shape)
+    if shape == ():
+        return float(quantity), float(price)
+    return quantity, price
+
+
+def _read_only(a):
+    # Always a copy: freezing the caller's own array would make their next
+    # assignment to it fail.
+    a = np.array(a, copy=True, order="C")
+    a.flags.writeable = False
+    return a
+
+
+def build_equilibrium_table(prices, demand, supply, demand_shifts=(0,), supply_shifts=(0,),
+                            seller_taxes=(0,), buyer_taxes=(0,)):
+    """Solve every combination of the given shifts and taxes in one batch.
+
+    Result arrays are indexed `[demand_shift, supply_shift, seller_tax,
+    buyer_tax]` and marked read-only so a single table can be shared by all
+    sessions. `excess_supply` is indexed `[demand_shift, supply_shift, price]`
+    and is positive for a surplus and negative for a shortage. Welfare comes
+    with each equilibrium (`consumer_surplus`, `producer_surplus`,
+    `tax_revenue`, `total_welfare`, `deadweight_loss`) and, prefixed with
+    `control_`, for a floor or ceiling at every schedule price.
+    """
+    prices = np.asarray(prices, dtype=float)
+    demand = np.asarray(demand, dtype=float)
+    supply = np.asarray(supply, dtype=float)
+    axes = {
+        "demand_shift": np.asarray(demand_shifts, dtype=float),
+        "supply_shift": np.asarray(supply_shifts, dtype=float),
+        "tax_on_sellers": np.asarray(seller_taxes, dtype=float),
+        "tax_on_buyers": np.asarray(buyer_taxes, dtype=float),
+    }
+    ds, ss, ts, tb = np.meshgrid(*axes.values(), indexing="ij")
+    quantity, price = solve_equilibrium(prices, demand, supply, ds, ss, ts, tb)
+    # Tax burden is measured against the untaxed equilibrium of the same
+    # shifted market.
+    _, untaxed_price = solve_equilibrium(prices, demand, supply, ds[..., :1, :1], ss[..., :1, :1])
+    buyer_price = price + tb
+    seller_price = price - ts
+    dsp, ssp = np.meshgrid(axes["demand_shift"], axes["supply_shift"], indexing="ij")
+    excess_supply = (supply + ssp[..., None]) - (demand + dsp[..., None])
+    surplus = welfare(prices, demand, supply, quantity, buyer_price, seller_price, ds, ss)
+    control = price_control_welfare(prices, demand, supply, prices, dsp[..., None], ssp[..., None])
+    untaxed_welfare = (control["total_welfare"] + control["deadweight_loss"])[..., :1, None]
+
+    table = {
+        "quantity": quantity,
+        "price": price,
+        "buyer_price": buyer_price,
+        "seller_price": seller_price,
+        "buyer_burden": buyer_price - untaxed_price,
+        "seller_burden": untaxed_price - seller_price,
+        "excess_supply": excess_supply,
+        **surplus,
+        "deadweight_loss": untaxed_welfare - surplus["total_welfare"],
+        **{f"control_{name}": values for name, values in control.items()},
+    }
+    table = {k: _read_only(v) for k, v in table.items()}
+    table["axes"] = {k: _read_only(v) for k, v in axes.items()}
+    table["index"] = {k: {v: i for i, v in enumerate(a.tolist())} for k, a in axes.items()}
+    table["index"]["price"] = {v: i for i, v in enumerate(prices.tolist())}
+    table["schedule"] = (_read_only(prices), _read_only(demand), _read_only(supply))
+    return table
+
+
+def lookup_equilibrium(table, demand_shift=0, supply_shift=0, tax_on_sellers=0, tax_on_buyers=0):
+    """Return the precomputed equilibrium for one slider position.
+
+    Values that fall outside the table's grid are solved on the spot, so a
+    lookup never fails; it just stops being O(1).
+    """
+    key = {
+        "demand_shift": demand_shift,
+        "supply_shift": supply_shift,
+        "tax_on_sellers": tax_on_sellers,
+        "tax_on_buyers": tax_on_buyers,
+    }
+    try:
+        i = tuple(table["index"][k][float(v)] for k, v in key.items())
+    except KeyError:
+        table = build_equilibrium_table(*table["schedule"], *([v] for v in key.values()))
+        i = (0, 0, 0, 0)
+    return {
+        name: float(table[name][i])
+        for name in ("quantity", "price", "buyer_price", "seller_price", "buyer_burden", "seller_burden",
+                     "consumer_surplus", "producer_surplus", "tax_revenue", "total_welfare", "deadweight_loss")
+    }
+
+
+def lookup_excess_supply(table, price, demand_shift=0, supply_shift=0):
+    """Return supply minus demand at `price` for one pair of shifts.
+
+    Prices between the schedule's points are interpolated.
+    """
+    index = table["index"]
+    row = table["excess_supply"][index["demand_shift"][float(demand_shift)], index["supply_shift"][float(supply_shift)]]
+    i = index["price"].get(float(price))
+    if i is None:
+        return float(interp(float(price), table["schedule"][0], row))
+    return float(row[i])
+
+
+def lookup_price_control(table, price, demand_shift=0, supply_shift=0):
+    """Return the quantity traded and welfare with the price held at `price`.
+
+    Prices and shifts off the table's grid are solved on the spot.
+    """
+    index = table["index"]
+    try:
+        i = (index["demand_shift"][float(demand_shift)], index["supply_shift"][float(supply_shift)], index["price"][float(price)])
+    except KeyError:
+        return price_control_welfare(*table["schedule"], price, demand_shift, supply_shift)
+    return {
+        name: float(table[f"control_{name}"][i])
+        for name in ("quantity", "consumer_surplus", "producer_surplus", "total_welfare", "deadweight_loss")
+    }
+
+
+def _inverse(quantity, prices, quantities):
+    # Price at which a monotone schedule reaches `quantity`, extrapolated
+    # along its end segments like `interp`.
+    order = np.argsort(quantities, kind="stable")
+    return interp(quantity, quantities[order], prices[order])
+
+
+def _sorted_schedule(prices, demand, supply):
+    prices = np.asarray(prices, dtype=float)
+    order = np.argsort(prices)
+    return prices[order], np.asarray(demand, dtype=float)[order], np.asarray(supply, dtype=float)[order]
+
+
+def welfare(prices, demand, supply, quantity, buyer_price, seller_price, demand_shift=0, supply_shift=0):
+    """Consumer surplus, producer surplus and tax revenue of a market outcome.
+
+    `quantity` scoops change hands, buyers pay `buyer_price` and sellers
+    receive `seller_price`: the equilibrium of a shifted or taxed market, or
+    what trades under a price floor or ceiling. Each surplus is the area
+    between a curve and the price its side faces over the scoops traded,
+    integrated over the schedule with the trapezoid rule. Arguments are
+    broadcast, so a whole batch of scenarios is integrated in one pass.
+
+    Returns a dict of `consumer_surplus`, `producer_surplus`, `tax_revenue`
+    and `total_welfare` (floats when every argument is a number).
+    """
+    prices, demand, supply = _sorted_schedule(prices, demand, supply)
+    quantity, buyer_price, seller_price, ds, ss = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (quantity, buyer_price, seller_price, demand_shift, supply_shift))
+    )
+    # Buyers value the last scoop traded at the demand price for that
+    # quantity and the first at the choke price where demand runs out;
+    # sellers' costs run from where supply starts up to the supply price.
+    # When a control rations the market these differ from the price paid.
+    demand_price = _inverse(quantity - ds, prices, demand)
+    choke_price = _inverse(-ds, prices, demand)
+    supply_price = _inverse(quantity - ss, prices, supply)
+    reserve_price = _inverse(-ss, prices, supply)
+    consumer = (integral(demand_price, choke_price, prices, demand) + ds * (choke_price - demand_price)
+                + (demand_price - buyer_price) * quantity)
+    producer = (integral(reserve_price, supply_price, prices, supply) + ss * (supply_price - reserve_price)
+                + (seller_price - supply_price) * quantity)
+    revenue = (buyer_price - seller_price) * quantity
+
+    result = {
+        "consumer_surplus": consumer,
+        "producer_surplus": producer,
+        "tax_revenue": revenue,
+        "total_welfare": consumer + producer + revenue,
+    }
+    if quantity.ndim == 0:
+        return {name: float(value) for name, value in result.items()}
+    return result
+
+
+def price_control_welfare(prices, demand, supply, price, demand_shift=0, supply_shift=0):
+    """Quantity traded and welfare with the market price held at `price`.
+
+    Under a floor or ceiling only the short side of the market trades.
+    Returns `quantity`, the surpluses and `total_welfare` from `welfare` and
+    the `deadweight_loss` against the free market of the same shifted
+    curves; arguments broadcast like `welfare`.
+    """
+    prices, demand, supply = _sorted_schedule(prices, demand, supply)
+    price = np.asarray(price, dtype=float)
+    quantity = np.maximum(np.minimum(interp(price, prices, demand) + demand_shift, interp(price, prices, supply) + supply_shift), 0)
+    controlled = welfare(prices, demand, supply, quantity, price, price, demand_shift, supply_shift)
+    free_quantity, free_price = solve_equilibrium(prices, demand, supply, demand_shift, supply_shift)
+    free = welfare(prices, demand, supply, free_quantity, free_price, free_price, demand_shift, supply_shift)
+    result = {
+        "quantity": quantity,
+        "consumer_surplus": controlled["consumer_surplus"],
+        "producer_surplus": controlled["producer_surplus"],
+        "total_welfare": controlled["total_welfare"],
+        "deadweight_loss": np.subtract(free["total_welfare"], controlled["total_welfare"]),
+    }
+    if np.ndim(result["deadweight_loss"]) == 0:
+        return {name: float(value) for name, value in result.items()}
+    return result
+
+
+def welfare_outline(prices, demand, supply, low, high, demand_shift=0, supply_shift=0):
+    """Points for shading welfare areas between `low` and `high` scoops.
+
+    Returns `(quantity, demand_price, supply_price)`: the prices on each
+    curve at every kink of either curve in the range, so an area filled
+    between these points is exactly the one `welfare` integrates.
+    """
+    prices, demand, supply = _sorted_schedule(prices, demand, supply)
+    knots = np.concatenate([[low, high], demand + demand_shift, supply + supply_shift])
+    quantity = np.unique(knots[(knots >= low) & (knots <= high)])
+    return quantity, _inverse(quantity - demand_shift, prices, demand), _inverse(quantity - supply_shift, prices, supply)
+
+
+def tax_incidence(prices, demand, supply, taxes, levied_on="sellers", demand_shift=0, supply_shift=0):
+    """Who pays a per-scoop tax, what it raises and what it destroys.
+
+    `taxes` is a number or an array of tax levels, all levied on "sellers"
+    or on "buyers"; every level is solved in one vectorized pass. Returns a
+    dict of arrays shaped like `taxes` (floats for a single tax) with the
+    market `price`, `quantity`, `buyer_price`, `seller_price`, each side's
+    `buyer_burden`/`seller_burden` in $ and as a `buyer_share`/`seller_share`
+    of the tax, the government's `revenue`, the `consumer_surplus` and
+    `producer_surplus` left and the `deadweight_loss`: the surplus lost on
+    the scoops that are no longer traded.
+    """
+    if levied_on not in ("sellers", "buyers"):
+        raise ValueError(f'levied_on must be "sellers" or "buyers", not {levied_on!r}')
+    prices = np.asarray(prices, dtype=float)
+    order = np.argsort(prices)
+    prices = prices[order]
+    demand = np.asarray(demand, dtype=float)[order]
+    supply = np.asarray(supply, dtype=float)[order]
+    taxes = np.asarray(taxes, dtype=float)
+    ts, tb = (taxes, 0) if levied_on == "sellers" else (0, taxes)
+
+    quantity, price = (np.asarray(v) for v in solve_equilibrium(prices, demand, supply, demand_shift, supply_shift, ts, tb))
+    untaxed_quantity, untaxed_price = solve_equilibrium(prices, demand, supply, demand_shift, supply_shift)
+    buyer_price = price + tb
+    seller_price = price - ts
+    buyer_burden = buyer_price - untaxed_price
+    seller_burden = untaxed_price - seller_price
+    # The deadweight loss is the welfare the untaxed market had that neither
+    # side nor the government gets back.
+    taxed = welfare(prices, demand, supply, quantity, buyer_price, seller_price, demand_shift, supply_shift)
+    untaxed = welfare(prices, demand, supply, untaxed_quantity, untaxed_price, untaxed_price, demand_shift, supply_shift)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        shares = np.where(taxes != 0, buyer_burden / taxes, np.nan)
+
+    result = {
+        "price": price,
+        "quantity": quantity,
+        "buyer_price": buyer_price,
+        "seller_price": seller_price,
+        "buyer_burden": buyer_burden,
+        "seller_burden": seller_burden,
+        "buyer_share": shares,
+        "seller_share": 1 - shares,
+        "revenue": taxes * quantity,
+        "consumer_surplus": taxed["consumer_surplus"],
+        "producer_surplus": taxed["producer_surplus"],
+        "deadweight_loss": untaxed["total_welfare"] - taxed["total_welfare"],
+    }
+    if taxes.ndim == 0:
+        return {name: float(value) for name, value in result.items()}
+    return result
+
+
+class PriceIndex:
+    """Quantities demanded and supplied of a market schedule, looked up by price.
+
+    A price on the schedule is a dict hit; any other price is interpolated
+    between its neighbours after a binary search. `quantities` also accepts
+    arrays of prices and answers them in one vectorized pass.
+    """
+
+    def __init__(self, prices, demand, supply):
+        prices = np.asarray(prices, dtype=float)
+        order = np.argsort(prices, kind="stable")
+        self.prices = _read_only(prices[order])
+        self.demand = _read_only(np.asarray(demand, dtype=float)[order])
+        self.supply = _read_only(np.asarray(supply, dtype=float)[order])
+        self._rows = {p: i for i, p in enumerate(self.prices.tolist())}
+
+    @classmethod
+    def from_market(cls, market):
+        return cls(market["Price (in $)"], market["Quantity Demanded (in scoops)"], market["Quantity Supplied (in scoops)"])
+
+    def quantities(self, price):
+        """(quantity demanded, quantity supplied) at `price`, a number or an array of prices."""
+        if np.ndim(price) == 0:
+            i = self._rows.get(float(price))
+            if i is not None:
+                return float(self.demand[i]), float(self.supply[i])
+            price = float(price)
+            return float(interp(price, self.prices, self.demand)), float(interp(price, self.prices, self.supply))
+        price = np.asarray(price, dtype=float)
+        return interp(price, self.prices, self.demand), interp(price, self.prices, self.supply)
+
+
+class Schedule:
+    """Read-only demand and supply schedule, shared by every session.
+
+    `shifted`, `taxed` and slicing return lightweight views: they share the
+    base arrays and only record their offsets, so a scenario costs a few
+    numbers until its shifted quantities or taxed prices are actually read.
+    `supply_price` and `demand_price` are the prices each curve is drawn at
+    once a tax moves it up (on sellers) or down (on buyers).
+    """
+
+    def __init__(self, price, demand, supply, demand_shift=0, supply_shift=0, tax_on_sellers=0, tax_on_buyers=0):
+        self.base_price = _read_only(np.asarray(price))
+        self.base_demand = _read_only(np.asarray(demand))
+        self.base_supply = _read_only(np.asarray(supply))
+        self.demand_shift = demand_shift
+        self.supply_shift = supply_shift
+        self.tax_on_sellers = tax_on_sellers
+        self.tax_on_buyers = tax_on_buyers
+
+    @classmethod
+    def from_market(cls, market):
+        return cls(market["Price (in $)"], market["Quantity Demanded (in scoops)"], market["Quantity Supplied (in scoops)"])
+
+    def _view(self, rows=slice(None), **offsets):
+        view = object.__new__(Schedule)
+        view.__dict__.update(self.__dict__)
+        # Basic slices of a NumPy array are views, so no rows are copied.
+        view.base_price = self.base_price[rows]
+        view.base_demand = self.base_demand[rows]
+        view.base_supply = self.base_supply[rows]
+        for name, offset in offsets.items():
+            setattr(view, name, getattr(self, name) + offset)
+        return view
+
+    def shifted(self, demand=0, supply=0):
+        """View with every quantity demanded/supplied moved by a fixed number of scoops."""
+        return self._view(demand_shift=demand, supply_shift=supply)
+
+    def taxed(self, on_sellers=0, on_buyers=0):
+        """View with a per-scoop tax on sellers and/or buyers."""
+        return self._view(tax_on_sellers=on_sellers, tax_on_buyers=on_buyers)
+
+    def __getitem__(self, rows):
+        if not isinstance(rows, slice):
+            raise TypeError("Schedule rows can only be sliced")
+        return self._view(rows)
+
+    def __len__(self):
+        return len(self.base_price)
+
+    @property
+    def price(self):
+        return self.base_price
+
+    @property
+    def demand(self):
+        return self.base_demand + self.demand_shift if self.demand_shift else self.base_demand
+
+    @property
+    def supply(self):
+        return self.base_supply + self.supply_shift if self.supply_shift else self.base_supply
+
+    @property
+    def supply_price(self):
+        return self.base_price + self.tax_on_sellers if self.tax_on_sellers else self.base_price
+
+    @property
+    def demand_price(self):
+        return self.base_price - self.tax_on_buyers if self.tax_on_buyers else self.base_price
+
+
+def build_slider_table(market=None):
+    """Equilibrium table over every slider position for `market` (default: the lesson's data)."""
+    market = data if market is None else market
+    return build_equilibrium_table(
+        market["Price (in $)"], market["Quantity Demanded (in scoops)"], market["Quantity Supplied (in scoops)"],
+        demand_shifts=SHIFT_STEPS, supply_shifts=SHIFT_STEPS, seller_taxes=TAX_STEPS, buyer_taxes=TAX_STEPS
+    )
+
+
+def _bisect_seller_price(demand, supply, ds, ss, wedge, iterations=100):
+    # Excess demand falls as the price rises, so a bracket that doubles until
+    # supply catches up followed by bisection converges for any curve pair.
+    # Each step is one binary search per curve even for tabulated schedules
+    # with millions of points.
+    def excess(p):
+        return demand.quantity(p + wedge) + ds - supply.quantity(p) - ss
+
+    lo = np.zeros(ds.shape)
+    hi = np.ones(ds.shape)
+    for _ in range(64):
+        rising = excess(hi) > 0
+        if not rising.any():
+            break
+        lo = np.where(rising, hi, lo)
+        hi = np.where(rising, hi * 2, hi)
+    for _ in range(iterations):
+        mid = (lo + hi) / 2
+        above = excess(mid) > 0
+        lo = np.where(above, mid, lo)
+        hi = np.where(above, hi, mid)
+    # Finish with a secant step, which is exact once the bracket sits on one
+    # linear piece of a tabulated schedule.
+    g_lo, g_hi = excess(lo), excess(hi)
+    seller_price = np.where(g_lo != g_hi, lo - g_lo * (hi - lo) / (g_hi - g_lo), (lo + hi) / 2)
+    # No positive price clears a market whose supply already exceeds demand at zero.
+    return np.where(excess(np.zeros(ds.shape)) < 0, np.nan, seller_price)
+
+
+def market_equilibrium(demand, supply, demand_shift=0, supply_shift=0, tax_on_sellers=0, tax_on_buyers=0):
+    """Equilibrium of two curve models, shifted and taxed like `solve_equilibrium`.
+
+    Linear curves, and constant-elasticity curves without shifts or taxes,
+    are solved in closed form. Any other pair, including tabulated schedules,
+    is bisected; every branch is vectorized over the scenarios.
+    Returns `(quantity, price)` where price is the market price, NaN where
+    nothing trades like `solve_equilibrium`.
+    """
+    ds, ss, ts, tb = np.broadcast_arrays(
+        *(np.asarray(v, dtype=float) for v in (demand_shift, supply_shift, tax_on_sellers, tax_on_buyers))
+    )
+    wedge = ts + tb
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if isinstance(demand, Linear) and isinstance(supply, Linear):
+            seller_price = (demand.intercept + ds - supply.intercept - ss + demand.slope * wedge) / (supply.slope - demand.slope)
+        elif (isinstance(demand, ConstantElasticity) and isinstance(supply, ConstantElasticity)
+              and not (ds.any() or ss.any() or wedge.any())):
+            seller_price = (demand.scale / supply.scale) ** (1 / (supply.elasticity - demand.elasticity))
+        else:
+            seller_price = _bisect_seller_price(demand, supply, ds, ss, wedge)
+    quantity = supply.quantity(seller_price) + ss
+    quantity, price = _trading(quantity, seller_price + ts, seller_price)
+    if price.shape == ():
+        return float(quantity), float(price)
+    return quantity, price
+
+
+# The lesson's market: every extra dollar costs 10 scoops of demand and brings
+# 10 more scoops of supply.
+demand_curve = Linear(80, -10)
+supply_curve = Linear(0, 10)
+
+# Dummy data for ice-cream sales, tabulated from the curves at whole-dollar prices
+price_points = np.arange(1, 8)
+data = {
+    "Price (in $)": price_points.tolist(),
+    "Quantity Demanded (in scoops)": demand_curve.quantity(price_points).tolist(),
+    "Quantity Supplied (in scoops)": supply_curve.quantity(price_points).tolist()
+}
+
+# Equilibrium of the original market
+equilibrium_quantity, equilibrium_price = market_equilibrium(demand_curve, supply_curve)
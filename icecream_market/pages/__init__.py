@@ -0,0 +1 @@
+"""Streamlit chapters of the lesson, grouped by topic."""
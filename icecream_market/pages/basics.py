@@ -0,0 +1,203 @@
+"""Chapters on how demand and supply each respond to price."""
+import numpy as np
+import streamlit as st
+
+from icecream_market import model
+from icecream_market.pages.common import (
+    CROWD_SPREADS, callout, load_crowd_market, load_price_index, load_schedule, price_input, show_chart, show_table
+)
+from icecream_market.timing import span, timed_section
+
+
+@st.fragment
+@timed_section
+def demand_section():
+    market = load_schedule()
+
+    # Demand changes with price
+    st.subheader("🍨 How Does Demand Change with Price?")
+
+    st.write("""
+    On a hot summer day at the park, the ice cream stand attracts many visitors. The price of the ice cream decides how many of them will buy the ice cream and in what quantity.
+
+    - If the price is low, more people will want to buy ice cream (high demand).
+    - If the price is high, fewer people will buy it (low demand).
+
+    This relationship shows the **law of demand**, which states that, *all other things being constant* (like consumer preferences, income, and the prices of other goods), the quantity demanded of ice cream decreases as the price increases. The following table shows an example of how demand for ice cream changes with price.
+    """)
+
+    # Display the demand data in table
+    show_table(["Price (in $)", "Quantity Demanded (in scoops)"])
+
+    # Add a line break
+    st.write("")
+
+    st.write("""    
+    Let's look at the graph below to see how demand changes with the price.
+    """)
+
+    # Number input for price
+    price = price_input("Enter the Price of Ice Cream (in $)", value=4)
+    # Calculate the corresponding quantity demanded based on the price
+    with span("solve"):
+        quantity_demanded, _ = load_price_index().quantities(price)
+
+    def draw_demand_curve(ax):
+        # Plotting demand curve only
+        ax.plot(market.demand, market.price, label="Demand curve", color='blue', linewidth=3, alpha=0.4)
+        ax.set_xlabel("Quantity Demanded (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Demand Curve for Ice Cream")
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=7, loc='best')
+        ax.scatter(market.demand, market.price, color='blue', s=40, alpha=0.4)
+        # Highlight the operating point
+        ax.scatter(quantity_demanded, price, color='blue', s=100, zorder=5, label='Current demand')
+        # Add annotation for the demand value
+        ax.annotate(
+            f'${price:g}',
+            xy=(quantity_demanded, price),
+            xytext=(quantity_demanded-1, price-0.4),
+            fontsize=9,
+            verticalalignment='center'
+        )
+        ax.annotate(
+            f'{quantity_demanded:g} scoops',
+            xy=(quantity_demanded, price),
+            xytext=(quantity_demanded + 2, price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+        ax.legend(fontsize=7, loc='best')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("demand-curve", {"price": price}, draw_demand_curve)
+
+    callout("""
+        <strong>Law of Demand</strong> - The quantity demanded of a product decreases as the price increases, all other things being constant.
+    """)
+    st.write("")
+
+
+@st.fragment
+@timed_section
+def supply_section():
+    market = load_schedule()
+
+    # Supply changes with price
+    st.subheader("🍨 How Does Supply Change with Price?")
+
+    st.write("""
+    Now, let’s consider the sellers at the ice cream stand. The price of ice cream also affects how much ice cream sellers want to make and sell.
+
+    - If the price is high, sellers want to supply more ice cream (high supply).
+    - If the price is low, sellers will supply less ice cream (low supply).
+
+    The reason is because when the price is high, the seller can earn more profit, which incentivizes increased production. Conversely, when prices are low, the potential profits decrease, which discourages production. Sellers may choose to produce less because it may not be worth the cost or effort, leading to lower supply.
+
+    This relationship shows the **law of supply**, which states that, *all other things being constant* (like production costs, technology, and the number of people), the quantity supplied of ice cream increases as the price increases. The following table shows an example of how supply of ice cream changes with price.
+    """)
+
+    show_table(["Price (in $)", "Quantity Supplied (in scoops)"])
+
+
+    st.write("")
+
+    st.write("""
+    Let's look at the graph below to see how supply changes with price.
+    """)
+
+    # Number input for price
+    price = price_input("Enter the Price of Ice Cream (in $) ", value=4)
+    # Calculate the corresponding quantity supplied based on the price
+    with span("solve"):
+        _, quantity_supplied = load_price_index().quantities(price)
+
+    def draw_supply_curve(ax):
+        # Plotting supply curve only
+        ax.plot(market.supply, market.price, label="Supply curve", color='green', linewidth=3, alpha=0.4)
+        ax.set_xlabel("Quantity Supplied (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Supply Curve for Ice Cream")
+        ax.grid(alpha=0.3)
+        ax.scatter(market.supply, market.price, color='green', s=50, alpha=0.4)
+        # Highlight the operating points
+        ax.scatter(quantity_supplied, price, color='green', s=100, zorder=5, label='Current supply')
+        ax.legend(fontsize=7, loc='best')
+        # Add annotation for the supply value
+        ax.annotate(
+            f'${price:g}',
+            xy=(quantity_supplied, price),
+            xytext=(quantity_supplied - 1, price+0.4),
+            fontsize=9,
+            verticalalignment='center'
+        )
+        ax.annotate(
+            f'{quantity_supplied:g} scoops',
+            xy=(quantity_supplied, price),
+            xytext=(quantity_supplied + 2, price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+    cpl1, col2, col3 = st.columns([1, 12, 1])
+    with col2:
+        show_chart("supply-curve", {"price": price}, draw_supply_curve)
+
+
+    callout("""
+        <strong>Law of Supply</strong> - The quantity supplied of a product increases as the price increases, all other things being constant.
+    """)
+    st.write("")
+
+
+# Crowd sizes to pick from, by label; 80 buyers and 80 sellers is the lesson's market
+CROWD_SIZES = {f"{count:,}": count for count in (80, 800, 8_000, 80_000, 800_000)}
+
+
+@st.fragment
+@timed_section
+def crowd_section():
+    st.subheader("🍨 Where Do the Demand and Supply Curves Come From?")
+
+    st.write("""
+    Every visitor to the park has a most they would pay for a scoop, and every seller has a least they would sell one for. These are their **reservation prices**. At any price, demand is simply the number of buyers whose reservation price is at least that high, and supply is the number of sellers whose reservation price is at most that high.
+
+    Let's simulate a crowd of buyers and sellers, each wanting or offering one scoop, and see the curves emerge. Try a bigger crowd: the individual steps disappear and the curves become smooth.
+    """)
+
+    count = CROWD_SIZES[st.select_slider("Number of buyers (and of sellers)", options=list(CROWD_SIZES))]
+    spread = st.radio("Reservation prices are spread", list(CROWD_SPREADS), horizontal=True)
+    if st.button("Draw a new crowd"):
+        st.session_state["crowd_seed"] = st.session_state.get("crowd_seed", 0) + 1
+    seed = st.session_state.get("crowd_seed", 0)
+
+    crowd = load_crowd_market(count, spread, seed)
+    price = np.asarray(crowd["Price (in $)"])
+    demand = np.asarray(crowd["Quantity Demanded (in scoops)"])
+    supply = np.asarray(crowd["Quantity Supplied (in scoops)"])
+    with span("solve"):
+        quantity, equilibrium_price = model.solve_equilibrium(price, demand, supply)
+
+    def draw_crowd(ax):
+        ax.plot(demand, price, label="Demand from the crowd", color='blue', linewidth=2, alpha=0.6)
+        ax.plot(supply, price, label="Supply from the crowd", color='green', linewidth=2, alpha=0.6)
+        # The lesson's straight lines, scaled up to the size of the crowd
+        scale = count / 80
+        ax.plot(model.demand_curve.quantity(price) * scale, price, label="Lesson's curves, scaled", color='k', linestyle='--', linewidth=1, alpha=0.4)
+        ax.plot(model.supply_curve.quantity(price) * scale, price, color='k', linestyle='--', linewidth=1, alpha=0.4)
+        ax.scatter([quantity], [equilibrium_price], color='k', zorder=5, s=50, label=f'Equilibrium (${equilibrium_price:.2f}, {quantity:,.0f} scoops)')
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+    with col2:
+        show_chart("crowd", {"count": count, "spread": spread, "seed": seed}, draw_crowd)
+
+    st.write(f"""
+    With **{count:,}** buyers and **{count:,}** sellers, **{quantity:,.0f}** scoops change hands at **\${equilibrium_price:.2f}**. When reservation prices are spread evenly, the crowd's curves follow the lesson's straight lines; when most people value a scoop at around \$4, the curves bend and are steepest near that price.
+    """)
@@ -0,0 +1,436 @@
+"""Helpers and per-process resources shared by every chapter."""
+import base64
+import functools
+import json
+import logging
+import mimetypes
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from icecream_market import dynamics, model
+from icecream_market.agents import Population, generate_market, lesson_populations
+from icecream_market.curves import Linear
+from icecream_market.ingest import aggregate_schedule
+from icecream_market.markets import read_catalog
+from icecream_market.related import lesson_goods
+from icecream_market.rendering import (
+    DPI_PROFILES, IMAGE_FORMATS, FigurePool, RenderCache, chart_key, is_svg, render_chart, sent_bytes
+)
+from icecream_market.timing import span
+from icecream_market.vegalite import chart_spec
+
+# "matplotlib" rasterizes charts on the server; "vega-lite" sends a chart spec
+# and lets the browser draw it.
+CHART_BACKENDS = ("matplotlib", "vega-lite")
+
+
+# Loaders below that depend on the market are cached per market, up to this
+# many markets each, and called without it: see `for_current_market`.
+MARKET_CACHE_ENTRIES = 32
+
+# Set on the prefetch thread, which has no session to read the market from.
+_prefetching = threading.local()
+
+_log = logging.getLogger(__name__)
+
+
+# Many products' schedules from the catalog named by ICECREAM_CATALOG, for
+# the market selector; None without one.
+@st.cache_resource
+def load_catalog():
+    path = os.environ.get("ICECREAM_CATALOG")
+    if path:
+        return read_catalog(path)
+    return None
+
+
+# Every catalog market's untaxed equilibrium, solved in one batch.
+@st.cache_resource
+def load_catalog_equilibria():
+    return load_catalog().solve()
+
+
+def current_market():
+    """The catalog product this session is studying; None for the lesson's own market."""
+    if hasattr(_prefetching, "market"):
+        return _prefetching.market
+    return st.session_state.get("market")
+
+
+def for_current_market(cached):
+    """Call the cached loader `cached(market, ...)` for this session's market."""
+    @functools.wraps(cached)
+    def loader(*args):
+        return cached(current_market(), *args)
+
+    return loader
+
+
+# The market every chapter teaches with: a product from the catalog, or
+# else the built-in ice cream data, a schedule aggregated once per process
+# from the sales log named by ICECREAM_SALES_DATA, or ICECREAM_AGENTS
+# simulated buyers and sellers.
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES)
+def load_market_data(market):
+    if market is not None:
+        return load_catalog().market(market)
+    path = os.environ.get("ICECREAM_SALES_DATA")
+    if path:
+        high = os.environ.get("ICECREAM_SALES_MAX_PRICE")
+        return aggregate_schedule(
+            path, bin_width=float(os.environ.get("ICECREAM_SALES_BIN_WIDTH", 1)), high=float(high) if high else None
+        )
+    agents = os.environ.get("ICECREAM_AGENTS")
+    if agents:
+        return generate_market(*lesson_populations(int(agents)))
+    return model.data
+
+
+# Crowds of simulated buyers and sellers for the chapter on where the curves
+# come from, one per population size, spread and draw.
+CROWD_SPREADS = {
+    "Evenly between $0 and $8": ("uniform", {"low": 0, "high": 8}),
+    "Mostly close to $4": ("normal", {"loc": 4, "scale": 2}),
+}
+
+
+@st.cache_resource(max_entries=32, show_spinner=False)
+def load_crowd_market(count, spread, seed):
+    distribution, params = CROWD_SPREADS[spread]
+    with span("data"):
+        return generate_market(
+            Population(count, distribution, **params), Population(count, distribution, **params),
+            prices=np.round(np.arange(0, 81) * 0.1, 10), seed=seed
+        )
+
+
+# Solve every reachable slider combination once per process; reruns only look
+# the answer up in this shared, read-only table. Loaders that the next chapter
+# is prefetched with show no spinner: they may run outside any page.
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES, show_spinner=False)
+def load_equilibrium_table(market):
+    return model.build_slider_table(load_market_data())
+
+
+# The market's schedule as read-only arrays, shared by every session; chapters
+# take shifted or taxed views of it instead of copying it.
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES)
+def load_schedule(market):
+    with span("data"):
+        return model.Schedule.from_market(load_market_data())
+
+
+# Price -> quantity lookups for the operating points the chapters highlight.
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES)
+def load_price_index(market):
+    return model.PriceIndex.from_market(load_market_data())
+
+
+# Tax incidence at every position of the tax sliders, for each side a tax
+# can be levied on, solved in one vectorized pass per side.
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES, show_spinner=False)
+def load_tax_incidence(market, levied_on):
+    market = load_schedule()
+    return model.tax_incidence(market.price, market.demand, market.supply, np.asarray(model.TAX_STEPS), levied_on)
+
+
+def tax_incidence_at(tax, levied_on):
+    """Prices, burdens, revenue and deadweight loss for one tax level, as floats."""
+    with span("solve"):
+        if tax not in model.TAX_STEPS:
+            market = load_schedule()
+            return model.tax_incidence(market.price, market.demand, market.supply, tax, levied_on)
+        i = model.TAX_STEPS.index(tax)
+        return {name: float(values[i]) for name, values in load_tax_incidence(levied_on).items()}
+
+
+# Price paths for the adjustment animation, from the user's surplus and
+# shortage prices plus a fan of prices across the schedule, all simulated in
+# one vectorized pass. Only the most recent inputs are kept.
+@for_current_market
+@st.cache_resource(max_entries=64, show_spinner=False)
+def load_adjustment(market, rule, start_prices, rounds):
+    market = load_schedule()
+    fan = np.linspace(market.price.min(), market.price.max(), 9)
+    starts = np.concatenate([start_prices, fan])
+    with span("solve"):
+        return dynamics.simulate_adjustment(market.price, market.demand, market.supply, starts, rounds, rule)
+
+
+# Ice cream linked to frozen yogurt (a substitute) and cones (a complement),
+# with straight ice cream curves fitted to the market's schedule, solved
+# jointly at every position of the related goods' supply sliders in one
+# batch: the system is inverted once and each position is a column.
+YOGURT_SHIFTS = range(-20, 25, 5)
+CONE_SHIFTS = range(-40, 50, 10)
+
+
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES, show_spinner=False)
+def load_related_goods(market):
+    market = load_schedule()
+    return lesson_goods(Linear.fit(market.price, market.demand), Linear.fit(market.price, market.supply))
+
+
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES, show_spinner=False)
+def load_related_goods_table(market):
+    shifts = np.zeros((3, len(YOGURT_SHIFTS), len(CONE_SHIFTS)))
+    shifts[1] = np.asarray(YOGURT_SHIFTS)[:, None]
+    shifts[2] = np.asarray(CONE_SHIFTS)[None, :]
+    with span("solve"):
+        return load_related_goods().solve(supply_shift=shifts)
+
+
+def related_goods_at(yogurt_shift, cone_shift):
+    """Every good's equilibrium with frozen yogurt and cone supply shifted by these amounts."""
+    table = load_related_goods_table()
+    position = YOGURT_SHIFTS.index(yogurt_shift), CONE_SHIFTS.index(cone_shift)
+    return {name: values[(slice(None),) + position] for name, values in table.items()}
+
+
+def base_equilibrium():
+    """(quantity, price) where the unshifted, untaxed market clears."""
+    with span("solve"):
+        equilibrium = model.lookup_equilibrium(load_equilibrium_table())
+    return equilibrium["quantity"], equilibrium["price"]
+
+
+def base_welfare():
+    """Consumer surplus, producer surplus and total welfare at the base equilibrium."""
+    with span("solve"):
+        equilibrium = model.lookup_equilibrium(load_equilibrium_table())
+    return {name: equilibrium[name] for name in ("consumer_surplus", "producer_surplus", "total_welfare")}
+
+
+def price_control_at(price):
+    """Quantity traded and welfare with the base market's price held at `price`."""
+    with span("solve"):
+        return model.lookup_price_control(load_equilibrium_table(), price)
+
+
+# Finished chart images shared by all sessions, so a chart whose inputs did not
+# change is never drawn or rasterized again.
+@st.cache_resource
+def load_render_cache():
+    return RenderCache(max_bytes=int(os.environ.get("RENDER_CACHE_MAX_BYTES", 64 * 1024 * 1024)))
+
+
+# Charts are drawn on figures borrowed from a small per-process pool instead of
+# pyplot's global figure list, so nothing is left open between reruns.
+@st.cache_resource
+def load_figure_pool():
+    return FigurePool()
+
+
+# One background thread per process that solves the next chapter's tables
+# while the current one is being read.
+@st.cache_resource
+def load_prefetcher():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix="prefetch")
+
+
+def prefetch(warm):
+    """Run `warm` on the prefetch thread, for this session's market."""
+    market = current_market()
+
+    def run():
+        _prefetching.market = market
+        try:
+            warm()
+        finally:
+            del _prefetching.market
+
+    load_prefetcher().submit(run).add_done_callback(_log_prefetch_failure)
+
+
+def _log_prefetch_failure(future):
+    # Nobody waits on a prefetch, so a broken loader would otherwise only
+    # show up once a student opens the chapter it was warming.
+    if not future.cancelled() and future.exception() is not None:
+        _log.error("Prefetching the next chapter failed", exc_info=future.exception())
+
+
+def _price_bounds(value, side):
+    # Price range of the loaded schedule, optionally only the part above or
+    # below the equilibrium, with `value` clamped into it. The range always
+    # keeps at least two of the schedule's prices: with the equilibrium past
+    # the last one (or the first), or no equilibrium at all, it starts from
+    # the neighbouring price instead of collapsing to a single point.
+    prices = load_market_data()["Price (in $)"]
+    _, equilibrium_price = base_equilibrium()
+    low, high = prices[0], prices[-1]
+    if side == "above":
+        low = prices[min(np.searchsorted(prices, equilibrium_price, side="left"), len(prices) - 2)]
+    elif side == "below":
+        high = prices[max(np.searchsorted(prices, equilibrium_price, side="right") - 1, 1)]
+    value = min(max(value, low), high)
+    step = prices[1] - prices[0]
+    if any(isinstance(v, float) for v in (low, high, step)):
+        return float(low), float(high), float(value), float(step)
+    return low, high, value, step
+
+
+def price_input(label, value, side=None, key=None):
+    """Number input over the market's prices; `side` is "above" or "below" the equilibrium.
+
+    Any price in range can be typed in, not only the schedule's own points.
+    """
+    low, high, value, step = (float(v) for v in _price_bounds(value, side))
+    return st.number_input(label, min_value=low, max_value=high, value=value, step=step, format="%g", key=key)
+
+
+def price_slider(label, value, side=None):
+    """Slider over the market's prices; `side` is "above" or "below" the equilibrium."""
+    low, high, value, step = _price_bounds(value, side)
+    return st.slider(label, min_value=low, max_value=high, value=value, step=step)
+
+
+def market_selector():
+    """Sidebar choice of the catalog product every chapter teaches with, if there is a catalog."""
+    catalog = load_catalog()
+    if catalog is None:
+        return
+    st.sidebar.selectbox(
+        "Market", [None, *catalog.names], key="market",
+        format_func=lambda name: "The lesson's market" if name is None else name
+    )
+    equilibria = load_catalog_equilibria()
+    with st.sidebar.expander(f"Equilibrium of all {len(catalog):,} markets"):
+        st.dataframe(
+            {"market": catalog.names, "price": equilibria["price"], "quantity": equilibria["quantity"]},
+            hide_index=True,
+        )
+
+
+def chart_backend():
+    backend = os.environ.get("ICECREAM_CHART_BACKEND", "matplotlib").strip().lower()
+    if backend not in CHART_BACKENDS:
+        raise ValueError(f"ICECREAM_CHART_BACKEND must be one of {', '.join(CHART_BACKENDS)}, not {backend!r}")
+    return backend
+
+
+def _encode_spec(draw):
+    with span("draw"):
+        return json.dumps(chart_spec(draw)).encode("utf-8")
+
+
+def image_format():
+    fmt = os.environ.get("ICECREAM_IMAGE_FORMAT", "auto").strip().lower()
+    if fmt not in IMAGE_FORMATS:
+        raise ValueError(f"ICECREAM_IMAGE_FORMAT must be one of {', '.join(IMAGE_FORMATS)}, not {fmt!r}")
+    return fmt
+
+
+def image_profile():
+    """Resolution profile for this visitor: `?images=` in the URL, else ICECREAM_IMAGE_PROFILE."""
+    profile = st.query_params.get("images", "").strip().lower()
+    if profile in DPI_PROFILES:
+        return profile
+    profile = os.environ.get("ICECREAM_IMAGE_PROFILE", "high").strip().lower()
+    if profile not in DPI_PROFILES:
+        raise ValueError(f"ICECREAM_IMAGE_PROFILE must be one of {', '.join(DPI_PROFILES)}, not {profile!r}")
+    return profile
+
+
+def page_budget():
+    """Most chart bytes one page should send; 0 means no limit."""
+    return int(os.environ.get("ICECREAM_PAGE_BUDGET_BYTES", 1_000_000))
+
+
+def chart_payload():
+    """Bytes sent for the chart each section last showed, in this session."""
+    return st.session_state.setdefault("chart_bytes", {})
+
+
+def show_chart(section, params, draw):
+    payload = chart_payload()
+    if current_market() is not None:
+        params = {**params, "market": current_market()}
+    if chart_backend() == "vega-lite":
+        spec = load_render_cache().get_or_render(
+            chart_key(section, params, "vega-lite"), lambda: _encode_spec(draw)
+        )
+        payload[section] = len(spec)
+        st.vega_lite_chart(json.loads(spec), width="stretch")
+        return
+
+    # Start at the visitor's profile and step down to lighter ones while the
+    # page would go over its budget; the lightest is shown regardless.
+    fmt = image_format()
+    profiles = list(DPI_PROFILES)
+    profiles = profiles[profiles.index(image_profile()):] if fmt != "svg" else [image_profile()]
+    budget = page_budget()
+    others = sum(size for name, size in payload.items() if name != section)
+    for profile in profiles:
+        dpi = DPI_PROFILES[profile]
+        image = load_render_cache().get_or_render(
+            chart_key(section, params, f"{fmt}@{dpi}"), lambda: render_chart(draw, load_figure_pool(), fmt, dpi)
+        )
+        # An SVG is the same at every resolution, so stepping down cannot help.
+        if not budget or is_svg(image) or others + sent_bytes(image) <= budget:
+            break
+    payload[section] = sent_bytes(image)
+    st.image(image.decode("utf-8") if is_svg(image) else image, width="stretch")
+
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "static")
+
+
+def _data_uri(match):
+    name = match.group(1)
+    with open(os.path.join(STATIC_DIR, name), "rb") as f:
+        data = base64.b64encode(f.read()).decode("ascii")
+    return f'url("data:{mimetypes.guess_type(name)[0]};base64,{data}")'
+
+
+# The lesson's stylesheet with its icons inlined, built once per process and
+# sent once per page, so nothing is fetched from another host.
+@st.cache_resource
+def stylesheet_html():
+    with open(os.path.join(STATIC_DIR, "lesson.css")) as f:
+        css = f.read()
+    # Comments and blank lines dropped: a blank line would end the HTML block
+    # in some Markdown renderers.
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    css = "\n".join(line.strip() for line in css.splitlines() if line.strip())
+    return "<style>\n" + re.sub(r"url\(([\w.-]+)\)", _data_uri, css) + "\n</style>"
+
+
+def use_stylesheet():
+    st.markdown(stylesheet_html(), unsafe_allow_html=True)
+
+
+# The tables never change, so their HTML is built once per process.
+@for_current_market
+@st.cache_resource(max_entries=MARKET_CACHE_ENTRIES)
+def table_html(market, columns):
+    with span("html"):
+        market = load_market_data()
+        return pd.DataFrame({column: market[column] for column in columns}).to_html(index=False)
+
+
+def show_table(columns):
+    st.write(table_html(tuple(columns)), unsafe_allow_html=True)
+
+
+# Callout HTML is only built the first time each one is shown.
+@st.cache_resource
+def callout_html(text):
+    return '<div class="callout">' + " ".join(line.strip() for line in text.strip().splitlines()) + "</div>"
+
+
+def callout(text):
+    """A pinned box summing up a chapter; `text` may contain HTML."""
+    st.markdown(callout_html(text), unsafe_allow_html=True)
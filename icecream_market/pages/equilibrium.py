@@ -0,0 +1,321 @@
+"""Chapters on surpluses, shortages and the equilibrium they push towards."""
+import functools
+import time
+
+import numpy as np
+import streamlit as st
+
+from icecream_market.model import welfare_outline
+from icecream_market.pages.common import (
+    base_equilibrium, base_welfare, callout, load_adjustment, load_price_index, load_schedule, price_input, show_chart
+)
+from icecream_market.timing import span, timed_section
+
+# The adjustment animation: rounds simulated and seconds between frames
+ADJUSTMENT_ROUNDS = 12
+FRAME_SECONDS = 0.15
+# Adjustment rules by the label the student picks them with
+RULE_NAMES = {"Prices follow surpluses and shortages": "tatonnement", "Sellers plan from last round's price": "cobweb"}
+
+
+@st.fragment
+@timed_section
+def surplus_section():
+    market = load_schedule()
+
+    # Surplus situation
+    st.subheader("🍨 What Happens If the Price is Too High?")
+
+    st.write("""
+    Now, let’s imagine a situation where the price of ice cream is set **too high**, at **$6**. 
+    At this price, the quantity supplied is **60 scoops**, but the quantity demanded is only **20 scoops**. 
+    This means there are **40 scoops** more than people want to buy. This is called a **surplus**.
+
+    Let’s take a look at the graph below to see this surplus.
+    """)
+
+    # Number input for price
+    price = price_input(
+        "Enter the Price of Ice Cream (in $)  ", value=st.session_state.get("chosen_surplus_price", 6), side="above", key="surplus_price"
+    )
+    # The widget's own state is dropped when the student moves to another
+    # page; this copy carries the choice back here and into the adjustment.
+    st.session_state["chosen_surplus_price"] = price
+    # Calculate the corresponding quantity demanded and supplied based on the price
+    with span("solve"):
+        quantity_demanded, quantity_supplied = load_price_index().quantities(price)
+
+    def draw_surplus(ax):
+        # Plotting demand and supply curves
+        ax.plot(market.demand, market.price, label="Demand curve", color='blue', linewidth=3, alpha=0.4)
+        ax.plot(market.supply, market.price, label="Supply curve", color='green', linewidth=3, alpha=0.4)
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Demand and Supply Curves for Ice Cream")
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=7, loc='best')
+        ax.scatter(market.demand, market.price, color='blue', s=40, alpha=0.4)
+        ax.scatter(market.supply, market.price, color='green', s=40, alpha=0.4)
+
+        # Highlight the operating points
+        ax.scatter(quantity_demanded, price, color='blue', s=100, zorder=5)
+        ax.scatter(quantity_supplied, price, color='green', s=100, zorder=5)
+
+        # Add annotation for the demand value
+        ax.annotate(
+            f'{quantity_demanded:g} scoops',
+            xy=(quantity_demanded, price),
+            xytext=(quantity_demanded + 2, price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+        # Add annotation for the supply value
+        ax.annotate(
+            f'{quantity_supplied:g} scoops',
+            xy=(quantity_supplied, price),
+            xytext=(quantity_supplied + 2, price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+        # Shade the surplus and shortage area
+        if quantity_demanded > quantity_supplied:
+            ax.fill_betweenx([price - 0.1, price + 0.1], quantity_supplied, quantity_demanded, color='red', alpha=0.2, label=f'Shortage: {quantity_demanded - quantity_supplied:g} scoops')
+        elif quantity_supplied > quantity_demanded:
+            ax.fill_betweenx([price - 0.1, price + 0.1], quantity_demanded, quantity_supplied, color='purple', alpha=0.2, label=f'Surplus: {quantity_supplied - quantity_demanded:g} scoops')
+
+        ax.legend(fontsize=7, loc='center left')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("surplus", {"price": price}, draw_surplus)
+
+
+    callout("""
+        <strong>Surplus</strong> occurs for a product when the price is set too <strong>low</strong>, resulting in the quantity demanded exceeding the quantity supplied.
+    """)
+    st.write("")
+
+
+@st.fragment
+@timed_section
+def shortage_section():
+    market = load_schedule()
+
+    # Shortage situation
+    st.subheader("🍨 What Happens If the Price is Too Low?")
+
+    st.write("""
+    Now, let’s imagine a situation where the price of ice cream is set **too low**, at **$2**. 
+    At this price, the quantity demanded is **60 scoops**, but the quantity supplied is only **20 scoops**. 
+    This means there are **40 scoops** more people want than sellers can provide. This is called a **shortage**.
+
+    Let’s take a look at the graph below to see this shortage.
+    """)
+
+    # Number input for price
+    price = price_input(
+        "Enter the Price of Ice Cream (in $)   ", value=st.session_state.get("chosen_shortage_price", 2), side="below", key="shortage_price"
+    )
+    # The widget's own state is dropped when the student moves to another
+    # page; this copy carries the choice back here and into the adjustment.
+    st.session_state["chosen_shortage_price"] = price
+    # Calculate the corresponding quantity demanded and supplied based on the price
+    with span("solve"):
+        quantity_demanded, quantity_supplied = load_price_index().quantities(price)
+
+    def draw_shortage(ax):
+        # Plotting demand and supply curves
+        ax.plot(market.demand, market.price, label="Demand curve", color='blue', linewidth=3, alpha=0.4)
+        ax.plot(market.supply, market.price, label="Supply curve", color='green', linewidth=3, alpha=0.4)
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Demand and Supply Curves for Ice Cream")
+        ax.grid(alpha=0.3)
+        ax.legend(fontsize=7, loc='best')
+        ax.scatter(market.demand, market.price, color='blue', s=40, alpha=0.4)
+        ax.scatter(market.supply, market.price, color='green', s=40, alpha=0.4)
+
+        # Highlight the operating points
+        ax.scatter(quantity_demanded, price, color='blue', s=100, zorder=5)
+        ax.scatter(quantity_supplied, price, color='green', s=100, zorder=5)
+
+        # Add annotation for the demand value
+        ax.annotate(
+            f'{quantity_demanded:g} scoops',
+            xy=(quantity_demanded, price),
+            xytext=(quantity_demanded + 2, price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+        # Add annotation for the supply value
+        ax.annotate(
+            f'{quantity_supplied:g} scoops',
+            xy=(quantity_supplied, price),
+            xytext=(quantity_supplied + 2, price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+        # Shade the surplus and shortage area
+        if quantity_demanded > quantity_supplied:
+            ax.fill_betweenx([price - 0.1, price + 0.1], quantity_supplied, quantity_demanded, color='red', alpha=0.2, label=f'Shortage: {quantity_demanded - quantity_supplied:g} scoops')
+        elif quantity_supplied > quantity_demanded:
+            ax.fill_betweenx([price - 0.1, price + 0.1], quantity_demanded, quantity_supplied, color='purple', alpha=0.2, label=f'Surplus: {quantity_supplied - quantity_demanded:g} scoops')
+
+
+        ax.legend(fontsize=7, loc='center left')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("shortage", {"price": price}, draw_shortage)
+
+
+    callout("""
+        <strong>Sortage</strong> occurs for a product when the price is set too <strong>high</strong>, resulting in the quantity supplied exceeding the quantity demanded.
+    """)
+    st.write("")
+
+
+@timed_section
+def equilibrium_section():
+    market = load_schedule()
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+    surplus = base_welfare()
+
+    # Bringing Supply and Demand Together
+    st.subheader("🍨 Bringing Supply and Demand Together")
+
+    st.write("""
+    What we have seen:
+    - At low prices, the demand is high but supply is low, resulting in a **shortage**.
+    - At high prices, the supply is high but demand is low, leading to a **surplus**.
+
+    """)
+
+    st.write("""
+    When there is a **surplus** or **shortage**, sellers and buyers react:
+    - If there's a surplus (too much ice cream at high prices), sellers will lower their prices to sell more as they want to clear their stock.
+    - If there's a shortage (too little ice cream at low prices), sellers will raise their prices as they want to maximize their revenue because they know there will be customers who can pay higher price.
+
+    Somewhere in the middle, the amount people want to buy equals the amount sellers want to sell. This is called **equilibrium**. The market will naturally move towards this point where everyone is happy!
+    """)
+
+    def draw_equilibrium(ax):
+        # Plotting both demand and supply curves for equilibrium
+        ax.plot(market.demand, market.price, label="Demand curve", color='blue', linewidth=3, alpha=0.4)
+        ax.plot(market.supply, market.price, label="Supply curve", color='green', linewidth=3, alpha=0.4)
+
+        # Highlighting the equilibrium point
+        ax.scatter([equilibrium_quantity], [equilibrium_price], color='k', zorder=5, label='Equilibrium Point', s=70)
+
+        # Shade what buyers and sellers gain from trading at the equilibrium
+        quantity, demand_price, supply_price = welfare_outline(market.price, market.demand, market.supply, 0, equilibrium_quantity)
+        ax.fill_between(quantity, demand_price, equilibrium_price, color='blue', alpha=0.1, label=f'Consumer Surplus = ${surplus["consumer_surplus"]:g}')
+        ax.fill_between(quantity, equilibrium_price, supply_price, color='green', alpha=0.1, label=f'Producer Surplus = ${surplus["producer_surplus"]:g}')
+
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Supply and Demand: Moving Towards Equilibrium")
+        # ax.axhline(equilibrium_price, color='red', linestyle='--', linewidth=1, alpha=0.4)
+        # ax.axvline(equilibrium_quantity, color='red', linestyle='--', linewidth=1, alpha=0.4)
+        ax.legend(fontsize=7, loc='center left')
+        ax.grid(alpha=0.3)
+
+        # Add annotation for the demand value
+        ax.annotate(
+            f'Equilibrium price = ${equilibrium_price:g}',
+            xy=(equilibrium_quantity, equilibrium_price),
+            xytext=(equilibrium_quantity - 8, equilibrium_price + 0.5),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+        # Add annotation for the supply value
+        ax.annotate(
+            f'Equilibrium quantity = {equilibrium_quantity:g} scoops',
+            xy=(equilibrium_quantity, equilibrium_price),
+            xytext=(equilibrium_quantity + 2, equilibrium_price),
+            fontsize=9,
+            verticalalignment='center'
+        )
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("equilibrium", {}, draw_equilibrium)
+
+    st.write(f"""
+    The shaded areas show what trading at the equilibrium is worth. Buyers who would have paid more than **\${equilibrium_price:g}** gain a **consumer surplus** of **\${surplus["consumer_surplus"]:g}**, and sellers who would have sold for less gain a **producer surplus** of **\${surplus["producer_surplus"]:g}**: **\${surplus["total_welfare"]:g}** in total, the most this market can create.
+    """)
+
+    callout("""
+        <strong>Surpluses</strong> prompt sellers to lower prices, while <strong>shortages</strong> encourage them to raise prices. Ultimately, these adjustments lead to an <strong>equilibrium price</strong> where the quantity demanded equals the quantity supplied.
+    """)
+    st.write("")
+
+
+@st.fragment
+@timed_section
+def adjustment_section():
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+    # Start from the prices picked in the surplus and shortage chapters
+    surplus_price = st.session_state.get("chosen_surplus_price", 6)
+    shortage_price = st.session_state.get("chosen_shortage_price", 2)
+
+    st.subheader("🍨 Watching the Market Find Its Equilibrium")
+
+    st.write(f"""
+    How does the market actually get there? Let's replay it round by round, starting from the surplus price of **\${surplus_price:g}** and the shortage price of **\${shortage_price:g}** you chose in those chapters (the faint lines start from other prices):
+    - **Prices follow surpluses and shortages**: every round, sellers cut the price a little when scoops are left over and raise it when they run out.
+    - **Sellers plan from last round's price**: sellers decide how much ice cream to make from the price they got last round, and the price then has to fall or rise until buyers take all of it.
+    """)
+
+    rule = RULE_NAMES[st.radio("How do prices adjust?", list(RULE_NAMES), horizontal=True)]
+    paths = load_adjustment(rule, (float(surplus_price), float(shortage_price)), ADJUSTMENT_ROUNDS)
+    price = paths["price"]
+
+    def draw_adjustment(frame, ax):
+        rounds = np.arange(frame + 1)
+        for path in price[:frame + 1, 2:].T:
+            ax.plot(rounds, path, color='gray', linewidth=1, alpha=0.3)
+        ax.plot(rounds, price[:frame + 1, 0], label=f"Starting at ${surplus_price:g} (surplus)", color='purple', linewidth=2.5, alpha=0.7)
+        ax.plot(rounds, price[:frame + 1, 1], label=f"Starting at ${shortage_price:g} (shortage)", color='red', linewidth=2.5, alpha=0.7)
+        ax.scatter([frame, frame], price[frame, :2], color='k', s=30, zorder=5)
+        ax.axhline(y=equilibrium_price, color='k', linestyle='--', linewidth=1, alpha=0.6, label=f"Equilibrium price = ${equilibrium_price:g}")
+        # Fixed axes, so the picture does not jump between frames
+        ax.set_xlim(0, ADJUSTMENT_ROUNDS)
+        ax.set_ylim(0, max(np.nanmax(price), equilibrium_price) * 1.1)
+        ax.set_xlabel("Round")
+        ax.set_ylabel("Price (in $)")
+        ax.legend(fontsize=7, loc='upper right')
+        ax.grid(alpha=0.3)
+
+    play = st.button("▶ Play")
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        # Every frame replaces the previous one in the same placeholder, so the
+        # animation streams to the browser within this single run.
+        placeholder = st.empty()
+        for frame in range(1, ADJUSTMENT_ROUNDS + 1) if play else [ADJUSTMENT_ROUNDS]:
+            with placeholder:
+                params = {"rule": rule, "surplus_price": surplus_price, "shortage_price": shortage_price, "frame": frame}
+                show_chart("adjustment", params, functools.partial(draw_adjustment, frame))
+            if play:
+                time.sleep(FRAME_SECONDS)
+
+    gap = np.abs(price[:, :2] - equilibrium_price)
+    if gap[-1].max() < 0.5 * gap[0].max():
+        st.write(f"""
+        The swings get smaller every round, and after {ADJUSTMENT_ROUNDS} rounds the price is within **\${gap[-1].max():.2f}** of the equilibrium price of **\${equilibrium_price:g}**.
+        """)
+    else:
+        st.write(f"""
+        This time the price keeps swinging around **\${equilibrium_price:g}** without settling. Sellers react to last round's price at least as strongly as buyers react to today's, so every overshoot is as big as the one before. The price only settles when supply responds less to the price than demand does.
+        """)
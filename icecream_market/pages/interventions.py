@@ -0,0 +1,258 @@
+"""Chapters on government interventions: price controls and taxes."""
+import numpy as np
+import streamlit as st
+
+from icecream_market.labels import label_points
+from icecream_market.model import TAX_STEPS, lookup_excess_supply, welfare_outline
+from icecream_market.pages.common import (
+    base_equilibrium, callout, load_equilibrium_table, load_schedule, price_control_at, price_slider, show_chart,
+    tax_incidence_at
+)
+from icecream_market.timing import span, timed_section
+
+
+@st.fragment
+@timed_section
+def price_controls_section():
+    market = load_schedule()
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+
+    st.subheader("🍨 Government Interventions - Price Floor and Ceiling")
+
+
+    st.write("""
+    Sometimes governments intervene to control prices. Let's see how two interventions – **price ceilings** and **price floors** – affect the market and what unintended consequences may arise:
+
+    - If the government thinks ice cream sellers are not getting proper price for their ice cream, it might impose a **price floor** above the equilibrium price, for example, at **\$5**. While sellers would love to sell at such a high price, buyers aren't willing to purchase as much. This leads to a surplus of **20 scoops**, with unsold ice cream piling up. Sellers may be tempted to sell scoops illegally below the floor price, creating **black market** conditions.
+
+    - On the other hand, if the government thinks ice cream is too expensive for everyone to afford, it may set a **price ceiling** below the equilibrium price, say  at **\$3**. While this makes ice cream cheaper for buyers, it creates a shortage of **20 scoopps** because at such a low price, sellers aren't willing to supply enough scoops. This scarcity can lead to **black markets**, where people sell ice cream illegally at higher prices.
+    """)
+
+    # User inputs for price floor and price ceiling
+    price_floor = price_slider("Set Price Floor (in $)", value=5, side="above")
+    price_ceiling = price_slider("Set Price Ceiling (in $)", value=3, side="below")
+
+    # Look up the gap between quantity supplied and demanded at the price_floor and price_ceiling
+    with span("solve"):
+        shortage = lookup_excess_supply(load_equilibrium_table(), price_floor)
+        surplus = -lookup_excess_supply(load_equilibrium_table(), price_ceiling)
+    floor_outcome = price_control_at(price_floor)
+    ceiling_outcome = price_control_at(price_ceiling)
+
+    # price_floor = 5
+    # price_ceiling = 3
+
+    def draw_price_controls(ax):
+        # Plotting the demand and supply curves with price floor and price ceiling
+
+        # Demand curve
+        ax.plot(market.demand, market.price, label="Demand", color='blue', linewidth=3, alpha=0.4)
+        # Supply curve
+        ax.plot(market.supply, market.price, label="Supply", color='green', linewidth=3, alpha=0.4)
+
+        # Price floor line
+        ax.axhline(y=price_floor, color='magenta', linestyle='-', linewidth=1.5, alpha=0.4)
+        ax.text(8, price_floor + 0.16, f"Price Floor = ${price_floor}", color='magenta', fontsize=8, va='center')
+        ax.text(8, price_floor - 0.2, f"Shortage = {shortage:g} scoops", color='magenta', fontsize=8, va='center')
+
+        # Price ceiling line
+        ax.axhline(y=price_ceiling, color='purple', linestyle='-', linewidth=1.5, alpha=0.4)
+        ax.text(8, price_ceiling + 0.16, f"Price Ceiling = ${price_ceiling}", color='purple', fontsize=8, va='center')
+        ax.text(8, price_ceiling - 0.2, f"Surplus = {surplus:g} scoops", color='purple', fontsize=8, va='center')
+
+        # Shade the welfare lost on the scoops each control keeps from being traded
+        for outcome, color, name in ((floor_outcome, 'magenta', "Floor"), (ceiling_outcome, 'purple', "Ceiling")):
+            if outcome["quantity"] < equilibrium_quantity:
+                quantity, demand_price, supply_price = welfare_outline(market.price, market.demand, market.supply, outcome["quantity"], equilibrium_quantity)
+                ax.fill_between(quantity, demand_price, supply_price, color=color, alpha=0.15, label=f'Deadweight Loss ({name}) = ${outcome["deadweight_loss"]:g}')
+
+        # Equilibrium line
+        # ax.axvline(x=equilibrium_quantity, color='red', linestyle='--', linewidth=1)
+        # ax.axhline(y=equilibrium_price, color='red', linestyle='--', linewidth=1)
+        ax.scatter([equilibrium_quantity], [equilibrium_price], color='red', zorder=5, label='Equilibrium Point', s=50)
+
+        # Labels and title
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Effects of Price Floor and Price Ceiling on the Ice Cream Market")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+    with col2:
+        show_chart("price-controls", {"price_floor": price_floor, "price_ceiling": price_ceiling}, draw_price_controls)
+
+    # Explanation of effects
+
+    callout("""
+        Government interventions can have unintended consequences on the market:
+        <ul>
+        <li><strong>Price Ceiling</strong> - If set below equilibrium, it creates a <strong>shortage</strong> as fewer sellers participate. A <strong>black market</strong> may emerge where ice cream is resold at higher prices.</li>
+        <li><strong>Price Floor</strong> - If set above equilibrium, it leads to a <strong>surplus</strong> since buyers purchase less. This can drive sellers to the <strong>black market</strong>, selling below the floor.</li>
+    </ul>
+    """)
+    st.write("")
+
+
+def shade_tax_welfare(ax, market, incidence, equilibrium_quantity):
+    # The government's revenue is the tax wedge over the scoops still traded;
+    # the scoops no longer traded are the deadweight loss.
+    quantity = incidence["quantity"]
+    if quantity <= 0 or incidence["revenue"] == 0:
+        return
+    ax.fill_between([0, quantity], incidence["seller_price"], incidence["buyer_price"], color='orange', alpha=0.15, label=f'Tax Revenue = ${incidence["revenue"]:g}')
+    lost, demand_price, supply_price = welfare_outline(market.price, market.demand, market.supply, quantity, equilibrium_quantity)
+    ax.fill_between(lost, demand_price, supply_price, color='red', alpha=0.2, label=f'Deadweight Loss = ${incidence["deadweight_loss"]:g}')
+
+
+@st.fragment
+@timed_section
+def seller_tax_section():
+    market = load_schedule()
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+
+    # Section for tax levied on sellers
+    st.subheader("🍨 Impact of Tax Imposed on Seller")
+
+    st.write("""
+    When the government imposes a **tax on the seller**, the **supply curve shifts upward** by the amount of the tax because the tax increases the cost of producing or selling each unit of the good. Sellers now need a higher price to cover these additional costs, so for any given quantity. 
+
+    For example, you can see that without the tax, sellers are willing to offer **40 scoops** for **\$4** per ice cream. So with a **\$1** tax, they will offer **40 scoops** only if the price is **\$5** (original price **\$4** + tax **\$1**) per ice cream. Let's visualize how this affects the supply and demand curves.
+    """)
+
+    # User input for tax amount on sellers
+    tax_on_sellers = st.slider("Tax Amount Imposed on Sellers (in $)", min_value=TAX_STEPS[0], max_value=TAX_STEPS[-1], value=1, step=TAX_STEPS.step)
+
+    # Calculate new supply based on the tax on sellers
+    taxed = market.taxed(on_sellers=tax_on_sellers)
+
+    # Find the new equilibrium point with tax on sellers
+    seller_tax_equilibrium = tax_incidence_at(tax_on_sellers, "sellers")
+    new_equilibrium_quantity_sellers = seller_tax_equilibrium["quantity"]
+    new_equilibrium_price_sellers = seller_tax_equilibrium["price"]
+
+    def draw_seller_tax(ax):
+        # Plotting original and new supply curves with tax on sellers
+        ax.plot(market.supply, market.price, label="Original Supply", color='green', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original supply
+        ax.plot(market.supply, taxed.supply_price, label="Supply with Tax on Sellers", color='green', linewidth=3, alpha=0.4)  # Solid line for supply with tax on sellers
+        ax.plot(market.demand, market.price, label="Original Demand", color='blue', linewidth=3, alpha=0.4)  # Dotted line for original demand
+
+        # Highlighting equilibrium points
+        ax.scatter([equilibrium_quantity], [equilibrium_price], color='k', label='Original Equilibrium', s=50)
+        if not np.isnan(new_equilibrium_price_sellers):
+            ax.scatter([new_equilibrium_quantity_sellers], [new_equilibrium_price_sellers], color='red', label=f'New Equilibrium (${new_equilibrium_price_sellers:.2f}, {int(new_equilibrium_quantity_sellers)})', s=50)
+            shade_tax_welfare(ax, market, seller_tax_equilibrium, equilibrium_quantity)
+
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Impact of Tax on Sellers")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+        # Add annotations for each supply point
+        label_points(ax, market.supply, market.price, '${}', values=market.price, offset=(-1, 0.3))
+
+        # Add annotations for each supply point with tax on sellers
+        label_points(ax, market.supply, taxed.supply_price, '${}', values=taxed.supply_price, offset=(-1, 0.3))
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("seller-tax", {"tax_on_sellers": tax_on_sellers}, draw_seller_tax)
+
+
+    st.write("")
+
+    if np.isnan(new_equilibrium_price_sellers):
+        st.write(f"""
+    - Original price per ice cream = **\${equilibrium_price:g}**
+
+    - **No trade at this tax.** No price both covers the **\${tax_on_sellers}** tax for sellers and is low enough for buyers, so no ice cream is sold and the tax raises nothing.
+    """)
+    else:
+        st.write(f"""
+    - Original price per ice cream = **\${equilibrium_price:g}**
+
+    - The price paid by buyers per ice cream = **\${new_equilibrium_price_sellers:.2f}** (market price)
+
+    - The price received by sellers per ice cream after deducting **\${tax_on_sellers}** tax = **\${new_equilibrium_price_sellers:.2f}** - **\${tax_on_sellers}** = **\${seller_tax_equilibrium["seller_price"]:.2f}**
+
+    So the buyers pay **\${seller_tax_equilibrium["buyer_burden"]:.2f}** of the tax and seller pay the other **\${seller_tax_equilibrium["seller_burden"]:.2f}**. **Although the tax is levied on sellers, the buyers end up paying a portion of it**. The tax burden is divided between buyers and seller. The division is equal in this case which may not always be the case.
+    """)
+
+
+@st.fragment
+@timed_section
+def buyer_tax_section():
+    market = load_schedule()
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+
+    # Section for tax levied on buyers
+    st.subheader("🍨 Impact of Tax Imposed on Buyers")
+
+    st.write("""
+    When the government imposes a tax on buyers, the demand curve shifts downward by the amount of the tax because the tax increases the total cost of purchasing each unit of the good. Buyers now face a higher total cost for each unit, which includes the market price plus the tax. For any given price before tax, buyers are willing to buy less of the good because the total cost has increased. 
+
+    For example, without the tax, buyers are willing to purchase ****40 scoops**** at ****\$4**** per ice cream. With a ****\$1**** tax, they will only buy ****40 scoops**** if the price they see in the market is ****\$3**** per ice cream, as their total cost (including the tax) would still be ****\$4****. Let's visualize how this affects the supply and demand curves.
+    """)
+
+    # User input for tax amount on buyers
+    tax_on_buyers = st.slider("Tax Amount Imposed on Buyers (in $)", min_value=TAX_STEPS[0], max_value=TAX_STEPS[-1], value=1, step=TAX_STEPS.step)
+
+    # Calculate new demand based on the tax on buyers
+    taxed = market.taxed(on_buyers=tax_on_buyers)
+
+    # Find the new equilibrium point with tax on buyers
+    buyer_tax_equilibrium = tax_incidence_at(tax_on_buyers, "buyers")
+    new_equilibrium_quantity_buyers = buyer_tax_equilibrium["quantity"]
+    new_equilibrium_price_buyers = buyer_tax_equilibrium["price"]
+
+    def draw_buyer_tax(ax):
+        # Plotting original and new demand curves with tax on buyers
+        ax.plot(market.supply, market.price, label="Original Supply", color='green', linewidth=3, alpha=0.4)  # Dotted line for original supply
+        ax.plot(market.demand, market.price, label="Original Demand", color='blue', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original demand
+        ax.plot(market.demand, taxed.demand_price, label="Demand with Tax on Buyers", color='blue', linewidth=3, alpha=0.4)  # Solid line for demand with tax on buyers
+
+        # Highlighting equilibrium points
+        ax.scatter([equilibrium_quantity], [equilibrium_price], color='k', label='Original Equilibrium', s=50)
+        if not np.isnan(new_equilibrium_price_buyers):
+            ax.scatter([new_equilibrium_quantity_buyers], [new_equilibrium_price_buyers], color='red', label=f'New Equilibrium (${new_equilibrium_price_buyers:.2f}, {int(new_equilibrium_quantity_buyers)})', s=50)
+            shade_tax_welfare(ax, market, buyer_tax_equilibrium, equilibrium_quantity)
+
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Impact of Tax on Buyers")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+        # Add annotations for each demand point with tax on buyers
+        label_points(ax, market.demand, taxed.demand_price, '${}', values=taxed.demand_price, offset=(-1, 0.3))
+        label_points(ax, market.demand, market.price, '${}', values=market.price, offset=(-1, 0.3))
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("buyer-tax", {"tax_on_buyers": tax_on_buyers}, draw_buyer_tax)
+
+    st.write("")
+
+    if np.isnan(new_equilibrium_price_buyers):
+        st.write(f"""
+    - Original price per ice cream = **\${equilibrium_price:g}**
+
+    - **No trade at this tax.** With the **\${tax_on_buyers}** tax on top, no price is both high enough for sellers and affordable for buyers, so no ice cream is sold and the tax raises nothing.
+    """)
+    else:
+        st.write(f"""
+    - Original price per ice cream = **\${equilibrium_price:g}**
+
+    - The price received by seller per ice cream = **\${new_equilibrium_price_buyers:.2f}** (market price)
+
+    - The total price paid by buyers per ice cream including **\${tax_on_buyers}** tax = **\${new_equilibrium_price_buyers:.2f}** + **\${tax_on_buyers}** = **\${buyer_tax_equilibrium["buyer_price"]:.2f}**
+
+    So the buyers pay **\${buyer_tax_equilibrium["buyer_burden"]:.2f}** of the tax and seller pay the other **\${buyer_tax_equilibrium["seller_burden"]:.2f}**. **Although the tax is levied on buyers, the sellers end up paying a portion of it**. The division of tax burden between buyers and seller is equal in this case but may not always be true.
+    """)
+
+    callout("""
+        When a <strong>tax</strong> is imposed on either buyers or seller, the burden is <strong>shared between both parties</strong>.
+    """)
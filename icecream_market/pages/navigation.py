@@ -0,0 +1,94 @@
+"""The lesson's pages, one chapter each, in reading order.
+
+Only the chapter being viewed runs. While the student reads it, the shared
+tables the next chapter needs are solved in a background thread, so moving
+on does not wait for them.
+"""
+import streamlit as st
+
+from icecream_market.dynamics import RULES
+from icecream_market.pages.basics import CROWD_SIZES, crowd_section, demand_section, supply_section
+from icecream_market.pages.common import (
+    CROWD_SPREADS, load_adjustment, load_crowd_market, load_equilibrium_table, load_related_goods_table,
+    load_tax_incidence, prefetch
+)
+from icecream_market.pages.equilibrium import (
+    ADJUSTMENT_ROUNDS, adjustment_section, equilibrium_section, shortage_section, surplus_section
+)
+from icecream_market.pages.interventions import buyer_tax_section, price_controls_section, seller_tax_section
+from icecream_market.pages.shifts import (
+    demand_decrease_section, demand_increase_section, demand_shift_section, related_goods_section,
+    supply_decrease_section, supply_increase_section, supply_shift_section
+)
+
+
+def _warm_adjustment():
+    load_equilibrium_table()
+    load_adjustment(RULES[0], (6.0, 2.0), ADJUSTMENT_ROUNDS)
+
+
+def _warm_tax(levied_on):
+    load_equilibrium_table()
+    load_tax_incidence(levied_on)
+
+
+# Topic -> chapters as (chapter, page title, URL path, what to solve ahead of
+# a visit). Warm-up functions only touch shared caches, never the page.
+CHAPTERS = {
+    "Demand and supply": [
+        (demand_section, "How demand changes with price", "demand", None),
+        (supply_section, "How supply changes with price", "supply", None),
+        (crowd_section, "Where the curves come from", "crowd",
+         lambda: load_crowd_market(next(iter(CROWD_SIZES.values())), next(iter(CROWD_SPREADS)), 0)),
+    ],
+    "Finding the equilibrium": [
+        (surplus_section, "When the price is too high", "surplus", load_equilibrium_table),
+        (shortage_section, "When the price is too low", "shortage", load_equilibrium_table),
+        (equilibrium_section, "Bringing supply and demand together", "equilibrium", load_equilibrium_table),
+        (adjustment_section, "Watching the market adjust", "adjustment", _warm_adjustment),
+    ],
+    "Shifting the curves": [
+        (demand_increase_section, "When demand increases", "demand-increase", None),
+        (demand_decrease_section, "When demand decreases", "demand-decrease", None),
+        (demand_shift_section, "Demand shifts and the equilibrium", "demand-shift", load_equilibrium_table),
+        (supply_increase_section, "When supply increases", "supply-increase", None),
+        (supply_decrease_section, "When supply decreases", "supply-decrease", None),
+        (supply_shift_section, "Supply shifts and the equilibrium", "supply-shift", load_equilibrium_table),
+        (related_goods_section, "Substitutes and complements", "related-goods", load_related_goods_table),
+    ],
+    "Government interventions": [
+        (price_controls_section, "Price floors and ceilings", "price-controls", load_equilibrium_table),
+        (seller_tax_section, "A tax on sellers", "seller-tax", lambda: _warm_tax("sellers")),
+        (buyer_tax_section, "A tax on buyers", "buyer-tax", lambda: _warm_tax("buyers")),
+    ],
+}
+
+_ORDER = [chapter for chapters in CHAPTERS.values() for chapter in chapters]
+
+
+def lesson_pages():
+    """Every chapter as an `st.Page`, grouped by topic for `st.navigation`."""
+    return {
+        topic: [
+            st.Page(chapter, title=title, url_path=url_path, default=chapter is _ORDER[0][0])
+            for chapter, title, url_path, _ in chapters
+        ]
+        for topic, chapters in CHAPTERS.items()
+    }
+
+
+def whole_lesson(url_paths=None):
+    """Every chapter on one page in reading order, or only those at `url_paths`."""
+    for chapter, _, url_path, _ in _ORDER:
+        if url_paths is None or url_path in url_paths:
+            chapter()
+
+
+def prefetch_after(page):
+    """Solve what the chapter after `page` needs in the background."""
+    titles = [title for _, title, _, _ in _ORDER]
+    if page.title not in titles:
+        return
+    position = titles.index(page.title)
+    if position + 1 < len(_ORDER) and _ORDER[position + 1][3] is not None:
+        prefetch(_ORDER[position + 1][3])
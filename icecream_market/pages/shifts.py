@@ -0,0 +1,438 @@
+"""Chapters on shifts of the demand and supply curves and their new equilibria."""
+import numpy as np
+import streamlit as st
+
+from icecream_market.labels import label_points
+from icecream_market.model import SHIFT_STEPS, lookup_equilibrium
+from icecream_market.pages.common import (
+    CONE_SHIFTS, YOGURT_SHIFTS, base_equilibrium, callout, load_equilibrium_table, load_related_goods, load_schedule,
+    related_goods_at, show_chart
+)
+from icecream_market.timing import span, timed_section
+
+
+@timed_section
+def demand_increase_section():
+    market = load_schedule()
+
+    # External factors affecting demand
+    st.subheader("🍨 What Happens If Demand Increases Due to External Factors?")
+
+    st.write("""
+    Sometimes, demand for ice cream can change due to external factors. For example, if a popular event is happening nearby (like a concert or festival), more people may want ice cream, increasing the demand even at the same price. 
+
+    Imagine that the new quantity demanded at each price increases by 20 scoops due to the event. Let’s see how this change affects the demand curve. 
+    """)
+
+    # Adjusting the demand data
+    increased = market.shifted(demand=20)
+
+    def draw_demand_increase(ax):
+        # Plotting both original and new demand curves
+        ax.plot(market.demand, market.price, label="Original Demand", color='blue', linestyle='--', linewidth=3, alpha = 0.4)  # Dotted line for original demand
+        ax.plot(increased.demand, market.price, label="Increased Demand", color='blue', linewidth=3, alpha = 0.4)  # Solid line for new demand
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Effect of External Factors on Demand for Ice Cream")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+        ax.scatter(market.demand, market.price, color='blue', s=50)
+        ax.scatter(increased.demand, market.price, color='blue', s=50)
+
+        # Add annotations for each original demand point
+        label_points(ax, market.demand, market.price, '{} scoops ⟶')
+
+        # Add annotations for each new demand point
+        label_points(ax, increased.demand, market.price, '{} scoops')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("demand-increase", {}, draw_demand_increase)
+
+    st.write("""
+    As you can see from the graph:
+    - The **dotted blue curve** represents the original demand for ice cream.
+    - The **solid blue curve** shows how demand increases due to external factors, like a popular event.
+    """)
+
+
+@timed_section
+def demand_decrease_section():
+    market = load_schedule()
+
+    # External factors affecting demand: Decrease
+    st.subheader("🍨 What Happens If Demand Decreases Due to External Factors?")
+
+    st.write("""
+    Sometimes, demand for ice cream can decrease due to external factors. For example, if the weather is particularly cold or if a competing ice cream shop opens nearby, fewer people may want ice cream, decreasing the demand even at the same price.
+
+    Imagine that the new quantity demanded at each price decreases by 20 scoops due to these factors. Let’s see how this change affects the demand curve.
+    """)
+
+    # Drop the last row to avoid negative values
+    original = market[:-1]
+    # Adjusting the demand data for decrease
+    decreased = original.shifted(demand=-20)
+
+    def draw_demand_decrease(ax):
+        # Plotting both original and decreased demand curves
+        ax.plot(original.demand, original.price, label="Original Demand", color='blue', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original demand
+        ax.plot(decreased.demand, original.price, label="Decreased Demand", color='blue', linewidth=3, alpha=0.4)  # Solid line for decreased demand
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Effect of External Factors on Demand for Ice Cream")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+        ax.scatter(original.demand, original.price, color='blue', s=50)
+        ax.scatter(decreased.demand, original.price, color='blue', s=50)
+
+        # Add annotations for each original demand point
+        label_points(ax, original.demand, original.price, '{} scoops')
+
+        # Add annotations for each new demand point
+        label_points(ax, decreased.demand, original.price, '{} scoops ⟵')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+    with col2:
+        show_chart("demand-decrease", {}, draw_demand_decrease)
+
+    st.write("""
+    As you can see from the graph:
+    - The **dotted blue curve** represents the original demand for ice cream.
+    - The **solid blue curve** shows how demand decreases due to external factors, like colder weather or increased competition.
+    """)
+
+
+@st.fragment
+@timed_section
+def demand_shift_section():
+    market = load_schedule()
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+
+    # Effect of increased demand on equilibrium
+    st.subheader("🍨 Impact of Increased/Decreased Demand on Equilibrium Price")
+
+    st.write("""
+    - When **demand for ice cream increases** (like during a special event), more people want to buy ice cream at every price level. This leads to a **shift in the demand curve to the right**, which can **increase the equilibrium price**.
+    - When **demand for ice cream decreases** (like during a cold snap), fewer people want to buy ice cream at every price level. This leads to a **shift in the demand curve to the left**, which can **decrease the equilibrium price**.
+
+    Let's visualize how this change affects the equilibrium point.
+    """)
+
+    # User input for demand shift
+    demand_shift = st.slider("Demand Shift (in scoops)", min_value=SHIFT_STEPS[0], max_value=SHIFT_STEPS[-1], value=10, step=SHIFT_STEPS.step)
+
+    # Calculate new demand based on the shift
+    shifted = market.shifted(demand=demand_shift)
+
+    # Find the new equilibrium point
+    with span("solve"):
+        demand_equilibrium = lookup_equilibrium(load_equilibrium_table(), demand_shift=demand_shift)
+    new_equilibrium_quantity = demand_equilibrium["quantity"]
+    new_equilibrium_price = demand_equilibrium["price"]
+
+    def draw_demand_shift(ax):
+        # Plotting original and new demand and supply curves
+        ax.plot(market.demand, market.price, label="Original Demand", color='blue', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original demand
+        ax.plot(shifted.demand, market.price, label="New Demand", color='blue', linewidth=3, alpha=0.4)  # Solid line for new demand
+        ax.plot(market.supply, market.price, label="Supply", color='green', linewidth=3, alpha=0.4)
+
+        # Highlighting equilibrium points
+        ax.scatter([equilibrium_quantity], [equilibrium_price], color='k', label='Original Equilibrium', s=50)
+        if not np.isnan(new_equilibrium_price):
+            ax.scatter([new_equilibrium_quantity], [new_equilibrium_price], color='red', label=f'New Equilibrium (${new_equilibrium_price}, {int(new_equilibrium_quantity)})', s=50)
+
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Shift in Demand and Its Impact on Equilibrium")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+        # Add annotations for each new demand point
+        label_points(ax, market.demand, market.price, '{}')
+        label_points(ax, shifted.demand, market.price, '{}')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("demand-shift", {"demand_shift": demand_shift}, draw_demand_shift)
+
+    st.write("""
+    In the chart:
+    - The **dotted blue curve** represents the original demand for ice cream.
+    - The **solid blue curve** shows the new demand after the event, which shifts to the right or left.
+    - The **green line** represents the supply curve.
+
+    As a result of the increased demand, the equilibrium point shifts:
+    - The original equilibrium point is marked in **black**, where the original demand and supply intersect.
+    - The new equilibrium point is marked in **red**, where the new demand intersects with the same supply curve.
+
+    This shift indicates that at the new equilibrium, the price of ice cream is higher in the event of an increased demand, lower in the event of an decreased demand. This demonstrating how markets respond to changes in consumer behavior!
+    """)
+
+    callout("""
+        <ul> 
+            <li>
+                <strong>When demand for a product increases</strong>—whether due to an exciting event or changing consumer preferences—the <strong>equilibrium price rises</strong>.
+            </li>
+            <li>
+                <strong>When demand for a product decreases</strong>—whether due to colder weather or increased competition—the <strong>equilibrium price falls</strong>.
+            </li>
+        </ul>
+    """)
+
+    st.write("")
+
+
+@timed_section
+def supply_increase_section():
+    market = load_schedule()
+
+    # External factors affecting supply
+    st.subheader("🍨 What Happens If Supply Increases Due to External Factors?")
+
+    st.write("""
+    Sometimes, supply of ice cream can change due to external factors. For instance, if a new supplier enters the market or if production costs decrease, sellers may be willing to supply more ice cream at the same price.
+
+    Imagine that the new quantity supplied at each price increases by 20 scoops due to these factors. Let’s see how this change affects the supply curve.
+    """)
+
+    # Adjusting the supply data
+    increased = market.shifted(supply=20)
+
+    def draw_supply_increase(ax):
+        # Plotting both original and new supply curves
+        ax.plot(market.supply, market.price, label="Original Supply", color='green', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original supply
+        ax.plot(increased.supply, market.price, label="Increased Supply", color='green', linewidth=3, alpha=0.4)  # Solid line for new supply
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Effect of External Factors on Supply for Ice Cream")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+        ax.scatter(market.supply, market.price, color='green', s=50)
+        ax.scatter(increased.supply, market.price, color='green', s=50)
+
+        # Add annotations for each original supply point
+        label_points(ax, market.supply, market.price, '{} scoops ⟶')
+
+        # Add annotations for each new supply point
+        label_points(ax, increased.supply, market.price, '{} scoops')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+    with col2:
+        show_chart("supply-increase", {}, draw_supply_increase)
+
+    st.write("""
+    As you can see from the graph:
+    - The **dotted green curve** represents the original supply of ice cream.
+    - The **solid green curve** shows how supply increases due to external factors, like new suppliers entering the market.
+    """)
+
+
+@timed_section
+def supply_decrease_section():
+    market = load_schedule()
+
+    # External factors affecting supply: Decrease
+    st.subheader("🍨 What Happens If Supply Decreases Due to External Factors?")
+
+    st.write("""
+    Sometimes, the supply of ice cream can decrease due to external factors. For example, if the cost of ingredients rises or if there's a shortage of workers, sellers may be willing to supply less ice cream at the same price.
+
+    Imagine that the new quantity supplied at each price decreases by 20 scoops due to these factors. Let’s see how this change affects the supply curve.
+    """)
+
+    # Drop the first row to avoid negative values
+    original = market[1:]
+    # Adjusting the supply data for decrease
+    decreased = original.shifted(supply=-20)
+
+    def draw_supply_decrease(ax):
+        # Plotting both original and decreased supply curves
+        ax.plot(original.supply, original.price, label="Original Supply", color='green', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original supply
+        ax.plot(decreased.supply, original.price, label="Decreased Supply (after event)", color='green', linewidth=3, alpha=0.4)  # Solid line for decreased supply
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Effect of External Factors on Supply for Ice Cream")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+        ax.scatter(original.supply, original.price, color='green', s=50)
+        ax.scatter(decreased.supply, original.price, color='green', s=50)
+
+        # Add annotations for each original supply point
+        label_points(ax, original.supply, original.price, '{} scoops')
+
+        # Add annotations for each decreased supply point
+        label_points(ax, decreased.supply, original.price, '{} scoops ⟵')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+    with col2:
+        show_chart("supply-decrease", {}, draw_supply_decrease)
+
+    st.write("""
+    As you can see from the graph:
+    - The **dotted green curve** represents the original supply of ice cream.
+    - The **solid green curve** shows how supply decreases due to external factors, like increased production costs.
+    """)
+
+
+@st.fragment
+@timed_section
+def supply_shift_section():
+    market = load_schedule()
+    equilibrium_quantity, equilibrium_price = base_equilibrium()
+
+    # Effect of increased supply on equilibrium
+    st.subheader("🍨 Impact of Increased/Decreased Supply on Equilibrium Price")
+
+    st.write("""
+    - When the **supply of ice cream increases** (like during a bumper harvest), more sellers are willing to sell ice cream at every price level. This leads to a **shift in the supply curve to the right**, which can **decrease the equilibrium price**.
+    - When the **supply of ice cream decreases** (like during a supply chain disruption or increased production costs), fewer sellers are willing to sell ice cream at every price level. This leads to a **shift in the supply curve to the left**, which can **increase the equilibrium price**.
+
+    Let's visualize how this change affects the equilibrium point.
+    """)
+
+    # User input for supply shift
+    supply_shift = st.slider("Supply Shift (in scoops)", min_value=SHIFT_STEPS[0], max_value=SHIFT_STEPS[-1], value=10, step=SHIFT_STEPS.step)
+
+    # Calculate new supply based on the shift
+    shifted = market.shifted(supply=supply_shift)
+
+    # Find the new equilibrium point
+    with span("solve"):
+        supply_equilibrium = lookup_equilibrium(load_equilibrium_table(), supply_shift=supply_shift)
+    new_equilibrium_quantity_supply = supply_equilibrium["quantity"]
+    new_equilibrium_price_supply = supply_equilibrium["price"]
+
+    def draw_supply_shift(ax):
+        # Plotting original and new supply curves
+        ax.plot(market.supply, market.price, label="Original Supply", color='green', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original supply
+        ax.plot(shifted.supply, market.price, label="New Supply", color='green', linewidth=3, alpha=0.4)  # Solid line for new supply
+        ax.plot(market.demand, market.price, label="Demand", color='blue', linewidth=3, alpha=0.4)
+
+        # Highlighting equilibrium points
+        ax.scatter([equilibrium_quantity], [equilibrium_price], color='k', label='Original Equilibrium', s=50)
+        if not np.isnan(new_equilibrium_price_supply):
+            ax.scatter([new_equilibrium_quantity_supply], [new_equilibrium_price_supply], color='red', label=f'New Equilibrium (${new_equilibrium_price_supply}, {int(new_equilibrium_quantity_supply)})', s=50)
+
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        # ax.set_title("Shift in Supply and Its Impact on Equilibrium")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+        # Add annotations for each supply point
+        label_points(ax, market.supply, market.price, '{}')
+
+        # Add annotations for each new supply point
+        label_points(ax, shifted.supply, market.price, '{}')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("supply-shift", {"supply_shift": supply_shift}, draw_supply_shift)
+
+    st.write("""
+    In the chart:
+    - The **dotted green curve** represents the original supply of ice cream.
+    - The **solid green curve** shows the new supply after the event, which shifts to the right or left.
+    - The **blue line** represents the demand curve.
+
+    As a result of the increased or decreased supply, the equilibrium point shifts:
+    - The original equilibrium point is marked in **black**, where the original supply and demand intersect.
+    - The new equilibrium point is marked in **red**, where the new supply intersects with the same demand curve.
+
+    This shift indicates that at the new equilibrium, the price of ice cream is lower in the event of an increased supply and higher in the event of a decreased supply. This demonstrates how markets respond to changes in supply conditions!
+    """)
+
+    callout("""
+        <ul> 
+            <li>
+                <strong>When supply of a product increases</strong>—whether due to a bumper harvest or improved production techniques—the <strong>equilibrium price falls</strong>.
+            </li>
+            <li>
+                <strong>When supply of a product decreases</strong>—whether due to supply chain disruptions or increased production costs—the <strong>equilibrium price rises</strong>.
+            </li>
+        </ul>
+    """)
+
+    st.write("")
+
+
+@st.fragment
+@timed_section
+def related_goods_section():
+    goods = load_related_goods()
+    base = related_goods_at(0, 0)
+
+    # Demand shifts that come from the prices of related goods
+    st.subheader("🍨 When the Prices of Related Goods Change")
+
+    st.write("""
+    So far the shifts in demand came from outside the market, like an event or the weather. But the demand for ice cream also depends on the prices of **related goods**:
+    - **Frozen yogurt is a substitute.** When it gets dearer, some people buy ice cream instead, so the demand for ice cream **increases**.
+    - **Cones are a complement.** When they get dearer, a scoop in a cone costs more, so the demand for ice cream **decreases**.
+
+    The prices of frozen yogurt and cones are set in their own markets, which in turn depend on the price of ice cream. Change the supply of frozen yogurt or cones below and all three markets settle together.
+    """)
+
+    # User input for the related markets
+    yogurt_shift = st.slider("Frozen Yogurt Supply Shift (in cups)", min_value=YOGURT_SHIFTS[0], max_value=YOGURT_SHIFTS[-1], value=-10, step=YOGURT_SHIFTS.step)
+    cone_shift = st.slider("Cone Supply Shift (in cones)", min_value=CONE_SHIFTS[0], max_value=CONE_SHIFTS[-1], value=0, step=CONE_SHIFTS.step)
+
+    # Every market's new equilibrium, and the ice cream demand curve at the new prices of the others
+    with span("solve"):
+        linked = related_goods_at(yogurt_shift, cone_shift)
+    ice_cream, frozen_yogurt, cones = (goods.index[name] for name in ("ice cream", "frozen yogurt", "cones"))
+    prices = load_schedule().price
+    original_demand = goods.demand_schedule("ice cream", prices, base["price"])
+    new_demand = goods.demand_schedule("ice cream", prices, linked["price"])
+    supply = goods.supply_schedule("ice cream", prices)
+    demand_shift = new_demand[0] - original_demand[0]
+    new_equilibrium_price = round(float(linked["price"][ice_cream]), 2)
+    new_equilibrium_quantity = round(float(linked["quantity"][ice_cream]), 1)
+
+    def draw_related_goods(ax):
+        # Plotting original and new ice cream demand and the supply curve
+        ax.plot(original_demand, prices, label="Original Demand", color='blue', linestyle='--', linewidth=3, alpha=0.4)  # Dotted line for original demand
+        ax.plot(new_demand, prices, label="New Demand", color='blue', linewidth=3, alpha=0.4)  # Solid line for new demand
+        ax.plot(supply, prices, label="Supply", color='green', linewidth=3, alpha=0.4)
+
+        # Highlighting equilibrium points
+        ax.scatter([base["quantity"][ice_cream]], [base["price"][ice_cream]], color='k', label='Original Equilibrium', s=50)
+        ax.scatter([new_equilibrium_quantity], [new_equilibrium_price], color='red', label=f'New Equilibrium (${new_equilibrium_price:g}, {new_equilibrium_quantity:g})', s=50)
+
+        ax.set_xlabel("Quantity (in scoops)")
+        ax.set_ylabel("Price (in $)")
+        ax.legend(fontsize=7, loc='best')
+        ax.grid(alpha=0.3)
+
+        # Add annotations for each new demand point
+        label_points(ax, np.round(new_demand, 1), prices, '{}')
+
+    col1, col2, col3 = st.columns([1, 12, 1])
+
+    with col2:
+        show_chart("related-goods", {"yogurt_shift": yogurt_shift, "cone_shift": cone_shift}, draw_related_goods)
+
+    st.write(f"""
+    - Frozen yogurt now costs **\${linked["price"][frozen_yogurt]:.2f}** a cup (was **\${base["price"][frozen_yogurt]:.2f}**).
+
+    - Cones now cost **\${linked["price"][cones]:.2f}** each (was **\${base["price"][cones]:.2f}**).
+
+    Together these move the demand for ice cream by **{demand_shift:+.1f} scoops** at every price, and the price of ice cream goes from **\${round(float(base["price"][ice_cream]), 2):g}** to **\${new_equilibrium_price:g}**. The new price of ice cream feeds back into the other two markets in turn, which is why all three prices are found together.
+    """)
+
+    callout("""
+        <ul>
+            <li>
+                <strong>When the price of a substitute rises</strong>, the demand for ice cream shifts right and its <strong>equilibrium price rises</strong>.
+            </li>
+            <li>
+                <strong>When the price of a complement rises</strong>, the demand for ice cream shifts left and its <strong>equilibrium price falls</strong>.
+            </li>
+        </ul>
+    """)
+
+    st.write("")
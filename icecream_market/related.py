@@ -0,0 +1,197 @@
+"""Related goods: markets linked by substitutes and complements.
+
+Every good has a straight demand and supply curve, and the quantity of a
+good demanded also moves with the prices of related goods:
+
+    demand[i] = demand_intercept[i] + own_slope[i] * price[i] + sum_j cross[i, j] * price[j]
+    supply[i] = supply_intercept[i] + supply_slope[i] * price[i]
+
+`cross[i, j]` is positive when good j is a substitute for good i (dearer
+frozen yogurt sends people to ice cream) and negative for a complement
+(dearer cones put them off it). Clearing every market at once is a linear
+system in the prices. Shifts and taxes only change its right-hand side, so
+the system is inverted once and every scenario after that is a
+matrix product; changing a single slope updates the inverse in place
+(Sherman-Morrison) instead of inverting again. Thousands of goods, each
+linked to a few others, are solved by Jacobi iteration over the sparse
+links instead.
+"""
+import numpy as np
+
+from icecream_market import model
+from icecream_market.markets import _per_market
+from icecream_market.model import _read_only
+
+METHODS = ("direct", "iterative")
+# Above this many goods the dense inverse gets too big to keep; iterate.
+DIRECT_LIMIT = 2000
+
+
+class RelatedGoods:
+    """Linear demand and supply for goods linked by cross-price effects.
+
+    `cross` maps `(good, other)` pairs of names to how many more units of
+    `good` are demanded per $1 rise in the price of `other`. Build changed
+    copies with `with_slope` and `with_supply_slope`.
+    """
+
+    def __init__(self, names, demand_intercept, own_slope, supply_intercept, supply_slope, cross=None):
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.demand_intercept, self.own_slope, self.supply_intercept, self.supply_slope = (
+            _read_only(np.broadcast_to(np.asarray(v, dtype=float), (len(self.names),)))
+            for v in (demand_intercept, own_slope, supply_intercept, supply_slope)
+        )
+        links = [(self.index[good], self.index[other], slope) for (good, other), slope in (cross or {}).items()]
+        if any(i == j for i, j, _ in links):
+            raise ValueError("A good's own price slope goes in own_slope, not cross")
+        self.rows, self.cols, self.cross = (
+            _read_only(np.array([link[k] for link in links], dtype=float if k == 2 else np.int64)) for k in range(3)
+        )
+        self._inverse = None
+
+    def __len__(self):
+        return len(self.names)
+
+    def _diagonal(self):
+        return self.own_slope - self.supply_slope
+
+    def _cross_times(self, prices):
+        # sum_j cross[i, j] * prices[j] for every good i and every column of
+        # `prices` (goods x scenarios), one bincount over the links.
+        n, k = prices.shape
+        bins = (self.rows[:, None] * k + np.arange(k)).ravel()
+        return np.bincount(bins, weights=(self.cross[:, None] * prices[self.cols]).ravel(), minlength=n * k).reshape(n, k)
+
+    def matrix(self):
+        """The dense system matrix: how excess demand for each good moves with each price."""
+        matrix = np.diag(self._diagonal())
+        np.add.at(matrix, (self.rows, self.cols), self.cross)
+        return matrix
+
+    def inverse(self):
+        """Inverse of `matrix()`, computed on first use and kept."""
+        if self._inverse is None:
+            self._inverse = _read_only(np.linalg.inv(self.matrix()))
+        return self._inverse
+
+    def _updated(self, i, j, delta, **changes):
+        # Copy with matrix()[i, j] changed by `delta`. A rank-one change, so a
+        # known inverse is updated with Sherman-Morrison in O(n^2).
+        goods = object.__new__(RelatedGoods)
+        goods.__dict__.update(self.__dict__)
+        goods.__dict__.update(changes)
+        goods._inverse = None
+        if self._inverse is not None:
+            denominator = 1 + delta * self._inverse[j, i]
+            if abs(denominator) > 1e-12:
+                goods._inverse = _read_only(self._inverse - np.outer(self._inverse[:, i], self._inverse[j]) * (delta / denominator))
+        return goods
+
+    def with_slope(self, good, other, slope):
+        """Copy with the demand for `good` moving by `slope` units per $1 on the price of `other` (itself included)."""
+        i, j = self.index[good], self.index[other]
+        if i == j:
+            own_slope = self.own_slope.copy()
+            delta, own_slope[i] = slope - own_slope[i], slope
+            return self._updated(i, i, delta, own_slope=_read_only(own_slope))
+        link = np.flatnonzero((self.rows == i) & (self.cols == j))
+        if len(link):
+            cross = self.cross.copy()
+            delta, cross[link[0]] = slope - cross[link[0]], slope
+            return self._updated(i, j, delta, cross=_read_only(cross))
+        return self._updated(
+            i, j, slope,
+            rows=_read_only(np.append(self.rows, i)), cols=_read_only(np.append(self.cols, j)),
+            cross=_read_only(np.append(self.cross, float(slope))),
+        )
+
+    def with_supply_slope(self, good, slope):
+        """Copy with the supply of `good` rising by `slope` units per $1."""
+        i = self.index[good]
+        supply_slope = self.supply_slope.copy()
+        delta, supply_slope[i] = supply_slope[i] - slope, slope
+        return self._updated(i, i, delta, supply_slope=_read_only(supply_slope))
+
+    def _iterate(self, rhs, tolerance=1e-12, max_iterations=10_000):
+        # Jacobi: every good's price clears its own market given the others'
+        # prices from the last round. Converges whenever each good's own
+        # slopes outweigh its cross effects, as for most real goods.
+        diagonal = self._diagonal()[:, None]
+        prices = rhs / diagonal
+        for _ in range(max_iterations):
+            updated = (rhs - self._cross_times(prices)) / diagonal
+            if np.max(np.abs(updated - prices), initial=0) <= tolerance * max(1, np.max(np.abs(updated), initial=0)):
+                return updated
+            prices = updated
+        raise ValueError(f"Prices did not settle after {max_iterations} rounds; try method=\"direct\"")
+
+    def solve(self, demand_shift=0, supply_shift=0, tax_on_sellers=0, tax_on_buyers=0, method=None):
+        """Prices and quantities that clear every market at once.
+
+        Shifts (in units) and taxes (in $ per unit) are numbers, one value
+        per good or arrays whose first axis is the goods, broadcast like
+        `markets.solve_markets`, so a `(1, n)` array gives n scenarios for
+        every good. `method` is "direct" (the kept inverse) or "iterative"
+        (Jacobi over the links); by default goods up to `DIRECT_LIMIT` are
+        solved directly. Returns a dict of arrays shaped `(goods, ...)`:
+        the market `price`, `buyer_price`, `seller_price` and `quantity`.
+        """
+        if method is None:
+            method = "direct" if len(self) <= DIRECT_LIMIT else "iterative"
+        if method not in METHODS:
+            raise ValueError(f"method must be one of {', '.join(METHODS)}, not {method!r}")
+        ds, ss, ts, tb = _per_market(len(self), demand_shift, supply_shift, tax_on_sellers, tax_on_buyers)
+        shape = ds.shape
+        ds, ss, ts, tb = (a.reshape(len(self), -1) for a in (ds, ss, ts, tb))
+        own, slope = self.own_slope[:, None], self.supply_slope[:, None]
+        # Buyers face every price plus its tax on buyers; sellers get theirs
+        # minus the tax on sellers.
+        rhs = (self.supply_intercept[:, None] - slope * ts + ss
+               - self.demand_intercept[:, None] - own * tb - self._cross_times(tb) - ds)
+        price = self.inverse() @ rhs if method == "direct" else self._iterate(rhs)
+        quantity = self.supply_intercept[:, None] + slope * (price - ts) + ss
+        result = {"price": price, "buyer_price": price + tb, "seller_price": price - ts, "quantity": quantity}
+        return {name: values.reshape(shape) for name, values in result.items()}
+
+    def demand_schedule(self, good, prices, related_prices):
+        """Quantity of `good` demanded at each of `prices`, every good's price otherwise at `related_prices`."""
+        i = self.index[good]
+        links = self.rows == i
+        related = np.asarray(related_prices, dtype=float)[self.cols[links]]
+        return self.demand_intercept[i] + self.cross[links] @ related + self.own_slope[i] * np.asarray(prices, dtype=float)
+
+    def supply_schedule(self, good, prices):
+        """Quantity of `good` supplied at each of `prices`."""
+        i = self.index[good]
+        return self.supply_intercept[i] + self.supply_slope[i] * np.asarray(prices, dtype=float)
+
+
+def lesson_goods(demand=None, supply=None):
+    """Ice cream with a substitute (frozen yogurt) and a complement (cones).
+
+    `demand` and `supply` are the straight ice cream curves
+    (`curves.Linear`) at $3 frozen yogurt and $1 cones; by default the
+    lesson's own (`80 - 10p` scoops demanded, `10p` supplied). The other two
+    markets are calibrated so that all three clear at once: ice cream where
+    its curves cross, frozen yogurt at $3 and cones at $1.
+    """
+    demand = model.demand_curve if demand is None else demand
+    supply = model.supply_curve if supply is None else supply
+    if supply.slope == demand.slope:
+        raise ValueError("The ice cream demand and supply curves are parallel and never cross")
+    price = (demand.intercept - supply.intercept) / (supply.slope - demand.slope)
+    return RelatedGoods(
+        ["ice cream", "frozen yogurt", "cones"],
+        # Undo the $3 frozen yogurt and $1 cones already priced into `demand`.
+        demand_intercept=[demand.intercept - 4 * 3 + 3 * 1, 60 - 2 * price, 70 + 2 * price],
+        own_slope=[demand.slope, -10, -30],
+        supply_intercept=[supply.intercept, 0, 0],
+        supply_slope=[supply.slope, 10, 40],
+        cross={
+            ("ice cream", "frozen yogurt"): 4,
+            ("ice cream", "cones"): -3,
+            ("frozen yogurt", "ice cream"): 2,
+            ("cones", "ice cream"): -2,
+        },
+    )
@@ -0,0 +1,215 @@
+"""Chart rendering: a figure pool, rasterization and the shared image cache.
+
+matplotlib is imported the first time a figure is actually created, so
+importing this module stays cheap.
+"""
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from icecream_market.timing import span
+
+
+def chart_key(section, params, fmt="png"):
+    """Content address of a chart: a hash of its section id, inputs and format."""
+    payload = json.dumps([section, fmt, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class RenderCache:
+    """Thread-safe LRU store of encoded chart images, bounded by total bytes."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._entries.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            # An image larger than the whole budget is never worth keeping.
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self.size += len(data)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def get_or_render(self, key, render):
+        # Rendering happens outside the lock, so two sessions missing on the
+        # same key may both render it; the second put simply replaces the first.
+        data = self.get(key)
+        if data is None:
+            data = render()
+            self.put(key, data)
+        return data
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+class FigurePool:
+    """A small pool of reusable matplotlib figures.
+
+    Figures are created with the object-oriented API, so pyplot never keeps a
+    reference to them. A figure is cleared when it is handed back and kept for
+    the next chart, up to `max_idle` spare figures; anything beyond that is
+    dropped and left to the garbage collector.
+    """
+
+    def __init__(self, max_idle=4, figsize=(6, 4)):
+        self.max_idle = max_idle
+        self.figsize = figsize
+        self.created = 0
+        self.in_use = 0
+        self._idle = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def figure(self):
+        with self._lock:
+            fig = self._idle.pop() if self._idle else None
+            if fig is None:
+                self.created += 1
+            self.in_use += 1
+        if fig is None:
+            from matplotlib.figure import Figure
+
+            fig = Figure(figsize=self.figsize)
+        try:
+            yield fig, fig.add_subplot()
+        finally:
+            fig.clf()
+            fig.set_size_inches(self.figsize)
+            with self._lock:
+                self.in_use -= 1
+                if len(self._idle) < self.max_idle:
+                    self._idle.append(fig)
+
+    def stats(self):
+        with self._lock:
+            return {"created": self.created, "in_use": self.in_use, "idle": len(self._idle)}
+
+
+def open_pyplot_figures():
+    # Only look at pyplot's registry if something already imported it.
+    helpers = sys.modules.get("matplotlib._pylab_helpers")
+    return helpers.Gcf.get_num_fig_managers() if helpers else 0
+
+
+def process_rss_bytes():
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    # No procfs (e.g. macOS): fall back to the peak RSS, reported in bytes there.
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def memory_gauge(pool):
+    """Snapshot of open figures and retained memory for this process."""
+    return {
+        **pool.stats(),
+        "pyplot_figures": open_pyplot_figures(),
+        "rss_bytes": process_rss_bytes(),
+    }
+
+
+# Resolutions charts are rasterized at, from the sharpest to the lightest.
+DPI_PROFILES = {"high": 200, "standard": 120, "low": 80}
+IMAGE_FORMATS = ("auto", "png", "svg")
+# With "auto", a chart of up to this many plotted points is sent as SVG and a
+# denser one as PNG: SVG grows with every point, PNG only with the image size.
+SVG_MAX_POINTS = 2000
+_SVG_DATA_URL = "data:image/svg+xml;base64,"
+
+
+def is_svg(data):
+    return data.lstrip().startswith((b"<?xml", b"<svg"))
+
+
+def sent_bytes(data):
+    """Bytes an encoded chart costs to send: Streamlit inlines SVG as a base64 data URL."""
+    if is_svg(data):
+        return len(_SVG_DATA_URL) + 4 * -(-len(data) // 3)
+    return len(data)
+
+
+def _encode(fig, fmt, dpi):
+    image = io.BytesIO()
+    if fmt == "svg":
+        from matplotlib import rc_context
+
+        # Text stays text rather than glyph outlines, and without a timestamp
+        # the same chart always encodes to the same bytes.
+        with rc_context({"svg.fonttype": "none"}):
+            fig.savefig(image, format="svg", bbox_inches="tight", metadata={"Date": None})
+    else:
+        fig.savefig(image, format=fmt, bbox_inches="tight", dpi=dpi)
+    return image.getvalue()
+
+
+def _points(fig):
+    # Vertices, markers and labels on the figure: a count taken straight from
+    # the artists, far cheaper than encoding the chart to find out.
+    total = 0
+    for ax in fig.axes:
+        total += sum(len(line.get_xydata()) for line in ax.lines) + len(ax.texts)
+        for collection in ax.collections:
+            total += len(collection.get_offsets()) + sum(len(path.vertices) for path in collection.get_paths())
+    return total
+
+
+def render_chart(draw, pool, fmt="png", dpi=200):
+    """Draw a chart on a pooled figure and return the encoded image bytes.
+
+    With `fmt="auto"` the chart is encoded once, as SVG for charts of a few
+    lines and as PNG for dense ones (more than `SVG_MAX_POINTS` points).
+    """
+    with pool.figure() as (fig, ax):
+        with span("draw"):
+            draw(ax)
+        with span("rasterize"):
+            if fmt == "auto":
+                fmt = "svg" if _points(fig) <= SVG_MAX_POINTS else "png"
+            return _encode(fig, fmt, dpi)
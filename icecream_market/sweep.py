@@ -0,0 +1,226 @@
+"""Batch mode: solve a grid of market scenarios and stream the results to a file.
+
+Every combination of demand shift, supply shift, tax on sellers and tax on
+buyers is solved with the same model the app uses, giving the equilibrium,
+the prices each side faces and how the tax burden is split; scenarios where
+nothing trades (the curves never meet, or meet at zero scoops) are marked
+with `trades` false and their equilibrium columns left empty. With
+`--control-prices`, each scenario is repeated for every controlled price
+with the quantities demanded and supplied there, the surplus or shortage
+and whether the price acts as a floor or a ceiling.
+
+The grid is cut into chunks that a process pool solves in parallel; chunks
+are written in order as they finish, so the table never has to fit in
+memory. Output is CSV, or Parquet (requires pyarrow) for `.parquet` files.
+
+    python -m icecream_market.sweep --demand-shifts=-40:40:1 --supply-shifts=-40:40:1 \\
+        --seller-taxes 0:5:0.25 --buyer-taxes 0:5:0.25 --output scenarios.parquet
+"""
+import argparse
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from icecream_market import model
+from icecream_market.curves import interp
+
+_worker = {}
+
+
+def parse_values(text):
+    """Grid values from "start:stop:step" (stop included) or a comma-separated list."""
+    if ":" in text:
+        start, stop, step = (float(v) for v in text.split(":"))
+        if step <= 0:
+            raise ValueError(f"step must be positive in {text!r}")
+        return np.arange(start, stop + step / 2, step)
+    return np.array([float(v) for v in text.split(",")])
+
+
+def _init_worker(schedule, axes, control_prices):
+    prices, demand, supply = (np.asarray(a, dtype=float) for a in schedule)
+    order = np.argsort(prices)
+    _worker.update(
+        prices=prices[order], demand=demand[order], supply=supply[order],
+        axes=axes, shape=tuple(len(a) for a in axes), control_prices=control_prices,
+    )
+
+
+def solve_chunk(start, stop):
+    """Columns for scenarios `start:stop` of the flattened grid."""
+    prices, demand, supply = _worker["prices"], _worker["demand"], _worker["supply"]
+    shape = _worker["shape"]
+    idx = np.unravel_index(np.arange(start, stop), shape)
+    ds, ss, ts, tb = (axis[i] for axis, i in zip(_worker["axes"], idx))
+
+    quantity, price = model.solve_equilibrium(prices, demand, supply, ds, ss, ts, tb)
+    # Nothing trades where the curves do not meet, or only meet at zero
+    # scoops (a demand shifted down to exactly where supply starts); both
+    # leave the equilibrium columns empty.
+    trades = quantity > 0
+    quantity, price = np.where(trades, quantity, np.nan), np.where(trades, price, np.nan)
+    # The burden is measured against the untaxed equilibrium of the same
+    # shifted market, solved once per shift pair in the chunk.
+    pairs, inverse = np.unique(np.ravel_multi_index(idx[:2], shape[:2]), return_inverse=True)
+    pair_ds, pair_ss = np.unravel_index(pairs, shape[:2])
+    _, untaxed_price = model.solve_equilibrium(prices, demand, supply, _worker["axes"][0][pair_ds], _worker["axes"][1][pair_ss])
+    untaxed_price = untaxed_price[inverse]
+    buyer_price = price + tb
+    seller_price = price - ts
+    columns = {
+        "demand_shift": ds, "supply_shift": ss, "tax_on_sellers": ts, "tax_on_buyers": tb,
+        "trades": trades,
+        "quantity": quantity, "price": price, "buyer_price": buyer_price, "seller_price": seller_price,
+        "buyer_burden": buyer_price - untaxed_price, "seller_burden": untaxed_price - seller_price,
+    }
+
+    control_prices = _worker["control_prices"]
+    if control_prices is None:
+        return columns
+    columns = {name: np.repeat(values, len(control_prices)) for name, values in columns.items()}
+    control = np.tile(control_prices, stop - start)
+    ds, ss, ts, tb, price = (columns[name] for name in ("demand_shift", "supply_shift", "tax_on_sellers", "tax_on_buyers", "price"))
+    # At a controlled market price buyers still pay the tax on buyers on top
+    # and sellers still hand over the tax on sellers.
+    # A curve shifted past zero scoops means nobody buys or sells there.
+    quantity_demanded = np.maximum(interp(control + tb, prices, demand) + ds, 0)
+    quantity_supplied = np.maximum(interp(control - ts, prices, supply) + ss, 0)
+    columns.update(
+        control_price=control,
+        quantity_demanded=quantity_demanded,
+        quantity_supplied=quantity_supplied,
+        excess_supply=quantity_supplied - quantity_demanded,
+        traded_quantity=np.minimum(quantity_demanded, quantity_supplied),
+        control=np.select([control > price, control < price], ["floor", "ceiling"], "none"),
+    )
+    return columns
+
+
+def _chunks(total, chunk_size):
+    for start in range(0, total, chunk_size):
+        yield start, min(start + chunk_size, total)
+
+
+def _solve_in_order(chunks, workers, initargs):
+    # Keep a bounded number of chunks in flight and hand them back in grid
+    # order, so memory stays flat however large the grid is.
+    if workers <= 1:
+        _init_worker(*initargs)
+        for start, stop in chunks:
+            yield solve_chunk(start, stop)
+        return
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=initargs) as pool:
+        pending = deque()
+        for start, stop in chunks:
+            pending.append(pool.submit(solve_chunk, start, stop))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class TableWriter:
+    """Appends column chunks to a CSV or Parquet file."""
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.parquet = self.path.lower().endswith((".parquet", ".pq"))
+        self.rows = 0
+        self._file = None
+        self._writer = None
+
+    def write(self, columns):
+        if self.parquet:
+            try:
+                import pyarrow as pa
+                import pyarrow.parquet as pq
+            except ImportError as e:
+                raise ImportError("Writing Parquet files requires pyarrow (pip install pyarrow)") from e
+            table = pa.table(columns)
+            if self._writer is None:
+                self._writer = pq.ParquetWriter(self.path, table.schema)
+            self._writer.write_table(table)
+        else:
+            import pandas as pd
+
+            if self._file is None:
+                self._file = open(self.path, "w", newline="")
+            pd.DataFrame(columns).to_csv(self._file, header=self.rows == 0, index=False)
+        self.rows += len(next(iter(columns.values())))
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._file is not None:
+            self._file.close()
+
+
+def sweep(output, schedule, demand_shifts=(0,), supply_shifts=(0,), seller_taxes=(0,), buyer_taxes=(0,),
+          control_prices=None, workers=None, chunk_size=None):
+    """Solve the full grid and write it to `output`. Returns the number of rows written."""
+    axes = tuple(np.asarray(a, dtype=float) for a in (demand_shifts, supply_shifts, seller_taxes, buyer_taxes))
+    if control_prices is not None:
+        control_prices = np.asarray(control_prices, dtype=float)
+    total = int(np.prod([len(a) for a in axes]))
+    if chunk_size is None:
+        # The solver holds about two values per schedule point per scenario.
+        chunk_size = max(1, min(100_000, 4_000_000 // len(schedule[0])))
+        if control_prices is not None:
+            chunk_size = max(1, chunk_size // len(control_prices))
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    writer = TableWriter(output)
+    try:
+        for columns in _solve_in_order(_chunks(total, chunk_size), workers, (schedule, axes, control_prices)):
+            writer.write(columns)
+    finally:
+        writer.close()
+    return writer.rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Solve a grid of market scenarios and write the results to CSV or Parquet."
+    )
+    parser.add_argument("--output", required=True, help="output file; .parquet or .pq writes Parquet, anything else CSV")
+    parser.add_argument("--demand-shifts", default="0", help='shifts in scoops, "start:stop:step" or "a,b,c"')
+    parser.add_argument("--supply-shifts", default="0", help="shifts in scoops")
+    parser.add_argument("--seller-taxes", default="0", help="taxes on sellers in $")
+    parser.add_argument("--buyer-taxes", default="0", help="taxes on buyers in $")
+    parser.add_argument("--control-prices", help="price floors/ceilings in $ to evaluate for every scenario")
+    parser.add_argument("--sales-data", help="CSV/Parquet sales log to use instead of the built-in market")
+    parser.add_argument("--bin-width", type=float, default=1, help="price bin width for --sales-data")
+    parser.add_argument("--max-price", type=float, help="highest price kept from --sales-data")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--chunk-size", type=int, help="scenarios per task")
+    args = parser.parse_args(argv)
+
+    if args.sales_data:
+        from icecream_market.ingest import aggregate_schedule
+
+        market = aggregate_schedule(args.sales_data, bin_width=args.bin_width, high=args.max_price)
+    else:
+        market = model.data
+    schedule = (market["Price (in $)"], market["Quantity Demanded (in scoops)"], market["Quantity Supplied (in scoops)"])
+
+    start = time.perf_counter()
+    rows = sweep(
+        args.output, schedule,
+        demand_shifts=parse_values(args.demand_shifts),
+        supply_shifts=parse_values(args.supply_shifts),
+        seller_taxes=parse_values(args.seller_taxes),
+        buyer_taxes=parse_values(args.buyer_taxes),
+        control_prices=parse_values(args.control_prices) if args.control_prices else None,
+        workers=args.workers,
+        chunk_size=args.chunk_size,
+    )
+    print(f"Wrote {rows:,} rows to {args.output} in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
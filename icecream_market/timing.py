@@ -0,0 +1,161 @@
+"""Timing spans for the stages of each chapter rerun.
+
+Set ICECREAM_TIMING=1 to record how long each section spends preparing
+data, solving, drawing, rasterizing and generating HTML. Totals are kept
+per process and shown in the ?debug=1 sidebar. With ICECREAM_TIMING_EXPORT
+set, they are also written to that file every few seconds: as Prometheus
+text if it ends in `.prom`, otherwise as JSON lines with one line per span.
+
+When timing is off, `span` hands back one shared no-op context manager and
+`timed_section` returns the function untouched, so the hooks cost next to
+nothing.
+"""
+import contextlib
+import functools
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+
+ENABLED = os.environ.get("ICECREAM_TIMING", "").strip().lower() not in ("", "0", "false", "no", "off")
+EXPORT_PATH = os.environ.get("ICECREAM_TIMING_EXPORT") or None
+EXPORT_INTERVAL = 5.0
+
+_OFF = contextlib.nullcontext()
+_current = threading.local()
+
+
+class Timings:
+    """Process-wide span totals, plus the spans not yet written out."""
+
+    def __init__(self, keep_events=False, max_events=100_000):
+        self.keep_events = keep_events
+        self._totals = {}
+        self._events = deque(maxlen=max_events)
+        self._last_export = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, section, stage, seconds):
+        with self._lock:
+            count, total, worst, _ = self._totals.get((section, stage), (0, 0.0, 0.0, 0.0))
+            self._totals[(section, stage)] = (count + 1, total + seconds, max(worst, seconds), seconds)
+            if self.keep_events:
+                self._events.append((time.time(), section, stage, seconds))
+
+    def snapshot(self):
+        """One row per (section, stage), slowest total first."""
+        with self._lock:
+            items = list(self._totals.items())
+        rows = [
+            {"section": section, "stage": stage, "count": count, "total_seconds": total,
+             "max_seconds": worst, "last_seconds": last}
+            for (section, stage), (count, total, worst, last) in items
+        ]
+        return sorted(rows, key=lambda row: row["total_seconds"], reverse=True)
+
+    def prometheus(self):
+        rows = self.snapshot()
+        lines = []
+        for name, kind, field in (
+            ("icecream_span_seconds_total", "counter", "total_seconds"),
+            ("icecream_spans_total", "counter", "count"),
+            ("icecream_span_seconds_max", "gauge", "max_seconds"),
+        ):
+            lines.append(f"# TYPE {name} {kind}")
+            for row in rows:
+                lines.append(f'{name}{{section="{row["section"]}",stage="{row["stage"]}"}} {row[field]}')
+        return "\n".join(lines) + "\n"
+
+    def drain_json_lines(self):
+        """Spans recorded since the last call, one JSON object per line."""
+        with self._lock:
+            events, self._events = list(self._events), deque(maxlen=self._events.maxlen)
+        return "".join(
+            json.dumps({"time": at, "section": section, "stage": stage, "seconds": seconds}) + "\n"
+            for at, section, stage, seconds in events
+        )
+
+    def export(self, path):
+        if path.endswith(".prom"):
+            # Write-then-rename, so a scraper never reads a half-written file.
+            # Each writer gets its own temporary file next to `path`, so
+            # threads and processes exporting at once never share one.
+            with tempfile.NamedTemporaryFile("w", dir=os.path.dirname(path) or ".",
+                                             prefix=os.path.basename(path) + ".", suffix=".tmp", delete=False) as f:
+                f.write(self.prometheus())
+            try:
+                # Temporary files are private to their owner; a scraper may not be.
+                os.chmod(f.name, 0o644)
+                os.replace(f.name, path)
+            except OSError:
+                os.unlink(f.name)
+                raise
+        else:
+            lines = self.drain_json_lines()
+            if lines:
+                with open(path, "a") as f:
+                    f.write(lines)
+
+    def export_if_due(self, path, interval=EXPORT_INTERVAL):
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_export < interval:
+                return
+            self._last_export = now
+        self.export(path)
+
+    def clear(self):
+        with self._lock:
+            self._totals.clear()
+            self._events.clear()
+
+
+TIMINGS = Timings(keep_events=bool(EXPORT_PATH) and not str(EXPORT_PATH).endswith(".prom"))
+
+
+class _Span:
+    __slots__ = ("stage", "start")
+
+    def __init__(self, stage):
+        self.stage = stage
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        section = getattr(_current, "section", None) or "page"
+        TIMINGS.record(section, self.stage, time.perf_counter() - self.start)
+
+
+def span(stage):
+    """Time a stage ("data", "solve", "draw", ...) of the running section."""
+    if not ENABLED:
+        return _OFF
+    return _Span(stage)
+
+
+def timed_section(fn):
+    """Attribute spans inside `fn` to its section and time the whole run.
+
+    The section is named after the function, without its `_section` suffix.
+    """
+    if not ENABLED:
+        return fn
+    name = fn.__name__.removesuffix("_section")
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        outer = getattr(_current, "section", None)
+        _current.section = name
+        try:
+            with _Span("total"):
+                return fn(*args, **kwargs)
+        finally:
+            _current.section = outer
+            if EXPORT_PATH:
+                TIMINGS.export_if_due(EXPORT_PATH)
+
+    return wrapper
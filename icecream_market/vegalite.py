@@ -0,0 +1,171 @@
+"""Vega-Lite chart specs for rendering charts in the browser.
+
+`SpecAxes` takes the same drawing calls the chapters make on a matplotlib
+Axes (`plot`, `scatter`, `annotate`, `fill_between`, ...) and records
+them as layers of a Vega-Lite spec, so every chart can be drawn by either
+backend without a second copy of its drawing code. Only the small subset
+of the Axes API the chapters use is supported.
+"""
+import numpy as np
+
+# matplotlib's single-letter colour codes; named colours are valid CSS already.
+COLOR_CODES = {
+    "b": "blue", "g": "green", "r": "red", "c": "cyan",
+    "m": "magenta", "y": "yellow", "k": "black", "w": "white",
+}
+DASHES = {"-": None, "solid": None, "--": [6, 4], "dashed": [6, 4], ":": [1, 3], "dotted": [1, 3], "-.": [6, 3, 1, 3]}
+
+# Layers are stacked like matplotlib's default z-orders: patches and
+# scatter points under lines, text on top.
+ZORDER = {"area": 1, "point": 1, "line": 2, "rule": 2, "text": 3}
+
+
+def _values(**columns):
+    # Rows of inline data; NaN and inf become null so the spec stays valid JSON.
+    arrays = {name: np.atleast_1d(np.asarray(values, dtype=float)) for name, values in columns.items()}
+    arrays = dict(zip(arrays, np.broadcast_arrays(*arrays.values())))
+    columns = {name: [v if np.isfinite(v) else None for v in a.tolist()] for name, a in arrays.items()}
+    return [dict(zip(columns, row)) for row in zip(*columns.values())]
+
+
+def _color(color, default="steelblue"):
+    if color is None:
+        return default
+    return COLOR_CODES.get(color, color)
+
+
+class SpecAxes:
+    """Stand-in for a matplotlib Axes that builds a layered Vega-Lite spec."""
+
+    def __init__(self):
+        self.layers = []
+        self.xlabel = None
+        self.ylabel = None
+        self.title = None
+        self.grid_opacity = None
+        self.show_legend = False
+        self.limits = {}
+
+    def _add(self, mark, values, encoding, label=None, zorder=None, **style):
+        mark = {"type": mark, **{k: v for k, v in style.items() if v is not None}}
+        layer = {"mark": mark, "data": {"values": values}, "encoding": encoding}
+        self.layers.append((ZORDER[mark["type"]] if zorder is None else zorder, label, layer))
+
+    def plot(self, x, y, label=None, color=None, linestyle="-", linewidth=1.5, alpha=None, **kwargs):
+        self._add(
+            "line", _values(x=x, y=y), {"x": {"field": "x", "type": "quantitative"}, "y": {"field": "y", "type": "quantitative"}},
+            label, color=_color(color), strokeDash=DASHES.get(linestyle), strokeWidth=linewidth, opacity=alpha
+        )
+
+    def scatter(self, x, y, color=None, s=36, alpha=None, zorder=None, label=None, **kwargs):
+        self._add(
+            "point", _values(x=x, y=y), {"x": {"field": "x", "type": "quantitative"}, "y": {"field": "y", "type": "quantitative"}},
+            label, zorder, filled=True, color=_color(color), size=s, opacity=alpha, tooltip=True
+        )
+
+    def fill_betweenx(self, y, x1, x2=0, color=None, alpha=None, label=None, **kwargs):
+        self._add(
+            "area", _values(y=y, x=x1, x2=x2),
+            {"y": {"field": "y", "type": "quantitative"}, "x": {"field": "x", "type": "quantitative"}, "x2": {"field": "x2"}},
+            label, orient="horizontal", color=_color(color), opacity=alpha
+        )
+
+    def fill_between(self, x, y1, y2=0, color=None, alpha=None, label=None, **kwargs):
+        self._add(
+            "area", _values(x=x, y=y1, y2=y2),
+            {"x": {"field": "x", "type": "quantitative"}, "y": {"field": "y", "type": "quantitative"}, "y2": {"field": "y2"}},
+            label, color=_color(color), opacity=alpha
+        )
+
+    def axhline(self, y=0, color=None, linestyle="-", linewidth=1, alpha=None, label=None, **kwargs):
+        self._add(
+            "rule", _values(y=y), {"y": {"field": "y", "type": "quantitative"}},
+            label, color=_color(color), strokeDash=DASHES.get(linestyle), strokeWidth=linewidth, opacity=alpha
+        )
+
+    def axvline(self, x=0, color=None, linestyle="-", linewidth=1, alpha=None, label=None, **kwargs):
+        self._add(
+            "rule", _values(x=x), {"x": {"field": "x", "type": "quantitative"}},
+            label, color=_color(color), strokeDash=DASHES.get(linestyle), strokeWidth=linewidth, opacity=alpha
+        )
+
+    def text(self, x, y, s, color=None, fontsize=10, va="baseline", ha="left", **kwargs):
+        self._add(
+            "text", _values(x=x, y=y), {"x": {"field": "x", "type": "quantitative"}, "y": {"field": "y", "type": "quantitative"}},
+            text=str(s), color=_color(color, "black"), fontSize=fontsize, align=ha,
+            baseline="middle" if va == "center" else va
+        )
+
+    def text_layer(self, x, y, texts, color=None, fontsize=10, va="baseline", ha="left"):
+        """Many labels as a single text mark, one row per label."""
+        values = _values(x=x, y=y)
+        for row, text in zip(values, texts):
+            row["label"] = text
+        self._add(
+            "text", values,
+            {"x": {"field": "x", "type": "quantitative"}, "y": {"field": "y", "type": "quantitative"}, "text": {"field": "label"}},
+            color=_color(color, "black"), fontSize=fontsize, align=ha, baseline="middle" if va == "center" else va
+        )
+
+    def annotate(self, text, xy, xytext=None, fontsize=10, verticalalignment="baseline", color=None, **kwargs):
+        x, y = xy if xytext is None else xytext
+        self.text(x, y, text, color=color, fontsize=fontsize, va=verticalalignment)
+
+    def set_xlabel(self, label):
+        self.xlabel = label
+
+    def set_ylabel(self, label):
+        self.ylabel = label
+
+    def set_xlim(self, left, right):
+        self.limits["x"] = [left, right]
+
+    def set_ylim(self, bottom, top):
+        self.limits["y"] = [bottom, top]
+
+    def set_title(self, title):
+        self.title = title
+
+    def grid(self, visible=True, alpha=1, **kwargs):
+        self.grid_opacity = alpha if visible else None
+
+    def legend(self, fontsize=None, loc=None, **kwargs):
+        self.show_legend = True
+
+    def to_spec(self, height=360):
+        """The recorded drawing as a Vega-Lite spec dict."""
+        layers = [(label, layer) for _, label, layer in sorted(self.layers, key=lambda entry: entry[0])]
+        # Labelled layers share one colour scale, which is what draws the legend.
+        labelled = [(label, layer["mark"]["color"]) for label, layer in layers if label is not None]
+        scale = {"domain": [label for label, _ in labelled], "range": [color for _, color in labelled]}
+        for label, layer in layers:
+            for channel, title in (("x", self.xlabel), ("y", self.ylabel)):
+                if channel in layer["encoding"]:
+                    layer["encoding"][channel]["title"] = title
+                    layer["encoding"][channel]["scale"] = {"zero": False}
+                    if channel in self.limits:
+                        layer["encoding"][channel]["scale"]["domain"] = self.limits[channel]
+            if label is not None and self.show_legend:
+                for row in layer["data"]["values"]:
+                    row["series"] = label
+                layer["encoding"]["color"] = {"field": "series", "type": "nominal", "scale": scale, "legend": {"title": None, "orient": "bottom", "labelLimit": 0}}
+
+        spec = {
+            "$schema": "https://vega.github.io/schema/vega-lite/v5.json",
+            "height": height,
+            "layer": [layer for _, layer in layers],
+            "config": {"axis": {"grid": self.grid_opacity is not None, "gridOpacity": self.grid_opacity or 0}},
+        }
+        if self.title:
+            spec["title"] = self.title
+        # Drag to pan and scroll to zoom, handled entirely in the browser.
+        if spec["layer"]:
+            spec["layer"][0]["params"] = [{"name": "zoom", "select": "interval", "bind": "scales"}]
+        return spec
+
+
+def chart_spec(draw):
+    """Run a chart's `draw(ax)` function against a `SpecAxes` and return the spec."""
+    ax = SpecAxes()
+    draw(ax)
+    return ax.to_spec()
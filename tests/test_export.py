@@ -0,0 +1,59 @@
+"""The static-site export, on a tiny app so it runs in seconds."""
+import os
+
+import pytest
+
+pytest.importorskip("streamlit")
+pytest.importorskip("markdown")
+
+from icecream_market.export import MARKER, export  # noqa: E402
+
+# Like the real app, the script cannot be imported as a module: it fails
+# if a worker process picks it up as its __main__.
+APP = '''
+import streamlit as st
+
+if __name__ != "__main__":
+    raise RuntimeError("the app was imported as " + __name__)
+
+st.title("Tiny market")
+st.subheader("Scoops")
+scoops = st.slider("Scoops", min_value=0, max_value=3, value=1)
+st.write(f"You ordered {scoops} scoops.")
+st.subheader("Flavour")
+flavour = st.radio("Flavour", ["vanilla", "chocolate"])
+st.write(f"One {flavour}, please.")
+'''
+
+
+@pytest.fixture
+def app(tmp_path):
+    path = tmp_path / "tiny_app.py"
+    path.write_text(APP)
+    return str(path)
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_export_writes_every_state(app, tmp_path, workers):
+    output = str(tmp_path / "site")
+    assert export(output, app, workers=workers) == 4 + 2
+    assert os.path.exists(os.path.join(output, MARKER))
+    assert "You ordered 1 scoops." in read(os.path.join(output, "index.html"))
+    for i in range(4):
+        assert f"You ordered {i} scoops." in read(os.path.join(output, "sections", "1", f"{i}.html"))
+    for i, flavour in enumerate(["vanilla", "chocolate"]):
+        assert f"One {flavour}, please." in read(os.path.join(output, "sections", "2", f"{i}.html"))
+
+
+def test_export_keeps_foreign_directories(app, tmp_path):
+    output = tmp_path / "site"
+    output.mkdir()
+    (output / "notes.txt").write_text("mine")
+    with pytest.raises(ValueError, match="--force"):
+        export(str(output), app, workers=1)
+    assert (output / "notes.txt").read_text() == "mine"
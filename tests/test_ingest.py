@@ -0,0 +1,72 @@
+"""Sales-log ingestion on a log small enough to bin by hand."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from icecream_market.ingest import MAX_BINS, aggregate_schedule
+
+# Bids at $1.20, $3.70, $3.10 and $5.50; offers at $0.50, $2.40 and $4.90.
+# The last four rows are dropped: no price, a negative price, no quantity and
+# a side that is neither.
+LOG = pd.DataFrame({
+    "price": [1.2, 3.7, 3.1, 5.5, 0.5, 2.4, 4.9, np.nan, -1, 2.0, 2.0],
+    "quantity": [5, 10, 2, 4, 3, 6, 5, 7, 7, np.nan, 1],
+    "side": ["buy", "bid", " Buy ", "demand", "sell", "ask", "offer", "buy", "sell", "buy", "hold"],
+})
+
+
+@pytest.fixture(params=[".csv", ".parquet"])
+def log(request, tmp_path):
+    path = tmp_path / f"sales{request.param}"
+    if request.param == ".parquet":
+        pytest.importorskip("pyarrow")
+        LOG.to_parquet(path)
+    else:
+        LOG.to_csv(path, index=False)
+    return path
+
+
+def schedule(market):
+    return tuple(market[column] for column in ("Price (in $)", "Quantity Demanded (in scoops)", "Quantity Supplied (in scoops)"))
+
+
+@pytest.mark.parametrize("chunksize", [3, 1_000_000])
+def test_bins_add_up_across_chunks(log, chunksize):
+    # Demand at a price is everything bid at or above it, supply everything
+    # offered at or below it.
+    prices, demand, supply = schedule(aggregate_schedule(log, chunksize=chunksize))
+    assert prices == [0, 1, 2, 3, 4, 5]
+    assert demand == [21, 21, 16, 16, 4, 4]
+    assert supply == [3, 3, 9, 9, 14, 14]
+
+
+def test_wider_bins(log):
+    prices, demand, supply = schedule(aggregate_schedule(log, bin_width=2, chunksize=4))
+    assert (prices, demand, supply) == ([0, 2, 4], [21, 16, 4], [3, 9, 14])
+
+
+def test_high_keeps_bids_above_it_and_drops_offers(log):
+    # The $5.50 bid still buys at $3; the $4.90 offer never sells that low.
+    prices, demand, supply = schedule(aggregate_schedule(log, high=3, chunksize=4))
+    assert (prices, demand, supply) == ([0, 1, 2, 3], [21, 21, 16, 16], [3, 3, 9, 9])
+
+
+def test_low_keeps_offers_below_it_and_drops_bids(log):
+    prices, demand, supply = schedule(aggregate_schedule(log, low=2, chunksize=4))
+    assert (prices, demand, supply) == ([2, 3, 4, 5], [16, 16, 4, 4], [9, 9, 14, 14])
+
+
+def test_stray_price_is_refused_unless_trimmed(tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.concat([LOG, pd.DataFrame({"price": [1e12], "quantity": [1], "side": ["sell"]})]).to_csv(path, index=False)
+    with pytest.raises(ValueError, match=f"{MAX_BINS:,} bins"):
+        aggregate_schedule(path)
+    prices, _, supply = schedule(aggregate_schedule(path, high=5))
+    assert prices == [0, 1, 2, 3, 4, 5] and supply[-1] == 14
+
+
+def test_log_without_both_sides(tmp_path):
+    path = tmp_path / "sales.csv"
+    LOG[LOG["side"] == "buy"].to_csv(path, index=False)
+    with pytest.raises(ValueError, match="fewer than two price bins"):
+        aggregate_schedule(path)
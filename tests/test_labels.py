@@ -0,0 +1,57 @@
+"""Culling and spacing of curve labels."""
+import numpy as np
+
+from icecream_market.labels import MAX_LABELS, label_points, push_apart, spread_out
+
+
+class RecordingAxes:
+    """Stands in for a matplotlib Axes and keeps the labels drawn on it."""
+
+    def __init__(self):
+        self.texts = []
+
+    def text(self, x, y, text, **kwargs):
+        self.texts.append((x, y, text))
+
+
+def test_push_apart_keeps_the_minimum_gap_and_the_order():
+    positions = np.array([5.0, 0.0, 5.05, 0.1, 0.2, 9.0])
+    moved = push_apart(positions, 1)
+    assert (np.diff(np.sort(moved)) >= 1 - 1e-12).all()
+    np.testing.assert_array_equal(np.argsort(moved, kind="stable"), np.argsort(positions, kind="stable"))
+    # Each crowded run is spread around where it was; a label with room stays put.
+    np.testing.assert_allclose(moved, [4.525, -0.9, 5.525, 0.1, 1.1, 9.0])
+
+
+def test_push_apart_leaves_spaced_labels_alone():
+    positions = np.array([1.0, 3.0, 2.0])
+    np.testing.assert_array_equal(push_apart(positions, 1), positions)
+    assert len(push_apart([], 1)) == 0
+
+
+def test_short_curves_keep_every_label():
+    ax = RecordingAxes()
+    prices = np.arange(1, 8)
+    assert label_points(ax, 80 - 10 * prices, prices, "{} scoops") == 7
+    assert [text for _, _, text in ax.texts] == [f"{q} scoops" for q in 80 - 10 * prices]
+    assert [y for _, y, _ in ax.texts] == prices.tolist()
+
+
+def test_long_curves_are_culled_and_spaced():
+    prices = np.linspace(0, 8, 10_001)
+    quantity = 80 - 10 * prices
+    keep = spread_out(quantity, prices)
+    assert len(keep) <= MAX_LABELS and (np.diff(keep) > 0).all()
+
+    ax = RecordingAxes()
+    assert label_points(ax, quantity, prices, offset=(0, 0)) == len(keep)
+    label_y = np.array([y for _, y, _ in ax.texts])
+    # The labels still read down the curve in order, at least one grid row apart.
+    row = np.ptp(prices[keep]) / MAX_LABELS
+    assert (np.diff(label_y) >= row - 1e-9).all()
+    np.testing.assert_allclose(label_y, prices[keep], atol=8 / MAX_LABELS)
+
+
+def test_missing_points_are_not_labelled():
+    ax = RecordingAxes()
+    assert label_points(ax, [1, np.nan, 3], [1, 2, np.nan]) == 1
@@ -0,0 +1,87 @@
+"""The batch solvers in `markets` against the single-market ones in `model`."""
+import numpy as np
+import pytest
+
+from icecream_market import model
+from icecream_market.markets import MarketRegistry, market_welfare, solve_markets
+
+COLUMNS = ("Price (in $)", "Quantity Demanded (in scoops)", "Quantity Supplied (in scoops)")
+
+MARKETS = {
+    "ice cream": model.data,
+    # Uneven price steps and kinked schedules.
+    "gelato": {
+        COLUMNS[0]: [0.5, 1.5, 2, 4, 7],
+        COLUMNS[1]: [90, 70, 66, 30, 5],
+        COLUMNS[2]: [0, 12, 20, 48, 95],
+    },
+    # Only three points, so most scenarios run off the ends of the schedule.
+    "sorbet": {
+        COLUMNS[0]: [1, 2, 3],
+        COLUMNS[1]: [40, 30, 20],
+        COLUMNS[2]: [10, 20, 30],
+    },
+}
+
+# One row of scenarios applied to every market: (1, n) arrays.
+DEMAND_SHIFTS = np.array([[-200, -20, 0, 0, 15]])
+TAXES = np.array([[0, 1, 0, 2.5, 1]])
+
+
+def schedule(name):
+    return tuple(np.asarray(MARKETS[name][column], dtype=float) for column in COLUMNS)
+
+
+def assert_same(batch, scalar):
+    batch, scalar = np.asarray(batch), np.asarray(scalar)
+    np.testing.assert_array_equal(np.isnan(batch), np.isnan(scalar))
+    np.testing.assert_allclose(batch, scalar, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+
+@pytest.fixture(scope="module")
+def registry():
+    return MarketRegistry.from_markets(MARKETS)
+
+
+@pytest.mark.parametrize("levied_on", ["sellers", "buyers"])
+def test_solve_markets_matches_solve_equilibrium(registry, levied_on):
+    taxes = {"tax_on_sellers": TAXES} if levied_on == "sellers" else {"tax_on_buyers": TAXES}
+    quantity, price = solve_markets(registry.prices, registry.demand, registry.supply, DEMAND_SHIFTS, **taxes)
+    assert quantity.shape == price.shape == (len(MARKETS), DEMAND_SHIFTS.shape[1])
+    for i, name in enumerate(registry.names):
+        scalar_taxes = {key: value[0] for key, value in taxes.items()}
+        scalar_quantity, scalar_price = model.solve_equilibrium(*schedule(name), DEMAND_SHIFTS[0], **scalar_taxes)
+        assert_same(quantity[i], scalar_quantity)
+        assert_same(price[i], scalar_price)
+
+
+def test_no_trade_is_nan_in_both(registry):
+    # Demand shifted far below supply leaves nothing to trade anywhere.
+    quantity, price = solve_markets(registry.prices, registry.demand, registry.supply, DEMAND_SHIFTS)
+    assert np.isnan(quantity[:, 0]).all() and np.isnan(price[:, 0]).all()
+    for name in registry.names:
+        assert np.isnan(model.solve_equilibrium(*schedule(name), DEMAND_SHIFTS[0, 0])).all()
+
+
+def test_market_welfare_matches_welfare(registry):
+    quantity, price = solve_markets(registry.prices, registry.demand, registry.supply, DEMAND_SHIFTS, tax_on_sellers=TAXES)
+    batch = market_welfare(registry.prices, registry.demand, registry.supply, quantity, price, price - TAXES, DEMAND_SHIFTS)
+    for i, name in enumerate(registry.names):
+        scalar = model.welfare(*schedule(name), quantity[i], price[i], price[i] - TAXES[0], DEMAND_SHIFTS[0])
+        for key in ("consumer_surplus", "producer_surplus", "tax_revenue", "total_welfare"):
+            assert_same(batch[key][i], scalar[key])
+
+
+def test_registry_solve_matches_tax_incidence(registry):
+    result = registry.solve(demand_shift=DEMAND_SHIFTS, tax_on_sellers=TAXES)
+    for i, name in enumerate(registry.names):
+        incidence = model.tax_incidence(*schedule(name), TAXES[0], "sellers", DEMAND_SHIFTS[0])
+        for key in ("buyer_burden", "seller_burden", "deadweight_loss"):
+            assert_same(result[key][i], incidence[key])
+
+
+def test_registry_market_round_trips(registry):
+    for name in registry.names:
+        market = registry.market(name)
+        for column in COLUMNS:
+            np.testing.assert_allclose(market[column], MARKETS[name][column])
@@ -0,0 +1,137 @@
+"""The vectorized single-market solvers against the lesson's closed-form answers.
+
+The lesson's market is demand `80 - 10p` and supply `10p` scoops, tabulated
+at whole dollars from $1 to $7: it clears at 40 scoops and $4.
+"""
+import numpy as np
+import pytest
+
+from icecream_market import model
+
+SCHEDULE = tuple(
+    np.asarray(model.data[column], dtype=float)
+    for column in ("Price (in $)", "Quantity Demanded (in scoops)", "Quantity Supplied (in scoops)")
+)
+
+
+@pytest.fixture(scope="module")
+def table():
+    return model.build_slider_table()
+
+
+def test_equilibrium_is_40_scoops_at_4_dollars():
+    assert model.solve_equilibrium(*SCHEDULE) == (40, 4)
+    assert (model.equilibrium_quantity, model.equilibrium_price) == (40, 4)
+
+
+def test_shifted_equilibria():
+    # 10 more scoops of demand: 90 - 10p = 10p at $4.50; 20 more of supply:
+    # 80 - 10p = 10p + 20 at $3.
+    quantity, price = model.solve_equilibrium(*SCHEDULE, demand_shift=[10, 0], supply_shift=[0, 20])
+    np.testing.assert_allclose(quantity, [45, 50])
+    np.testing.assert_allclose(price, [4.5, 3])
+
+
+def test_schedule_order_does_not_matter():
+    reverse = tuple(a[::-1] for a in SCHEDULE)
+    assert model.solve_equilibrium(*reverse, 10) == model.solve_equilibrium(*SCHEDULE, 10)
+
+
+def test_no_trade_is_nan():
+    # With 100 scoops less demand the curves only cross below a zero price.
+    quantity, price = model.solve_equilibrium(*SCHEDULE, demand_shift=[-100, 0])
+    assert np.isnan(quantity[0]) and np.isnan(price[0])
+    assert (quantity[1], price[1]) == (40, 4)
+    # Parallel curves never cross.
+    assert np.isnan(model.solve_equilibrium(SCHEDULE[0], SCHEDULE[2] + 5, SCHEDULE[2])).all()
+
+
+def test_solver_matches_closed_form_over_the_slider_grid():
+    ds, ss, ts, tb = np.meshgrid(model.SHIFT_STEPS, model.SHIFT_STEPS, model.TAX_STEPS, model.TAX_STEPS, indexing="ij")
+    tabulated = model.solve_equilibrium(*SCHEDULE, ds, ss, ts, tb)
+    closed_form = model.market_equilibrium(model.demand_curve, model.supply_curve, ds, ss, ts, tb)
+    for a, b in zip(tabulated, closed_form):
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(b))
+        np.testing.assert_allclose(a, b, atol=1e-9)
+
+
+def test_lookup_equilibrium(table):
+    assert model.lookup_equilibrium(table)["quantity"] == 40
+    assert model.lookup_equilibrium(table)["price"] == 4
+    shifted = model.lookup_equilibrium(table, demand_shift=10)
+    assert (shifted["quantity"], shifted["price"]) == (45, 4.5)
+    # Off the slider grid the lookup solves on the spot.
+    off_grid = model.lookup_equilibrium(table, demand_shift=5, tax_on_sellers=0.5)
+    expected = model.solve_equilibrium(*SCHEDULE, 5, 0, 0.5)
+    assert (off_grid["quantity"], off_grid["price"]) == pytest.approx(expected)
+
+
+def test_lookup_excess_supply(table):
+    # Surplus above the equilibrium price, shortage below it.
+    assert model.lookup_excess_supply(table, 5) == 20
+    assert model.lookup_excess_supply(table, 3) == -20
+    assert model.lookup_excess_supply(table, 4) == 0
+    assert model.lookup_excess_supply(table, 4.5) == 10
+    assert model.lookup_excess_supply(table, 4, demand_shift=-20) == 20
+
+
+def test_equilibrium_table_is_read_only(table):
+    assert table["quantity"].shape == (len(model.SHIFT_STEPS), len(model.SHIFT_STEPS), len(model.TAX_STEPS), len(model.TAX_STEPS))
+    with pytest.raises(ValueError):
+        table["quantity"][0, 0, 0, 0] = 0
+
+
+def test_untaxed_welfare():
+    # Both surpluses are triangles of 40 scoops by $4.
+    surplus = model.welfare(*SCHEDULE, 40, 4, 4)
+    assert surplus == pytest.approx({"consumer_surplus": 80, "producer_surplus": 80, "tax_revenue": 0, "total_welfare": 160})
+
+
+@pytest.mark.parametrize("levied_on", ["sellers", "buyers"])
+def test_one_dollar_tax(levied_on):
+    incidence = model.tax_incidence(*SCHEDULE, 1, levied_on)
+    assert incidence["quantity"] == pytest.approx(35)
+    # The market price is what changes hands: buyers pay $4.50 and sellers
+    # keep $3.50 whoever hands the tax over.
+    assert incidence["price"] == pytest.approx(4.5 if levied_on == "sellers" else 3.5)
+    assert (incidence["buyer_price"], incidence["seller_price"]) == pytest.approx((4.5, 3.5))
+    assert (incidence["buyer_burden"], incidence["seller_burden"]) == pytest.approx((0.5, 0.5))
+    assert incidence["buyer_share"] == pytest.approx(0.5)
+    assert incidence["revenue"] == pytest.approx(35)
+    # The 5 scoops no longer traded, times the $1 wedge, halved.
+    assert incidence["deadweight_loss"] == pytest.approx(2.5)
+    assert incidence["consumer_surplus"] == pytest.approx(61.25)
+    assert incidence["producer_surplus"] == pytest.approx(61.25)
+
+
+def test_tax_incidence_over_many_taxes():
+    incidence = model.tax_incidence(*SCHEDULE, np.array([0, 1, 2, 4]))
+    np.testing.assert_allclose(incidence["quantity"], [40, 35, 30, 20])
+    # The deadweight loss grows with the square of the tax.
+    np.testing.assert_allclose(incidence["deadweight_loss"], [0, 2.5, 10, 40])
+    assert np.isnan(incidence["buyer_share"][0])
+
+
+def test_tax_that_stops_all_trade():
+    incidence = model.tax_incidence(*SCHEDULE, 9)
+    assert np.isnan(incidence["quantity"]) and np.isnan(incidence["price"])
+
+
+@pytest.mark.parametrize("price, consumer, producer", [(5, 45, 105), (3, 105, 45)])
+def test_binding_price_control(table, price, consumer, producer):
+    # A $5 floor or a $3 ceiling leaves 30 scoops traded, the short side.
+    outcome = model.price_control_welfare(*SCHEDULE, price)
+    assert outcome == pytest.approx({"quantity": 30, "consumer_surplus": consumer, "producer_surplus": producer,
+                                     "total_welfare": 150, "deadweight_loss": 10})
+    assert model.lookup_price_control(table, price) == pytest.approx(outcome)
+
+
+def test_non_binding_price_control(table):
+    # Holding the price where the market clears anyway changes nothing.
+    outcome = model.price_control_welfare(*SCHEDULE, 4)
+    assert outcome == pytest.approx({"quantity": 40, "consumer_surplus": 80, "producer_surplus": 80,
+                                     "total_welfare": 160, "deadweight_loss": 0})
+    assert model.lookup_price_control(table, 4) == pytest.approx(outcome)
+    # With demand 20 scoops up the market clears at $5, so a $5 floor does not bind there.
+    shifted = model.price_control_welfare(*SCHEDULE, 5, demand_shift=20)
+    assert shifted["quantity"] == pytest.approx(50) and shifted["deadweight_loss"] == pytest.approx(0)
@@ -0,0 +1,88 @@
+"""Chapters run headlessly with AppTest on markets other than the lesson's."""
+import os
+
+import pytest
+
+st = pytest.importorskip("streamlit")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+
+# Three prices, with the equilibrium ($2.25) between the last two.
+TINY_CATALOG = """product,price,demand,supply
+tiny,1,6,1
+tiny,2,4,3
+tiny,3,2,5
+"""
+
+
+@pytest.fixture
+def tiny_market(tmp_path, monkeypatch):
+    path = tmp_path / "catalog.csv"
+    path.write_text(TINY_CATALOG)
+    monkeypatch.setenv("ICECREAM_CATALOG", str(path))
+    # The catalog is read once per process; start from and leave a clean cache.
+    st.cache_resource.clear()
+    yield
+    st.cache_resource.clear()
+
+
+def open_chapter(url_path, market=None):
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.query_params["chapters"] = url_path
+    at.run()
+    if market is not None:
+        at.selectbox(key="market").set_value(market).run()
+    assert not at.exception, at.exception[0].message
+    return at
+
+
+def test_price_controls_keep_a_range_beside_the_equilibrium(tiny_market):
+    at = open_chapter("price-controls", "tiny")
+    floor, ceiling = at.slider
+    assert (floor.min, floor.max) == (2, 3)
+    assert (ceiling.min, ceiling.max) == (1, 2)
+    for slider in (floor, ceiling):
+        for value in (slider.min, slider.max):
+            slider.set_value(value).run()
+            assert not at.exception, at.exception[0].message
+
+
+@pytest.mark.parametrize("url_path", ["seller-tax", "buyer-tax"])
+def test_tax_chapters_explain_when_nothing_trades(tiny_market, url_path):
+    at = open_chapter(url_path, "tiny")
+    tax = at.slider[0]
+    for value in range(int(tax.min), int(tax.max) + 1):
+        tax.set_value(value).run()
+        assert not at.exception, at.exception[0].message
+        text = " ".join(block.value for block in at.markdown)
+        assert "nan" not in text
+        # From $4 the tax is more than the gap between what buyers will pay and
+        # what sellers will take for the first scoop.
+        assert ("No trade at this tax" in text) == (value > 3)
+
+
+def test_debug_sidebar_shows_the_chart_cache():
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.query_params["chapters"] = "seller-tax"
+    at.query_params["debug"] = "1"
+    at.run()
+    assert not at.exception, at.exception[0].message
+    labels = [metric.label for metric in at.sidebar.get("metric")]
+    assert "Chart cache hits / misses" in labels and "Cached charts (evicted)" in labels
+
+
+def test_failed_prefetch_is_logged(caplog):
+    from icecream_market.pages.common import load_prefetcher, prefetch
+
+    def broken_loader():
+        raise RuntimeError("table went missing")
+
+    with caplog.at_level("ERROR", logger="icecream_market.pages.common"):
+        prefetch(broken_loader)
+        # The prefetcher runs one task at a time, so this one finishes last.
+        load_prefetcher().submit(lambda: None).result(timeout=10)
+    [record] = caplog.records
+    assert record.message == "Prefetching the next chapter failed"
+    assert "table went missing" in str(record.exc_info[1])
@@ -0,0 +1,67 @@
+"""The related-goods solvers against a plain `np.linalg.solve` of the same system."""
+import numpy as np
+import pytest
+
+from icecream_market.curves import Linear
+from icecream_market.related import RelatedGoods, lesson_goods
+
+
+def dense_prices(goods, demand_shift=0):
+    # Market clearing: (own - supply) p_i + sum_j cross[i, j] p_j = supply_intercept - demand_intercept - shift.
+    rhs = goods.supply_intercept - goods.demand_intercept - np.broadcast_to(demand_shift, (len(goods),))
+    return np.linalg.solve(goods.matrix(), rhs)
+
+
+@pytest.fixture
+def goods():
+    return lesson_goods()
+
+
+def test_lesson_goods_clear_at_the_lesson_prices(goods):
+    np.testing.assert_allclose(dense_prices(goods), [4, 3, 1])
+
+
+def test_lesson_goods_calibrate_to_other_curves():
+    demand, supply = Linear.fit([2, 6, 10], [900, 700, 500]), Linear.fit([2, 6, 10], [100, 300, 500])
+    goods = lesson_goods(demand, supply)
+    np.testing.assert_allclose(dense_prices(goods), [10, 3, 1])
+    np.testing.assert_allclose(goods.demand_schedule("ice cream", [2, 10], [10, 3, 1]), [900, 500])
+
+
+@pytest.mark.parametrize("method", ["direct", "iterative"])
+def test_solve_matches_linalg_solve(goods, method):
+    shift = np.array([5.0, -3.0, 2.0])
+    result = goods.solve(demand_shift=shift, method=method)
+    np.testing.assert_allclose(result["price"], dense_prices(goods, shift), rtol=1e-9)
+    demand = [goods.demand_schedule(name, result["price"][i], result["price"]) + shift[i] for i, name in enumerate(goods.names)]
+    np.testing.assert_allclose(result["quantity"], demand, rtol=1e-9)
+
+
+@pytest.mark.parametrize("change", [
+    lambda goods: goods.with_slope("ice cream", "ice cream", -14),
+    lambda goods: goods.with_slope("ice cream", "frozen yogurt", 6),
+    lambda goods: goods.with_slope("frozen yogurt", "cones", -1.5),
+    lambda goods: goods.with_supply_slope("cones", 25),
+])
+def test_sherman_morrison_update_matches_linalg(goods, change):
+    goods.inverse()
+    changed = change(goods)
+    # The update only happens when the inverse is already known.
+    assert changed._inverse is not None
+    np.testing.assert_allclose(changed.inverse(), np.linalg.inv(changed.matrix()), atol=1e-12)
+    np.testing.assert_allclose(changed.solve()["price"], dense_prices(changed), rtol=1e-9)
+    np.testing.assert_allclose(changed.solve(method="iterative")["price"], dense_prices(changed), rtol=1e-9)
+
+
+def test_iterative_matches_linalg_on_a_chain():
+    # A ring of goods, each a substitute for its neighbours.
+    n = 50
+    names = [f"good {i}" for i in range(n)]
+    cross = {(names[i], names[(i + 1) % n]): 2.0 for i in range(n)}
+    cross.update({(names[(i + 1) % n], names[i]): 1.5 for i in range(n)})
+    goods = RelatedGoods(names, np.linspace(60, 90, n), -10, 0, 8, cross)
+    taxes = np.array([[0, 0.5, 2]])
+    direct = goods.solve(tax_on_sellers=taxes, method="direct")
+    iterative = goods.solve(tax_on_sellers=taxes, method="iterative")
+    np.testing.assert_allclose(direct["price"][:, 0], dense_prices(goods), rtol=1e-9)
+    np.testing.assert_allclose(iterative["price"], direct["price"], rtol=1e-9)
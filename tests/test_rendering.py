@@ -0,0 +1,61 @@
+"""The shared chart cache and the keys charts are stored under."""
+from icecream_market.rendering import RenderCache, chart_key
+
+
+def test_least_recently_used_chart_goes_first():
+    cache = RenderCache(max_bytes=30)
+    for key in "abc":
+        cache.put(key, b"x" * 10)
+    # Reading "a" makes "b" the least recently used.
+    assert cache.get("a") == b"x" * 10
+    cache.put("d", b"y" * 10)
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+    # One large chart pushes out as many old ones as it needs, oldest first.
+    cache.put("e", b"z" * 25)
+    assert [key for key in "acde" if cache.get(key) is not None] == ["e"]
+    assert cache.stats()["evictions"] == 4
+    assert cache.stats()["bytes"] == 25
+
+
+def test_replacing_a_chart_counts_its_bytes_once():
+    cache = RenderCache(max_bytes=30)
+    cache.put("a", b"x" * 20)
+    cache.put("a", b"x" * 5)
+    cache.put("b", b"x" * 25)
+    assert cache.stats()["bytes"] == 30 and cache.stats()["evictions"] == 0
+
+
+def test_chart_larger_than_the_budget_is_not_kept():
+    cache = RenderCache(max_bytes=10)
+    cache.put("a", b"x" * 5)
+    cache.put("big", b"x" * 11)
+    assert cache.get("big") is None and cache.get("a") == b"x" * 5
+
+
+def test_hits_and_misses():
+    cache = RenderCache()
+    renders = []
+
+    def render():
+        renders.append(1)
+        return b"image"
+
+    for _ in range(3):
+        assert cache.get_or_render("a", render) == b"image"
+    assert len(renders) == 1
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 1, 1)
+    cache.clear()
+    assert cache.stats()["entries"] == 0 and cache.get("a") is None
+
+
+def test_chart_keys_separate_sections_inputs_and_formats():
+    key = chart_key("seller-tax", {"tax": 1, "shift": 0})
+    assert key == chart_key("seller-tax", {"shift": 0, "tax": 1})
+    assert len({
+        key,
+        chart_key("buyer-tax", {"tax": 1, "shift": 0}),
+        chart_key("seller-tax", {"tax": 2, "shift": 0}),
+        chart_key("seller-tax", {"tax": 1, "shift": 0}, fmt="svg"),
+    }) == 4
@@ -0,0 +1,88 @@
+"""The scenario sweep against the model it batches."""
+import numpy as np
+import pandas as pd
+import pytest
+
+from icecream_market import model
+from icecream_market.sweep import _init_worker, parse_values, solve_chunk, sweep
+
+SCHEDULE = tuple(
+    np.asarray(model.data[column], dtype=float)
+    for column in ("Price (in $)", "Quantity Demanded (in scoops)", "Quantity Supplied (in scoops)")
+)
+# 100 scoops less demand leaves none at any price the sellers take; 40 less
+# of both demand and supply makes the curves meet at zero scoops (at $4),
+# which is no trade either.
+DEMAND_SHIFTS = [-100, -40, -10, 0, 20]
+SUPPLY_SHIFTS = [-40, 0, 15]
+SELLER_TAXES = [0, 1, 2.5]
+BUYER_TAXES = [0, 0.5]
+AXES = tuple(np.asarray(a, dtype=float) for a in (DEMAND_SHIFTS, SUPPLY_SHIFTS, SELLER_TAXES, BUYER_TAXES))
+SIZE = len(DEMAND_SHIFTS) * len(SUPPLY_SHIFTS) * len(SELLER_TAXES) * len(BUYER_TAXES)
+
+
+def expected(ds, ss, ts, tb):
+    quantity, price = model.solve_equilibrium(*SCHEDULE, ds, ss, ts, tb)
+    trades = quantity > 0
+    return trades, np.where(trades, quantity, np.nan), np.where(trades, price, np.nan)
+
+
+def test_parse_values():
+    np.testing.assert_allclose(parse_values("0:1:0.25"), [0, 0.25, 0.5, 0.75, 1])
+    np.testing.assert_allclose(parse_values("-40,0,40"), [-40, 0, 40])
+    with pytest.raises(ValueError):
+        parse_values("0:1:0")
+
+
+def test_solve_chunk_matches_solve_equilibrium():
+    _init_worker(SCHEDULE, AXES, None)
+    columns = solve_chunk(3, SIZE - 2)
+    assert len(columns["quantity"]) == SIZE - 5
+    trades, quantity, price = expected(*(columns[name] for name in ("demand_shift", "supply_shift", "tax_on_sellers", "tax_on_buyers")))
+    np.testing.assert_array_equal(columns["trades"], trades)
+    np.testing.assert_allclose(columns["quantity"], quantity, equal_nan=True)
+    np.testing.assert_allclose(columns["price"], price, equal_nan=True)
+    np.testing.assert_allclose(columns["buyer_price"] - columns["seller_price"],
+                               np.where(trades, columns["tax_on_sellers"] + columns["tax_on_buyers"], np.nan), equal_nan=True)
+
+
+def test_no_trade_rows_are_empty():
+    _init_worker(SCHEDULE, AXES, None)
+    columns = solve_chunk(0, SIZE)
+    zero_scoops = (columns["demand_shift"] == -40) & (columns["supply_shift"] == -40) & (columns["tax_on_sellers"] == 0) & (columns["tax_on_buyers"] == 0)
+    assert model.solve_equilibrium(*SCHEDULE, -40, -40) == (0, 4)
+    assert zero_scoops.sum() == 1 and not columns["trades"][zero_scoops].any()
+    assert not columns["trades"][columns["demand_shift"] == -100].any()
+    for name in ("quantity", "price", "buyer_price", "seller_price", "buyer_burden", "seller_burden"):
+        assert np.isnan(columns[name][~columns["trades"]]).all()
+        assert not np.isnan(columns[name][columns["trades"]]).any()
+
+
+def test_control_prices_repeat_every_scenario():
+    control_prices = np.array([3.0, 4.0, 5.0])
+    _init_worker(SCHEDULE, AXES, control_prices)
+    columns = solve_chunk(0, 4)
+    assert len(columns["control_price"]) == 4 * len(control_prices)
+    assert (columns["demand_shift"] == -100).all()
+    np.testing.assert_array_equal(columns["control_price"], np.tile(control_prices, 4))
+    # With demand 100 scoops down nobody buys at any of these prices, so
+    # nothing trades and sellers are left with everything they supply.
+    assert (columns["quantity_demanded"] == 0).all() and (columns["traded_quantity"] == 0).all()
+    np.testing.assert_allclose(columns["excess_supply"], columns["quantity_supplied"])
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".parquet"])
+def test_sweep_writes_the_whole_grid_in_order(tmp_path, suffix):
+    if suffix == ".parquet":
+        pytest.importorskip("pyarrow")
+    output = tmp_path / f"scenarios{suffix}"
+    rows = sweep(output, SCHEDULE, DEMAND_SHIFTS, SUPPLY_SHIFTS, SELLER_TAXES, BUYER_TAXES, workers=1, chunk_size=7)
+    assert rows == SIZE
+    table = pd.read_parquet(output) if suffix == ".parquet" else pd.read_csv(output)
+    assert len(table) == SIZE
+    grid = np.stack(np.meshgrid(*AXES, indexing="ij"), axis=-1).reshape(-1, 4)
+    np.testing.assert_array_equal(table[["demand_shift", "supply_shift", "tax_on_sellers", "tax_on_buyers"]].to_numpy(), grid)
+    trades, quantity, price = expected(*grid.T)
+    np.testing.assert_array_equal(table["trades"].to_numpy(), trades)
+    np.testing.assert_allclose(table["quantity"].to_numpy(), quantity, equal_nan=True)
+    np.testing.assert_allclose(table["price"].to_numpy(), price, equal_nan=True)
@@ -0,0 +1,106 @@
+"""Span aggregation and the two export formats."""
+import json
+import os
+
+import pytest
+
+from icecream_market import timing
+from icecream_market.timing import Timings
+
+
+def test_totals_per_section_and_stage():
+    timings = Timings()
+    timings.record("seller_tax", "solve", 0.25)
+    timings.record("seller_tax", "solve", 0.75)
+    timings.record("seller_tax", "draw", 2.0)
+    rows = timings.snapshot()
+    # Slowest total first.
+    assert [(row["section"], row["stage"]) for row in rows] == [("seller_tax", "draw"), ("seller_tax", "solve")]
+    assert rows[1] == {"section": "seller_tax", "stage": "solve", "count": 2, "total_seconds": 1.0,
+                       "max_seconds": 0.75, "last_seconds": 0.75}
+
+
+def test_prometheus_text(tmp_path):
+    timings = Timings()
+    timings.record("seller_tax", "solve", 0.25)
+    timings.record("seller_tax", "solve", 0.5)
+    timings.record("demand", "draw", 0.125)
+    expected = """\
+# TYPE icecream_span_seconds_total counter
+icecream_span_seconds_total{section="seller_tax",stage="solve"} 0.75
+icecream_span_seconds_total{section="demand",stage="draw"} 0.125
+# TYPE icecream_spans_total counter
+icecream_spans_total{section="seller_tax",stage="solve"} 2
+icecream_spans_total{section="demand",stage="draw"} 1
+# TYPE icecream_span_seconds_max gauge
+icecream_span_seconds_max{section="seller_tax",stage="solve"} 0.5
+icecream_span_seconds_max{section="demand",stage="draw"} 0.125
+"""
+    assert timings.prometheus() == expected
+    path = str(tmp_path / "spans.prom")
+    timings.export(path)
+    with open(path) as f:
+        assert f.read() == expected
+    # Only the exported file is left behind.
+    assert os.listdir(tmp_path) == ["spans.prom"]
+
+
+def test_json_lines_are_drained(tmp_path):
+    timings = Timings(keep_events=True)
+    timings.record("seller_tax", "solve", 0.25)
+    timings.record("demand", "draw", 0.5)
+    path = str(tmp_path / "spans.jsonl")
+    timings.export(path)
+    timings.record("demand", "draw", 1.0)
+    timings.export(path)
+    timings.export(path)
+    with open(path) as f:
+        events = [json.loads(line) for line in f]
+    assert [(e["section"], e["stage"], e["seconds"]) for e in events] == [
+        ("seller_tax", "solve", 0.25), ("demand", "draw", 0.5), ("demand", "draw", 1.0)
+    ]
+
+
+def test_span_and_timed_section(monkeypatch):
+    timings = Timings()
+    monkeypatch.setattr(timing, "ENABLED", True)
+    monkeypatch.setattr(timing, "EXPORT_PATH", None)
+    monkeypatch.setattr(timing, "TIMINGS", timings)
+
+    @timing.timed_section
+    def demand_section():
+        with timing.span("solve"):
+            pass
+        with timing.span("draw"):
+            pass
+
+    demand_section()
+    demand_section()
+    with timing.span("data"):
+        pass
+    counts = {(row["section"], row["stage"]): row["count"] for row in timings.snapshot()}
+    assert counts == {("demand", "solve"): 2, ("demand", "draw"): 2, ("demand", "total"): 2, ("page", "data"): 1}
+
+
+def test_timing_off_costs_nothing(monkeypatch):
+    monkeypatch.setattr(timing, "ENABLED", False)
+
+    def demand_section():
+        pass
+
+    assert timing.timed_section(demand_section) is demand_section
+    assert timing.span("solve") is timing.span("draw")
+
+
+@pytest.mark.parametrize("interval, exports", [(0, 2), (3600, 0)])
+def test_export_if_due(tmp_path, interval, exports):
+    timings = Timings(keep_events=True)
+    path = str(tmp_path / "spans.jsonl")
+    for seconds in (0.25, 0.5):
+        timings.record("demand", "draw", seconds)
+        timings.export_if_due(path, interval)
+    if not exports:
+        assert not os.path.exists(path)
+        return
+    with open(path) as f:
+        assert len(f.readlines()) == exports